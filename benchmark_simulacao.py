@@ -0,0 +1,269 @@
+"""
+Benchmark do simulador com mundos e populações sintéticos.
+
+Gera mapas codificados (mesmo formato de mapa_codificado.json) de vários tamanhos e
+proporções de oceano/rio/montanha, popula com NPCs e grupos de transportes variados e mede:
+dias/segundo do process_tick, nós expandidos e falhas do A*, tempo de render e pico de memória.
+
+Cada cenário roda num processo novo: o pico de memória (ru_maxrss) é só dele, do mapa gerado até o
+render. No Windows, sem o módulo resource, o pico vem do tracemalloc ligado no cenário inteiro (só o
+heap do Python, e os tempos ficam mais lentos).
+
+Cada execução é anexada em resultados_benchmark.jsonl (com o commit do git) para comparar versões.
+
+    python benchmark_simulacao.py                       # cenários padrão
+    python benchmark_simulacao.py --cenario grande --dias 5
+    python benchmark_simulacao.py --comparar            # última execução x anterior
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+
+import inteface as sim
+
+CAMINHO_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+RESULTADOS_PATH = os.path.join(CAMINHO_SCRIPT, 'resultados_benchmark.jsonl')
+
+# Mesmos dicionários de código do mapa real
+TERRENOS_MAP = {"0": "gelo", "1": "agua", "2": "gramado", "3": "rochoso"}
+AMBIENTES_MAP = {"0": "geleira", "1": "oceano", "2": "floresta", "3": "campo", "4": "montanha", "5": "rio"}
+LOCAL_ATUAL_MAP = {"0": None, "1": "acampamento"}
+
+# (largura, altura, entidades, dias)
+CENARIOS = {
+    "pequeno": (200, 86, 10, 30),
+    "medio": (500, 215, 1000, 10),
+    "grande": (2000, 860, 10000, 3),
+    "enorme": (2000, 860, 100000, 1),
+}
+CENARIOS_PADRAO = ["pequeno", "medio"]
+
+MISTURA_TRANSPORTES = [("a_pe", 0.5), ("cavalo", 0.25), ("carroca", 0.1), ("barco_rio", 0.1), ("navio_oceano", 0.05)]
+
+
+# ==============================================================================
+# MUNDOS SINTÉTICOS
+# ==============================================================================
+
+def _ruido(rng, h, w, escala):
+    """Ruído em blocos suavizado: dá regiões contínuas (continentes, cordilheiras)."""
+    grosso = rng.random((h // escala + 2, w // escala + 2))
+    fino = np.kron(grosso, np.ones((escala, escala)))[:h, :w]
+    # Média com vizinhos deslocados para suavizar as bordas dos blocos
+    return (fino + np.roll(fino, escala // 2, 0) + np.roll(fino, escala // 2, 1)) / 3
+
+def gerar_mapa_sintetico(largura, altura, oceano=0.35, rio=0.03, montanha=0.1, floresta=0.3, seed=0):
+    """Mapa codificado largura x altura com as proporções aproximadas pedidas."""
+    rng = np.random.default_rng(seed)
+    escala = max(4, min(largura, altura) // 12)
+    base = _ruido(rng, altura, largura, escala)
+    vegetacao = _ruido(rng, altura, largura, max(2, escala // 2))
+
+    terreno = np.full((altura, largura), 2, dtype=np.int8)   # gramado
+    ambiente = np.full((altura, largura), 3, dtype=np.int8)  # campo
+    ambiente[vegetacao < np.quantile(vegetacao, floresta)] = 2  # floresta
+
+    e_oceano = base < np.quantile(base, oceano)
+    e_montanha = base > np.quantile(base, 1 - montanha)
+    terreno[e_oceano], ambiente[e_oceano] = 1, 1
+    terreno[e_montanha], ambiente[e_montanha] = 3, 4
+
+    # Rios: passeios aleatórios de cima para baixo até atingir a proporção pedida
+    alvo_rio = int(rio * largura * altura)
+    marcados = 0
+    while marcados < alvo_rio:
+        q = int(rng.integers(0, largura))
+        for r in range(altura):
+            if e_oceano[r, q]: break
+            if ambiente[r, q] != 5:
+                terreno[r, q], ambiente[r, q] = 1, 5
+                marcados += 1
+            q = int(np.clip(q + rng.integers(-1, 2), 0, largura - 1))
+
+    # Calotas de gelo nas bordas de cima e de baixo
+    calota = max(1, altura // 40)
+    terreno[:calota], ambiente[:calota] = 0, 0
+    terreno[-calota:], ambiente[-calota:] = 0, 0
+
+    local = np.zeros((altura, largura), dtype=np.int8)
+    terra = np.argwhere(terreno == 2)
+    for r, q in terra[rng.choice(len(terra), size=min(len(terra), 5), replace=False)]:
+        local[r, q] = 1
+
+    uns = np.ones((altura, largura), dtype=np.int8).tolist()
+    return {
+        "metadata": {"num_rows": altura, "num_cols": largura, "terrenos_map": dict(TERRENOS_MAP),
+                     "ambientes_map": dict(AMBIENTES_MAP), "local_atual_map": dict(LOCAL_ATUAL_MAP)},
+        "terreno": terreno.tolist(), "ambiente": ambiente.tolist(),
+        "valor_movimentacao": uns, "valor_estabilidade": uns,
+        "local_atual": local.tolist(),
+    }
+
+def gerar_populacao(map_data, quantidade, seed=0):
+    """NPCs e grupos (2:1) espalhados por células onde o transporte deles consegue andar."""
+    rng = random.Random(seed)
+    w, h = sim.map_size(map_data)
+    modos, pesos = zip(*MISTURA_TRANSPORTES)
+    ent_data = {"npcs": [], "grupos": [], "players": [], "locais": [], "config": {"semente": seed}}
+    for i in range(quantidade):
+        colecao = "grupos" if i % 3 == 2 else "npcs"
+        modo = rng.choices(modos, pesos)[0]
+        ent = sim.nova_entidade(colecao, nome=f"{colecao[:-1]}_{i}", modo_transporte=modo, cor_hex="#FFFFFF",
+                                tem_cavalo=modo == "cavalo", tem_barco_rio=modo == "barco_rio", tem_navio=modo == "navio_oceano")
+        for _ in range(50):
+            q, r = rng.randrange(w), rng.randrange(h)
+            if sim.cell_movement(map_data, ent, ent_data, q, r) > 0: break
+        ent["q"], ent["r"] = q, r
+        if colecao == "grupos": ent["quantidade_membros"] = rng.randint(2, 40)
+        ent_data[colecao].append(ent)
+    return ent_data
+
+
+# ==============================================================================
+# MEDIÇÃO
+# ==============================================================================
+
+def _silencioso():
+    return contextlib.redirect_stdout(io.StringIO())
+
+def _pico_mb(quem):
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(quem).ru_maxrss
+    return pico / (2**20 if sys.platform == "darwin" else 2**10)
+
+def medir(largura, altura, entidades, dias, oceano=0.35, rio=0.03, montanha=0.1, seed=0, render=True, processos=1):
+    """Mede um cenário. O pico de memória é o do processo todo: para ser só do cenário, rode num
+    processo novo (medir_isolado)."""
+    if resource is None: tracemalloc.start()
+    map_data = gerar_mapa_sintetico(largura, altura, oceano, rio, montanha, seed=seed)
+    ent_data = gerar_populacao(map_data, entidades, seed=seed)
+    resultado = {"largura": largura, "altura": altura, "entidades": entidades, "dias": dias, "processos": processos,
+                 "oceano": oceano, "rio": rio, "montanha": montanha, "seed": seed}
+
+    inicio = time.perf_counter()
+    sim.decode_map(map_data)
+    resultado["decodificar_s"] = time.perf_counter() - inicio
+
+    sim.reset_astar_stats()
+    inicio = time.perf_counter()
+    with _silencioso():
+        resumo = sim.process_tick(map_data, ent_data, dias, gerar_imagem=False, salvar=False, processos=processos)
+    duracao = time.perf_counter() - inicio
+    resultado["tick_s"] = duracao
+    resultado["dias_por_s"] = dias / duracao if duracao else float("inf")
+    resultado["astar_buscas"] = sim.ASTAR_STATS["buscas"]
+    resultado["astar_nos"] = sim.ASTAR_STATS["nos_expandidos"]
+    resultado["astar_falhas"] = sim.ASTAR_STATS["falhas"]
+    resultado["fases_s"] = resumo["perfil"]["fases"]
+
+    if render:
+        with tempfile.TemporaryDirectory() as pasta, _silencioso():
+            inicio = time.perf_counter()
+            sim.generate_world_image(map_data, ent_data, os.path.join(pasta, "bench.png"))
+            resultado["render_s"] = time.perf_counter() - inicio
+
+    if resource is None:
+        resultado["pico_mem_mb"], resultado["medida_mem"] = tracemalloc.get_traced_memory()[1] / 2**20, "tracemalloc"
+        tracemalloc.stop()
+    else:
+        resultado["pico_mem_mb"], resultado["medida_mem"] = _pico_mb(resource.RUSAGE_SELF), "ru_maxrss"
+        if processos > 1: resultado["pico_mem_filhos_mb"] = _pico_mb(resource.RUSAGE_CHILDREN) # maior processo filho
+    return resultado
+
+def medir_isolado(*args, **kwargs):
+    """medir() num processo novo, para o pico de memória não incluir os cenários anteriores."""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(medir, *args, **kwargs).result()
+
+
+# ==============================================================================
+# RESULTADOS
+# ==============================================================================
+
+def versao_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=CAMINHO_SCRIPT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+def salvar_execucao(resultados, caminho=RESULTADOS_PATH):
+    execucao = {"data": datetime.now().isoformat(timespec="seconds"), "versao": versao_codigo(),
+                "python": platform.python_version(), "resultados": resultados}
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+    return execucao
+
+def carregar_execucoes(caminho=RESULTADOS_PATH):
+    if not os.path.exists(caminho): return []
+    with open(caminho, encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+def imprimir_tabela(resultados):
+    print(f"{'cenário':<10} {'mapa':>10} {'ents':>7} {'dias/s':>9} {'nós A*':>11} {'falhas':>7} {'render s':>9} {'mem MB':>8}")
+    for res in resultados:
+        print(f"{res['cenario']:<10} {res['largura']:>5}x{res['altura']:<4} {res['entidades']:>7} {res['dias_por_s']:>9.2f} "
+              f"{res['astar_nos']:>11} {res['astar_falhas']:>7} {res.get('render_s', float('nan')):>9.2f} {res['pico_mem_mb']:>8.1f}")
+
+def comparar(execucoes):
+    if len(execucoes) < 2: return print("Precisa de pelo menos 2 execuções salvas para comparar.")
+    antes, depois = execucoes[-2], execucoes[-1]
+    print(f"Comparando {antes['versao']} ({antes['data']}) -> {depois['versao']} ({depois['data']})")
+    anteriores = {r["cenario"]: r for r in antes["resultados"]}
+    for res in depois["resultados"]:
+        ant = anteriores.get(res["cenario"])
+        if not ant: continue
+        for campo in ["dias_por_s", "astar_nos", "render_s", "pico_mem_mb"]:
+            if campo == "pico_mem_mb" and ant.get("medida_mem") != res.get("medida_mem"): continue # medidas diferentes
+            if campo in res and campo in ant and ant[campo]:
+                print(f"  {res['cenario']:<10} {campo:<12} {ant[campo]:>12.2f} -> {res[campo]:>12.2f} ({100 * (res[campo] / ant[campo] - 1):+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do simulador com mundos sintéticos.")
+    parser.add_argument("--cenario", action="append", choices=list(CENARIOS), help="pode repetir; padrão: pequeno e medio")
+    parser.add_argument("--dias", type=int, help="sobrescreve os dias de cada cenário")
+    parser.add_argument("--oceano", type=float, default=0.35)
+    parser.add_argument("--rio", type=float, default=0.03)
+    parser.add_argument("--montanha", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processos", type=int, default=1, help="tick paralelo com N processos")
+    parser.add_argument("--sem-render", action="store_true")
+    parser.add_argument("--nao-salvar", action="store_true", help="não grava em resultados_benchmark.jsonl")
+    parser.add_argument("--comparar", action="store_true", help="só compara as duas últimas execuções salvas")
+    args = parser.parse_args(argv)
+
+    if args.comparar: return comparar(carregar_execucoes())
+
+    resultados = []
+    for nome in args.cenario or CENARIOS_PADRAO:
+        largura, altura, entidades, dias = CENARIOS[nome]
+        print(f"▶ {nome}: {largura}x{altura}, {entidades} entidades, {args.dias or dias} dia(s)...", file=sys.stderr)
+        res = medir_isolado(largura, altura, entidades, args.dias or dias, args.oceano, args.rio, args.montanha,
+                    args.seed, render=not args.sem_render, processos=args.processos)
+        res["cenario"] = nome
+        resultados.append(res)
+
+    imprimir_tabela(resultados)
+    if not args.nao_salvar: salvar_execucao(resultados)
+
+if __name__ == "__main__":
+    main()
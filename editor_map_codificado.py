@@ -164,6 +164,15 @@ def save_codified_map(data, json_path):
     except Exception as e:
         print(f"Erro ao salvar JSON codificado: {e}")
 
+def invalidate_tiles(data, q, r):
+    """Apaga os ladrilhos em disco (ladrilhos_mapa) que mostram a célula editada."""
+    try:
+        import ladrilhos_mapa
+        apagados = ladrilhos_mapa.invalidar_celulas(data, [(q, r)])
+        if apagados: print(f"{apagados} ladrilho(s) do mapa serão redesenhados.")
+    except Exception as e:
+        print(f"Aviso: não foi possível invalidar os ladrilhos: {e}")
+
 def get_valid_input(prompt, valid_options):
     while True:
         user_input = input(prompt).lower().strip()
@@ -247,6 +256,7 @@ def edit_map_codified():
         data["local_atual"][r][q] = new_local_code
         
         save_codified_map(data, INPUT_JSON_PATH)
+        invalidate_tiles(data, q, r)
         plot_map_codified(data) 
         
         continuar = input("Pressione ENTER para editar outra célula, ou 's' para sair: ").lower().strip()
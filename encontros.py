@@ -0,0 +1,59 @@
+"""
+Encontros entre entidades durante o process_tick.
+
+Um encontro acontece quando duas entidades passam a ficar a até RAIO_ENCONTRO células uma da outra
+(0 = mesma célula, 1 = vizinhas) ou quando trocam de célula entre si no mesmo dia (se cruzaram no
+caminho). Só quem andou no dia pode criar um encontro novo, então cada entidade que andou consulta o
+índice espacial em volta de si: nada de comparar todos os pares.
+
+A decisão depende só das posições do começo e do fim do dia (sem estado guardado), então refazer a
+simulação a partir de um banco salvo gera os mesmos encontros.
+"""
+import indice_espacial
+
+RAIO_ENCONTRO = 1
+
+
+def _distancia(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+def detectar(ent_data, dia, movidas, origens, raio=RAIO_ENCONTRO):
+    """Eventos de encontro do dia.
+
+    movidas: entidades que mudaram de célula hoje (na ordem em que foram processadas).
+    origens: {id(entidade): (q, r) no começo do dia} de pelo menos todas as que andaram.
+    """
+    if not movidas: return []
+    indice_espacial.obter(ent_data) # garante o índice já com as posições do fim do dia
+    eventos, vistos = [], set()
+
+    def registrar(a, b, modo, q, r):
+        par = tuple(sorted((a["nome"], b["nome"])))
+        if par in vistos: return
+        vistos.add(par)
+        eventos.append({"dia": dia, "tipo": "encontro", "nomes": list(par), "modo": modo, "q": q, "r": r})
+
+    # Cruzamentos: A foi de X para Y e B de Y para X
+    por_trajeto = {}
+    for ent in movidas:
+        por_trajeto.setdefault((origens[id(ent)], (ent["q"], ent["r"])), []).append(ent)
+    for a in movidas:
+        for b in por_trajeto.get(((a["q"], a["r"]), origens[id(a)]), ()):
+            registrar(a, b, "cruzamento", a["q"], a["r"])
+
+    # Contato novo: perto agora e longe no começo do dia
+    for a in movidas:
+        origem_a = origens[id(a)]
+        for d, b in indice_espacial.no_raio(ent_data, a["q"], a["r"], raio):
+            if b is a: continue
+            if _distancia(origem_a, origens.get(id(b), (b["q"], b["r"]))) <= raio: continue # já estavam juntos
+            registrar(a, b, "mesma_celula" if d == 0 else "vizinhos", a["q"], a["r"])
+
+    eventos.sort(key=lambda e: e["nomes"]) # ordem estável, não depende da ordem interna do índice
+    return eventos
+
+def descrever(evento):
+    a, b = evento["nomes"]
+    if evento["modo"] == "cruzamento": return f"{a} e {b} se cruzaram no caminho perto de ({evento['q']}, {evento['r']})"
+    onde = "na mesma célula" if evento["modo"] == "mesma_celula" else "lado a lado"
+    return f"{a} e {b} se encontraram {onde} em ({evento['q']}, {evento['r']})"
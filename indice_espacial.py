@@ -0,0 +1,136 @@
+"""
+Índice espacial das entidades: grade de baldes (tamanho x tamanho células) sobre as posições q/r.
+
+Responde "quem está em (q, r)", "quem está a até N células" e "as k mais próximas" sem varrer
+todas as entidades. Distância = Manhattan, a mesma do movimento (4 direções) e da heurística do A*.
+
+O índice é montado na primeira consulta e depois atualizado aos poucos: o process_tick chama
+mover() para quem mudou de célula e create_entity chama adicionar().
+"""
+from collections import defaultdict
+
+TAMANHO_BALDE = 8
+
+# Um índice por banco de entidades em uso (mesma ideia do cache do mapa decodificado)
+_INDICES = {}
+
+
+def _balde(tam, q, r):
+    return q // tam, r // tam
+
+def construir(ent_data, tamanho=TAMANHO_BALDE):
+    """Monta o índice do zero a partir das posições atuais."""
+    indice = {"src": ent_data, "tam": tamanho, "baldes": defaultdict(set), "celulas": defaultdict(set),
+              "pos": {}, "ents": {}}
+    _INDICES[id(ent_data)] = indice
+    for k in ["npcs", "grupos", "players"]:
+        for ent in ent_data.get(k, []):
+            adicionar(ent_data, ent)
+    return indice
+
+def obter(ent_data):
+    indice = _INDICES.get(id(ent_data))
+    if indice is None or indice["src"] is not ent_data: indice = construir(ent_data)
+    return indice
+
+def construido(ent_data):
+    indice = _INDICES.get(id(ent_data))
+    return indice is not None and indice["src"] is ent_data
+
+def invalidar(ent_data):
+    """Chamar depois de trocar/apagar entidades por fora (a próxima consulta remonta)."""
+    _INDICES.pop(id(ent_data), None)
+
+
+# --- Atualização incremental ---
+# Enquanto o índice não foi montado não há o que atualizar: a primeira consulta já lê as posições atuais.
+
+def adicionar(ent_data, ent):
+    if not construido(ent_data) or ent.get("q") is None: return
+    indice = _INDICES[id(ent_data)]
+    chave, pos = id(ent), (ent["q"], ent["r"])
+    indice["ents"][chave] = ent
+    indice["pos"][chave] = pos
+    indice["celulas"][pos].add(chave)
+    indice["baldes"][_balde(indice["tam"], *pos)].add(chave)
+
+def remover(ent_data, ent):
+    if not construido(ent_data): return
+    indice = _INDICES[id(ent_data)]
+    chave = id(ent)
+    pos = indice["pos"].pop(chave, None)
+    indice["ents"].pop(chave, None)
+    if pos is None: return
+    _descartar(indice["celulas"], pos, chave)
+    _descartar(indice["baldes"], _balde(indice["tam"], *pos), chave)
+
+def mover(ent_data, ent):
+    """Atualiza a entidade se a posição dela mudou desde a última vez."""
+    if not construido(ent_data): return
+    indice = _INDICES[id(ent_data)]
+    if indice["pos"].get(id(ent)) == (ent.get("q"), ent.get("r")): return
+    remover(ent_data, ent)
+    adicionar(ent_data, ent)
+
+def _descartar(grupos, chave_grupo, chave):
+    membros = grupos.get(chave_grupo)
+    if membros is None: return
+    membros.discard(chave)
+    if not membros: del grupos[chave_grupo]
+
+
+# --- Consultas ---
+
+def na_celula(ent_data, q, r):
+    """Entidades que ocupam a célula (q, r)."""
+    indice = obter(ent_data)
+    return [indice["ents"][c] for c in indice["celulas"].get((q, r), ())]
+
+def ocupacao(ent_data):
+    """{(q, r): quantidade} de todas as células ocupadas."""
+    return {pos: len(membros) for pos, membros in obter(ent_data)["celulas"].items()}
+
+def no_raio(ent_data, q, r, raio):
+    """[(distância, entidade)] a até `raio` células de (q, r), da mais perto para a mais longe."""
+    indice = obter(ent_data)
+    tam, baldes, pos = indice["tam"], indice["baldes"], indice["pos"]
+    bq0, br0 = _balde(tam, q - raio, r - raio)
+    bq1, br1 = _balde(tam, q + raio, r + raio)
+    achadas = []
+    for bq in range(bq0, bq1 + 1):
+        for br in range(br0, br1 + 1):
+            for chave in baldes.get((bq, br), ()):
+                eq, er = pos[chave]
+                d = abs(eq - q) + abs(er - r)
+                if d <= raio: achadas.append((d, chave))
+    achadas.sort(key=lambda x: x[0])
+    return [(d, indice["ents"][c]) for d, c in achadas]
+
+def mais_proximas(ent_data, q, r, k=1, excluir=None):
+    """As k entidades mais próximas de (q, r) como [(distância, entidade)].
+
+    Abre anéis de baldes em volta do ponto até ter k candidatas mais perto do que qualquer balde
+    ainda não visitado poderia ter. `excluir` = entidade a ignorar (ex: a própria).
+    """
+    indice = obter(ent_data)
+    tam, baldes, pos = indice["tam"], indice["baldes"], indice["pos"]
+    total = len(pos) - (1 if excluir is not None and id(excluir) in pos else 0)
+    if total <= 0 or k <= 0: return []
+    k = min(k, total)
+    bq0, br0 = _balde(tam, q, r)
+    candidatas = []
+    anel = 0
+    while True:
+        for bq in range(bq0 - anel, bq0 + anel + 1):
+            for br in range(br0 - anel, br0 + anel + 1):
+                if max(abs(bq - bq0), abs(br - br0)) != anel: continue # só a borda do anel
+                for chave in baldes.get((bq, br), ()):
+                    if excluir is not None and chave == id(excluir): continue
+                    eq, er = pos[chave]
+                    candidatas.append((abs(eq - q) + abs(er - r), chave))
+        # Qualquer célula fora dos anéis já vistos está a pelo menos anel*tam + 1 de distância
+        if len(candidatas) >= k:
+            candidatas.sort(key=lambda x: x[0])
+            if candidatas[k - 1][0] <= anel * tam + 1: break
+        anel += 1
+    return [(d, indice["ents"][c]) for d, c in candidatas[:k]]
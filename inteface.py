@@ -1,21 +1,39 @@
 import json
 import os
+import sys
 import random
 import math
 import heapq
+import time
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import numpy as np
-from matplotlib.colors import ListedColormap
+from matplotlib.colors import ListedColormap, to_rgb
 from matplotlib.patches import Patch
+from PIL import Image, ImageDraw
 
 # ==============================================================================
 # 1. CONFIGURAÇÕES GERAIS E CONSTANTES
 # ==============================================================================
 CAMINHO_SCRIPT = os.path.dirname(os.path.abspath(__file__))
 MAPA_CODIFICADO_PATH = os.path.join(CAMINHO_SCRIPT, 'mapa_codificado.json')
-DADOS_ENTIDADES_PATH = os.path.join(CAMINHO_SCRIPT, 'dados_entidades.json')
+
+# Entidades vêm do banco único do mundo_vivo (mesmos registros do CRUD)
+sys.path.insert(0, os.path.join(CAMINHO_SCRIPT, 'mundo_vivo'))
+from gerenciar_banco import carregar_banco, salvar_banco, nova_entidade, banco_mudou, CAMINHO_BANCO_JSON
+from gerenciar_banco import semente_mundo, rng_mundo, registrar_eventos, registro_estado, ler_eventos, CAMINHO_LOG_EVENTOS
+from gerenciar_banco import CAMPOS_ESTADO_LOG
+from tela import limpar, ler_tecla, pausar, barra_status, executar_com_progresso
+import indice_espacial
+import encontros
+import mapa_calor
+DADOS_ENTIDADES_PATH = CAMINHO_BANCO_JSON
 OUTPUT_IMAGE_MUNDO = os.path.join(CAMINHO_SCRIPT, 'mapa_status_mundo.png')
+OUTPUT_ANIMACAO = os.path.join(CAMINHO_SCRIPT, 'mapa_linha_do_tempo.gif')
+CAMINHO_CALOR = os.path.join(CAMINHO_SCRIPT, 'mapa_calor.npz')
 
 WIDTH = 200
 HEIGHT = 86
@@ -75,7 +93,7 @@ BASE_ENTITY_COLORS = ['#FF5733', '#33FF57', '#3357FF', '#FF33A1', '#33FFF6', '#F
 # 2. GERENCIAMENTO DE DADOS E UTILITÁRIOS
 # ==============================================================================
 
-def clear_screen(): os.system('cls' if os.name == 'nt' else 'clear')
+def clear_screen(): limpar() # ANSI, sem abrir shell
 
 def print_box(title, options=[]):
     width = 60
@@ -104,56 +122,147 @@ def get_transport_config(ent_data, mode_name):
     if mode_name in custom: return custom[mode_name]
     return DEFAULT_TRANSPORTS.get(mode_name, DEFAULT_TRANSPORTS["a_pe"])
 
-def generate_unique_color(index=None):
+def generate_unique_color(index=None, rng=random):
     if index is not None and index < len(BASE_ENTITY_COLORS): return BASE_ENTITY_COLORS[index]
-    return f'#{random.randint(50, 255):02x}{random.randint(50, 255):02x}{random.randint(50, 255):02x}'
+    return f'#{rng.randint(50, 255):02x}{rng.randint(50, 255):02x}{rng.randint(50, 255):02x}'
 
 # ==============================================================================
 # 3. LÓGICA DE MAPA E TERRENO
 # ==============================================================================
 
-def get_terrain_info(map_data, q, r):
-    """Decodifica a célula (q,r) para strings legíveis."""
-    if not (0 <= q < WIDTH and 0 <= r < HEIGHT): return "vazio", "vazio", None
-    
-    t_code = str(map_data["terreno"][r][q])
-    a_code = str(map_data["ambiente"][r][q])
-    
-    t_str = map_data["metadata"]["terrenos_map"].get(t_code, "vazio")
-    a_str = map_data["metadata"]["ambientes_map"].get(a_code, "vazio")
-    
+# --- Cache do mapa decodificado ---
+# Decodificar célula a célula (str() + 2 dicionários) a cada consulta custa caro no A*.
+# O mapa é decodificado uma vez e reaproveitado enquanto o mesmo map_data estiver em uso.
+_MAP_CACHE = {}
+MAP_CACHE_STATS = {"hits": 0, "misses": 0}
+CAMADAS_VALOR = ["valor_movimentacao", "valor_estabilidade"] # multiplicadores por célula (ver movement_raster)
+
+def decode_map(map_data):
+    """Camadas do mapa já traduzidas para texto + índice nome do local -> (q, r)."""
+    cache = _MAP_CACHE.get(id(map_data))
+    if cache is not None and cache["src"] is map_data:
+        MAP_CACHE_STATS["hits"] += 1
+        return cache
+    MAP_CACHE_STATS["misses"] += 1
+
+    meta = map_data["metadata"]
+    t_map, a_map = meta["terrenos_map"], meta["ambientes_map"]
+    l_map = meta.get("local_atual_map", {})
+    h = len(map_data["terreno"])
+    w = len(map_data["terreno"][0]) if h else 0
+    has_local = "local_atual" in map_data
+
+    terreno, ambiente, local = [], [], []
+    first_cell = {} # código do local -> primeira célula (varrendo linha a linha)
+    for r in range(h):
+        t_row, a_row, l_row = [], [], []
+        for q in range(w):
+            t_str, a_str, code, l_val = _decode_cell(map_data, t_map, a_map, l_map, has_local, q, r)
+            if has_local and code not in first_cell: first_cell[code] = (q, r)
+            t_row.append(t_str); a_row.append(a_str); l_row.append(l_val)
+        terreno.append(t_row); ambiente.append(a_row); local.append(l_row)
+
+    locations = {}
+    for code, nome in l_map.items():
+        if nome not in locations: locations[nome] = first_cell.get(code, (None, None))
+
+    cache = {"src": map_data, "w": w, "h": h, "terreno": terreno, "ambiente": ambiente,
+             "local": local, "locations": locations, "rotas": {}, "tabela_locais": {}, "has_local": has_local}
+    for camada in CAMADAS_VALOR: # mapa sem a camada = tudo 1 (neutro)
+        cache[camada] = [list(linha) for linha in map_data[camada]] if camada in map_data else [[1.0] * w for _ in range(h)]
+    _MAP_CACHE[id(map_data)] = cache
+    return cache
+
+def _decode_cell(map_data, t_map, a_map, l_map, has_local, q, r):
+    """(terreno, ambiente, código do local, nome do local) de uma célula do map_data cru."""
+    t_str = t_map.get(str(map_data["terreno"][r][q]), "vazio")
+    a_str = a_map.get(str(map_data["ambiente"][r][q]), "vazio")
     # Normalização Essencial
     if t_str == "agua" and a_str == "oceano": t_str = "oceano"
     elif t_str == "gramado": t_str = "vegetacao" if a_str == "floresta" else "terra"
-    
-    l_val = None
-    if "local_atual" in map_data:
+
+    code, l_val = None, None
+    if has_local:
         code = str(map_data["local_atual"][r][q])
-        l_val = map_data["metadata"].get("local_atual_map", {}).get(code)
-        
-    return t_str, a_str, l_val
+        l_val = l_map.get(code)
+    return t_str, a_str, code, l_val
+
+def map_size(map_data):
+    """(largura, altura) do mapa, lidos das camadas (WIDTH/HEIGHT são só o tamanho do mapa padrão)."""
+    dec = decode_map(map_data)
+    return dec["w"], dec["h"]
+
+def invalidate_map_cache(map_data):
+    """Chamar depois de editar o map_data em memória (ex: novo local)."""
+    _MAP_CACHE.pop(id(map_data), None)
+
+def update_cells(map_data, celulas):
+    """Alternativa ao invalidate_map_cache para poucas células editadas (terreno, ambiente, local ou valores).
+
+    Redecodifica só essas células e, na tabela de locais, marca para refazer só os pares cuja busca
+    leu alguma delas (mais os pares de um local novo). Se a edição mexe na célula de referência de um
+    local já conhecido, cai no invalidate_map_cache.
+    """
+    cache = _MAP_CACHE.get(id(map_data))
+    if cache is None or cache["src"] is not map_data: return
+    if cache["has_local"] != ("local_atual" in map_data): # camada de locais criada agora: decodifica tudo
+        invalidate_map_cache(map_data)
+        return
+    meta = map_data["metadata"]
+    t_map, a_map, l_map = meta["terrenos_map"], meta["ambientes_map"], meta.get("local_atual_map", {})
+    locations, novos = cache["locations"], []
+    for q, r in sorted(set(celulas), key=lambda c: (c[1], c[0])): # ordem de varredura, como no decode_map
+        antigo = cache["local"][r][q]
+        t_str, a_str, _, l_val = _decode_cell(map_data, t_map, a_map, l_map, cache["has_local"], q, r)
+        registrada = locations.get(l_val, (q, r))
+        if (is_location(antigo) and locations.get(antigo) == (q, r)) or \
+                (is_location(l_val) and (registrada[0] is None or (r, q) < registrada[::-1])):
+            invalidate_map_cache(map_data)
+            return
+        cache["terreno"][r][q], cache["ambiente"][r][q], cache["local"][r][q] = t_str, a_str, l_val
+        for camada in CAMADAS_VALOR:
+            if camada in map_data: cache[camada][r][q] = map_data[camada][r][q]
+        if is_location(l_val) and l_val not in locations:
+            locations[l_val] = (q, r)
+            novos.append(l_val)
+
+    cache["rotas"].clear()
+    for derivado in ["codigos", "matrizes", "raster", "valores", "custos"]: cache.pop(derivado, None)
+    for tabela in cache["tabela_locais"].values():
+        _refazer_pares(tabela, celulas, novos)
+
+def get_terrain_info(map_data, q, r):
+    """Decodifica a célula (q,r) para strings legíveis."""
+    dec = decode_map(map_data)
+    if not (0 <= q < dec["w"] and 0 <= r < dec["h"]): return "vazio", "vazio", None
+    return dec["terreno"][r][q], dec["ambiente"][r][q], dec["local"][r][q]
 
 def get_visual_idx(t_str, l_val):
     """Converte string de terreno para índice de cor."""
     if l_val and l_val not in ["None", "null", "0"]: return 6 # Acampamento
     return STR_TO_IDX.get(t_str, 5) # Default Vazio
 
+# Consultas de local (inclusive as feitas pela IA), para o perfil do tick
+LOCAL_STATS = {"buscas": 0, "achados": 0, "tempo_s": 0.0}
+
 def get_location_coords(map_data, loc_name):
     """Acha coordenadas de um local pelo nome."""
-    target = next((k for k, v in map_data["metadata"].get("local_atual_map", {}).items() if v == loc_name), None)
-    if target:
-        for r in range(HEIGHT):
-            for q in range(WIDTH):
-                if str(map_data["local_atual"][r][q]) == target: return q, r
-    return None, None
+    t0 = time.perf_counter()
+    coords = decode_map(map_data)["locations"].get(loc_name, (None, None))
+    LOCAL_STATS["buscas"] += 1
+    if coords[0] is not None: LOCAL_STATS["achados"] += 1
+    LOCAL_STATS["tempo_s"] += time.perf_counter() - t0
+    return coords
 
 # ==============================================================================
 # 4. IA, PATHFINDING E MOVIMENTO
 # ==============================================================================
 
-def calculate_movement(entity, t_str, ent_data_root):
-    """Calcula pontos de movimento para o terreno usando o transporte atual."""
-    modo = entity.get("modo_transporte", "a_pe")
+def movement_points(modo, t_str, ent_data_root):
+    """Pontos de movimento por dia no terreno com o transporte `modo`, sem as camadas da célula.
+
+    Para uma célula do mapa use cell_movement/movement_raster (que aplicam as camadas de valor).
+    """
     config = get_transport_config(ent_data_root, modo)
     
     # Verifica restrições (Terrenos Proibidos)
@@ -171,11 +280,59 @@ def calculate_movement(entity, t_str, ent_data_root):
     # Conversão para "Pontos de Progresso"
     return (vel_km_dia / LARGURA_CELULA_KM) * PONTOS_DIARIOS_MAX
 
+# --- Rasters de movimento ---
+# valor_movimentacao é o custo para entrar na célula (1 = normal, 2 = o dobro do tempo, 0.5 = metade),
+# então os pontos por dia são os do terreno divididos por ele. valor_estabilidade diz o quanto é difícil
+# se manter ali (mais alto = pior): multiplica só o peso do A*, as rotas evitam células instáveis sem
+# mudar o tempo de viagem. Os dois saem uma vez por transporte, inteiros, junto do mapa decodificado:
+# no laço do A* o custo de um vizinho é só pesos[r][q]. Valor <= 0 na camada (célula sem valor no
+# codificador) conta como 1.
+def _multiplicador(map_data, camada):
+    valores = map_values(map_data, camada)
+    return np.where(valores > 0, valores, 1.0)
+
+def _custos(map_data, ent_data_root, modo):
+    dec = decode_map(map_data)
+    custos = dec.setdefault("custos", {})
+    chave = _chave_transporte(ent_data_root, modo)
+    if chave not in custos:
+        codigos, nomes = _map_arrays(dec)["terreno"]
+        base = np.array([movement_points(modo, t, ent_data_root) for t in nomes])[codigos]
+        pontos = base / _multiplicador(map_data, "valor_movimentacao")
+        pesos = np.where(pontos > 0.01, 1.0 / (pontos + 0.01) * _multiplicador(map_data, "valor_estabilidade"), np.nan)
+        custos[chave] = {"pontos": pontos, "linhas": pontos.tolist(),
+                         "pesos": [[None if p != p else p for p in linha] for linha in pesos.tolist()]}
+    return custos[chave]
+
+def movement_raster(map_data, ent_data_root, modo):
+    """Matriz numpy (h, w) de pontos por dia em cada célula com o transporte `modo`."""
+    return _custos(map_data, ent_data_root, modo)["pontos"]
+
+def route_weights(map_data, ent_data_root, modo):
+    """Peso de entrar em cada célula no A* (listas [r][q]; None = intransponível)."""
+    return _custos(map_data, ent_data_root, modo)["pesos"]
+
+def cell_movement(map_data, ent, ent_data_root, q, r, modo=None):
+    """Pontos por dia na célula (q, r) com o transporte atual da entidade (ou `modo`)."""
+    return _custos(map_data, ent_data_root, modo or current_mode(ent))["linhas"][r][q]
+
 def heuristic(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-def find_path_astar(start, goal, map_data, entity, ent_data_root, limit=1000):
-    """Pathfinding A* que considera o transporte da entidade."""
+# Contadores acumulados do A* (zerar com reset_astar_stats)
+ASTAR_STATS = {"buscas": 0, "nos_expandidos": 0, "falhas": 0}
+
+def reset_astar_stats():
+    for k in ASTAR_STATS: ASTAR_STATS[k] = 0
+
+def find_path_astar(start, goal, map_data, entity, ent_data_root, limit=1000, area=None):
+    """Pathfinding A* que considera o transporte da entidade.
+
+    area: dict que recebe o retângulo de células que a busca leu (ver _area_lida).
+    """
+    dec = decode_map(map_data) # uma consulta ao cache por busca, não por vizinho
+    w, h = dec["w"], dec["h"]
+    pesos = route_weights(map_data, ent_data_root, current_mode(entity))
     start_node, goal_node = (start[0], start[1]), (goal[0], goal[1])
     frontier = []; heapq.heappush(frontier, (0, start_node))
     came_from = {start_node: None}; cost_so_far = {start_node: 0}
@@ -190,15 +347,10 @@ def find_path_astar(start, goal, map_data, entity, ent_data_root, limit=1000):
 
         for dx, dy in [(0,1), (0,-1), (1,0), (-1,0)]:
             nq, nr = current[0]+dx, current[1]+dy
-            if not (0 <= nq < WIDTH and 0 <= nr < HEIGHT): continue
+            if not (0 <= nq < w and 0 <= nr < h): continue
             
-            t_next, _, _ = get_terrain_info(map_data, nq, nr)
-            pts = calculate_movement(entity, t_next, ent_data_root)
-            
-            if pts <= 0.01: continue # Intransponível com transporte atual
-            
-            # Custo para o A* (inverso da velocidade)
-            move_cost = 1.0 / (pts + 0.01)
+            move_cost = pesos[nr][nq] # inverso da velocidade (ver route_weights)
+            if move_cost is None: continue # Intransponível com transporte atual
             new_cost = cost_so_far[current] + move_cost
             
             next_node = (nq, nr)
@@ -208,7 +360,12 @@ def find_path_astar(start, goal, map_data, entity, ent_data_root, limit=1000):
                 heapq.heappush(frontier, (prio, next_node))
                 came_from[next_node] = current
 
-    if goal_node not in came_from: return None
+    ASTAR_STATS["buscas"] += 1
+    ASTAR_STATS["nos_expandidos"] += visited
+    if area is not None: area.update(_area_lida(came_from))
+    if goal_node not in came_from:
+        ASTAR_STATS["falhas"] += 1
+        return None
     
     path = []
     curr = goal_node
@@ -218,8 +375,329 @@ def find_path_astar(start, goal, map_data, entity, ent_data_root, limit=1000):
     path.reverse()
     return path
 
-def decide_ia_goal(ent, map_data, ent_data_root):
-    """IA Central: Decide meta baseada em Casa, Tempo e Recursos."""
+def _area_lida(came_from):
+    """Retângulo que cobre tudo o que o A* leu do mapa: os nós alcançados e os vizinhos deles.
+
+    A busca só olha as células vizinhas das que expandiu, então uma edição fora dele não muda o resultado.
+    """
+    qs = [n[0] for n in came_from]; rs = [n[1] for n in came_from]
+    return {"q0": min(qs) - 1, "r0": min(rs) - 1, "q1": max(qs) + 1, "r1": max(rs) + 1}
+
+# --- Transporte atual e rotas multimodais ---
+# Com config["rota_multimodal"], quem tem mais de um transporte (modo_transporte + flags tem_*) planeja
+# sobre (célula, transporte). Trocar de transporte só vale ao entrar ou sair de um local do mapa
+# (porto/acampamento), exceto montar/desmontar do cavalo, que vale em qualquer lugar. A troca acontece
+# junto com o passo, então o transporte em uso sempre consegue estar na célula atual.
+FLAGS_TRANSPORTE = {"tem_cavalo": "cavalo", "tem_barco": "barco_rio", "tem_barco_rio": "barco_rio", "tem_navio": "navio_oceano"}
+TROCA_LIVRE = {"a_pe", "cavalo"}
+CUSTO_TROCA_DIAS = 1.0 # penalidade no A* por troca, em dias de viagem
+
+def current_mode(ent):
+    """Transporte em uso: modo_temporario (trecho atual da viagem) ou o modo_transporte de sempre."""
+    return ent.get("modo_temporario") or ent.get("modo_transporte", "a_pe")
+
+def available_modes(ent):
+    modos = [ent.get("modo_transporte", "a_pe")]
+    for flag, modo in FLAGS_TRANSPORTE.items():
+        if ent.get(flag) and modo not in modos: modos.append(modo)
+    if current_mode(ent) not in modos: modos.append(current_mode(ent))
+    return modos
+
+def uses_multimodal(ent, ent_data_root):
+    return bool(ent_data_root.get("config", {}).get("rota_multimodal")) and len(available_modes(ent)) > 1
+
+def is_location(l_val):
+    return l_val not in (None, "None", "null", "0")
+
+def find_path_multimodal(start, goal, map_data, entity, ent_data_root, limit=4000, area=None):
+    """A* sobre (célula, transporte). Retorna [(q, r, modo usado para entrar na célula)] ou None."""
+    dec = decode_map(map_data)
+    w, h, local = dec["w"], dec["h"], dec["local"]
+    modos = available_modes(entity)
+    troca = CUSTO_TROCA_DIAS / PONTOS_DIARIOS_MAX # 1 dia ~ 1/50 do custo (custo de célula ~ 1/pontos)
+    pesos = {m: route_weights(map_data, ent_data_root, m) for m in modos}
+    goal_cell = (goal[0], goal[1])
+    start_node = (start[0], start[1], current_mode(entity))
+    frontier = [(0, start_node)]
+    came_from = {start_node: None}; cost_so_far = {start_node: 0}
+
+    goal_node, visited = None, 0
+    while frontier:
+        visited += 1
+        if visited > limit: break
+
+        _, current = heapq.heappop(frontier)
+        q, r, m = current
+        if (q, r) == goal_cell: goal_node = current; break
+        em_local = is_location(local[r][q])
+
+        for dx, dy in [(0,1), (0,-1), (1,0), (-1,0)]:
+            nq, nr = q+dx, r+dy
+            if not (0 <= nq < w and 0 <= nr < h): continue
+            pode_trocar = em_local or is_location(local[nr][nq])
+            for m2 in modos:
+                if m2 != m and not (pode_trocar or (m in TROCA_LIVRE and m2 in TROCA_LIVRE)): continue
+                peso = pesos[m2][nr][nq]
+                if peso is None: continue
+
+                new_cost = cost_so_far[current] + peso + (troca if m2 != m else 0)
+                next_node = (nq, nr, m2)
+                if next_node not in cost_so_far or new_cost < cost_so_far[next_node]:
+                    cost_so_far[next_node] = new_cost
+                    heapq.heappush(frontier, (new_cost + heuristic(goal_cell, (nq, nr)), next_node))
+                    came_from[next_node] = current
+
+    ASTAR_STATS["buscas"] += 1
+    ASTAR_STATS["nos_expandidos"] += visited
+    if area is not None: area.update(_area_lida(came_from))
+    if goal_node is None:
+        ASTAR_STATS["falhas"] += 1
+        return None
+
+    path = []
+    curr = goal_node
+    while curr != start_node:
+        path.append(curr)
+        curr = came_from[curr]
+    path.reverse()
+    return path
+
+def plan_route(map_data, ent, ent_data_root):
+    """Rota do dia para a meta atual: multimodal quando ligado e a entidade tem como trocar."""
+    start, goal = (ent["q"], ent["r"]), (ent["meta_q"], ent["meta_r"])
+    achou, path = location_route(map_data, ent, ent_data_root, start, goal)
+    if achou: return path
+    if uses_multimodal(ent, ent_data_root): path = find_path_multimodal(start, goal, map_data, ent, ent_data_root)
+    else: path = find_path_astar(start, goal, map_data, ent, ent_data_root)
+    return join_location_route(map_data, ent, ent_data_root, start, goal, path)
+
+def route_segments(ent, path):
+    """Agrupa a rota em trechos [{"modo", "de", "ate", "celulas"}] (rota simples = um trecho só)."""
+    trechos, atual, modo = [], [ent["q"], ent["r"]], current_mode(ent)
+    for passo in path or []:
+        m = passo[2] if len(passo) == 3 else modo
+        if not trechos or m != trechos[-1]["modo"]:
+            trechos.append({"modo": m, "de": atual, "ate": atual, "celulas": 0})
+        trechos[-1]["ate"] = [passo[0], passo[1]]
+        trechos[-1]["celulas"] += 1
+        atual = [passo[0], passo[1]]
+    return trechos
+
+# --- Rotas em cache e ETA ---
+# Rotas ficam guardadas junto do mapa decodificado (invalidate_map_cache também as descarta),
+# pela chave transporte + configuração dele + início + meta.
+LIMITE_ROTAS_CACHE = 20000
+
+def _chave_transporte(ent_data_root, modo):
+    cfg = get_transport_config(ent_data_root, modo)
+    return (modo, cfg.get("speed"), tuple(cfg.get("restrict", [])), cfg.get("cost_mod"))
+
+def _chave_rota(ent, ent_data_root):
+    """Tudo do transporte da entidade que muda o resultado da busca."""
+    multi = uses_multimodal(ent, ent_data_root)
+    modos = available_modes(ent) if multi else [current_mode(ent)]
+    return (multi, current_mode(ent), tuple(_chave_transporte(ent_data_root, m) for m in modos))
+
+def cached_route(map_data, ent, ent_data_root, start=None, goal=None):
+    """plan_route com cache. Sem start/goal usa a posição e a meta atuais da entidade."""
+    start = tuple(start or (ent["q"], ent["r"]))
+    goal = tuple(goal or (ent["meta_q"], ent["meta_r"]))
+    achou, path = location_route(map_data, ent, ent_data_root, start, goal)
+    if achou: return path
+    chave = (*_chave_rota(ent, ent_data_root), start, goal)
+    multi = chave[0]
+    rotas = decode_map(map_data)["rotas"]
+    if chave not in rotas:
+        if len(rotas) >= LIMITE_ROTAS_CACHE: rotas.clear()
+        if multi: path = find_path_multimodal(start, goal, map_data, ent, ent_data_root)
+        else: path = find_path_astar(start, goal, map_data, ent, ent_data_root)
+        rotas[chave] = join_location_route(map_data, ent, ent_data_root, start, goal, path)
+    return rotas[chave]
+
+def estimate_eta(map_data, ent, ent_data_root):
+    """Dias até a entidade chegar na meta seguindo a rota planejada, sem simular o mundo.
+
+    Soma os pontos de movimento célula a célula como o process_tick faz (um avanço por dia,
+    sobra de progresso_diario carregada), com o transporte de cada trecho. Não prevê troca de meta: se o
+    prazo de voltar pra casa vence antes da chegada, "casa_antes" vem True.
+    """
+    res = {"nome": ent["nome"], "dias": None, "passos": 0, "chegada_dia": None, "casa_antes": False, "motivo": None}
+    if ent.get("q") is None or ent.get("meta_q") is None: return {**res, "motivo": "sem posição ou sem meta"}
+    if ent.get("status") == "parado": return {**res, "motivo": "parada"}
+    if (ent["q"], ent["r"]) == (ent["meta_q"], ent["meta_r"]): return {**res, "dias": 0, "chegada_dia": ent_data_root.get("config", {}).get("dia_mundo", 0)}
+
+    path = cached_route(map_data, ent, ent_data_root)
+    if not path: return {**res, "motivo": "rota impossível"}
+
+    dias, travada = _route_days(map_data, (ent["q"], ent["r"]), path, current_mode(ent), ent.get("progresso_diario", 0), ent_data_root)
+    if travada: return {**res, "passos": len(path), "motivo": f"travada em {travada[0]} ({travada[1]})"}
+
+    freq = ent.get("return_freq_days")
+    casa_antes = bool(ent["tipo"] != "player" and ent.get("home_location") and freq
+                      and freq - ent.get("days_since_home", 0) < dias)
+    hoje = ent_data_root.get("config", {}).get("dia_mundo", 0)
+    return {**res, "dias": dias, "passos": len(path), "chegada_dia": hoje + dias, "casa_antes": casa_antes}
+
+def _route_days(map_data, start, path, modo, prog, ent_data_root):
+    """(dias para percorrer `path` saindo de `start`, None) ou (None, (célula, terreno) onde trava)."""
+    dias, atual = 0, tuple(start)
+    for prox in path:
+        pts = cell_movement(map_data, None, ent_data_root, *atual, modo=modo)
+        if pts <= 0: return None, (atual, get_terrain_info(map_data, *atual)[0])
+        while True: # mesma soma do tick: acumula todo dia, anda uma célula no dia em que passa do máximo
+            dias += 1; prog += pts
+            if prog >= PONTOS_DIARIOS_MAX: break
+        prog -= PONTOS_DIARIOS_MAX
+        atual = (prox[0], prox[1])
+        if len(prox) == 3: modo = prox[2]
+    return dias, None
+
+def estimate_all_etas(map_data, ent_data):
+    """ETA de todas as entidades com meta, da chegada mais próxima para a mais distante."""
+    etas = [estimate_eta(map_data, e, ent_data) for e in all_entities(ent_data)]
+    return sorted(etas, key=lambda x: (x["dias"] is None, x["dias"] or 0, x["nome"]))
+
+# --- Tabela de rotas entre locais ---
+# Locais nomeados (acampamentos, vilas do create_location_menu) são as metas e casas mais comuns.
+# Para cada transporte as rotas de todos os locais até um local são calculadas de uma vez, na primeira
+# vez que alguém vai para ele com aquele transporte, e ficam junto do mapa decodificado. As rotas
+# que chegam num mesmo local são juntadas numa árvore (a que encontra uma rota já guardada segue por
+# ela), então de qualquer passo de qualquer uma delas o resto do caminho é um só: quem sai de um local,
+# ou já está em cima de uma dessas rotas, só consulta a tabela, e a ETA bate com o que o tick faz.
+# Cada par guarda a área que a busca leu: update_cells (e o create_location) refaz só os pares cuja
+# área tem alguma célula editada, então a tabela sai igual à montada do zero.
+TABELA_STATS = {"consultas": 0, "achadas": 0, "pares": 0}
+
+def _chave_tabela(ent, ent_data_root):
+    """Como _chave_rota, mas na multimodal fica o transporte de sempre: a troca no meio da viagem não muda a tabela."""
+    multi, modo, transportes = _chave_rota(ent, ent_data_root)
+    return (multi, ent.get("modo_transporte", "a_pe") if multi else modo, transportes)
+
+def _location_names(dec):
+    return sorted(n for n, (q, _) in dec["locations"].items() if is_location(n) and q is not None)
+
+def _refazer_pares(tabela, celulas, novos):
+    for par, entrada in tabela["pares"].items():
+        a = entrada["area"]
+        if any(a["q0"] <= q <= a["q1"] and a["r0"] <= r <= a["r1"] for q, r in celulas): tabela["pendentes"].add(par)
+    for nome in novos:
+        for outro in tabela["locais"]:
+            tabela["pendentes"].update({(nome, outro), (outro, nome)})
+        tabela["locais"] = sorted(tabela["locais"] + [nome])
+
+def _montar_arvore(tabela, dec, map_data, ent_data_root, d):
+    """Junta as rotas até o destino `d` (origens em ordem alfabética) e indexa cada passo delas."""
+    multi, modo = tabela["chave"][0], tabela["chave"][1]
+    passos = tabela["indice"][d] = {}
+    for o in tabela["locais"]:
+        if o == d: continue
+        busca = tabela["pares"][(o, d)]["caminho"]
+        if busca is None:
+            tabela["rotas"][(o, d)] = {"caminho": None, "dias": None}
+            continue
+        sq, sr = dec["locations"][o]
+        nos = [(sq, sr, modo) if multi else (sq, sr)] + [tuple(p) for p in busca[:-1]]
+        rota, novos = busca, len(nos)
+        for i, no in enumerate(nos):
+            if no in passos: # encontrou a árvore: dali em diante segue a rota já guardada
+                o2, j = passos[no]
+                rota, novos = busca[:i] + tabela["rotas"][(o2, d)]["caminho"][j + 1:], i
+                break
+        for i in range(novos): passos[nos[i]] = (o, i - 1) # passo i-1 da rota (-1 = o próprio local)
+        dias = _route_days(map_data, (sq, sr), rota, modo, 0, ent_data_root)[0]
+        tabela["rotas"][(o, d)] = {"caminho": rota, "dias": dias}
+
+def _location_table(map_data, ent, ent_data_root, destino=None):
+    """Tabela de locais do transporte da entidade, calculando o que estiver pendente (só até `destino`, se dado)."""
+    dec = decode_map(map_data)
+    chave = _chave_tabela(ent, ent_data_root)
+    tabela = dec["tabela_locais"].get(chave)
+    if tabela is None:
+        locais = _location_names(dec)
+        tabela = dec["tabela_locais"][chave] = {"chave": chave, "locais": locais, "pares": {}, "rotas": {}, "indice": {},
+                                                "pendentes": {(o, d) for o in locais for d in locais if o != d}}
+    pendentes = sorted(p for p in tabela["pendentes"] if destino is None or p[1] == destino)
+    if not pendentes: return tabela
+
+    # Busca saindo do local com o transporte da chave (não o trecho em que a entidade está agora)
+    modelo = {k: ent.get(k) for k in ["nome", *FLAGS_TRANSPORTE]}
+    modelo["modo_transporte"] = chave[1] if chave[0] else ent.get("modo_transporte", "a_pe")
+    modelo["modo_temporario"] = None if chave[0] else ent.get("modo_temporario")
+    busca = find_path_multimodal if chave[0] else find_path_astar
+    for o, d in pendentes:
+        area = {}
+        path = busca(dec["locations"][o], dec["locations"][d], map_data, modelo, ent_data_root, area=area)
+        tabela["pares"][(o, d)] = {"caminho": path, "area": area}
+        TABELA_STATS["pares"] += 1
+    tabela["pendentes"].difference_update(pendentes)
+    for d in sorted({d for _, d in pendentes}): _montar_arvore(tabela, dec, map_data, ent_data_root, d)
+    return tabela
+
+def _table_for_goal(map_data, ent, ent_data_root, start, goal):
+    """(tabela, nome do local) se `goal` é a célula de um local, senão None."""
+    dec = decode_map(map_data)
+    gq, gr = goal
+    if not (0 <= gq < dec["w"] and 0 <= gr < dec["h"]) or tuple(start) == tuple(goal): return None
+    destino = dec["local"][gr][gq]
+    if not is_location(destino) or dec["locations"].get(destino) != (gq, gr): return None
+    return _location_table(map_data, ent, ent_data_root, destino), destino
+
+def _passo(ent, multi, q, r):
+    return (q, r, current_mode(ent)) if multi else (q, r)
+
+def location_route(map_data, ent, ent_data_root, start, goal):
+    """Rota pela tabela de locais: (True, caminho ou None se impossível) ou (False, None) se não se aplica.
+
+    Vale quando a meta é a célula de um local e o início é outro local ou um passo de uma rota da
+    tabela até essa meta (com o mesmo transporte em uso, na rota multimodal).
+    """
+    achada = _table_for_goal(map_data, ent, ent_data_root, start, goal)
+    if achada is None: return False, None
+    tabela, destino = achada
+    TABELA_STATS["consultas"] += 1
+    multi = tabela["chave"][0]
+    no = tabela["indice"].get(destino, {}).get(_passo(ent, multi, *start))
+    if no is not None:
+        TABELA_STATS["achadas"] += 1
+        return True, tabela["rotas"][(no[0], destino)]["caminho"][no[1] + 1:]
+    dec = decode_map(map_data)
+    origem = dec["local"][start[1]][start[0]]
+    if dec["locations"].get(origem) == tuple(start) and (origem, destino) in tabela["rotas"] \
+            and (not multi or current_mode(ent) == tabela["chave"][1]): # sem rota entre os dois locais
+        TABELA_STATS["achadas"] += 1
+        return True, None
+    return False, None
+
+def join_location_route(map_data, ent, ent_data_root, start, goal, path):
+    """Rota do A* até um local que cruza a tabela: do cruzamento em diante segue a rota da tabela."""
+    achada = _table_for_goal(map_data, ent, ent_data_root, start, goal) if path else None
+    if achada is None: return path
+    tabela, destino = achada
+    passos = tabela["indice"].get(destino, {})
+    for i, passo in enumerate(path[:-1]):
+        no = passos.get(tuple(passo))
+        if no is not None: return path[:i + 1] + tabela["rotas"][(no[0], destino)]["caminho"][no[1] + 1:]
+    return path
+
+def location_table(map_data, ent, ent_data_root):
+    """Dias de viagem entre todos os locais com o transporte da entidade: {"locais", "dias": {origem: {destino: dias}}}.
+
+    dias None = sem rota. Conta a partir do progresso zerado, saindo com o transporte de sempre.
+    """
+    tabela = _location_table(map_data, ent, ent_data_root)
+    dias = {o: {d: tabela["rotas"][(o, d)]["dias"] for d in tabela["locais"] if d != o} for o in tabela["locais"]}
+    return {"transporte": tabela["chave"][1], "multimodal": tabela["chave"][0], "locais": list(tabela["locais"]), "dias": dias}
+
+def _home_unreachable(map_data, ent, ent_data_root, hq, hr):
+    """True se a tabela de locais garante que não há rota daqui até a casa."""
+    achou, path = location_route(map_data, ent, ent_data_root, (ent["q"], ent["r"]), (hq, hr))
+    return achou and path is None
+
+def decide_ia_goal(ent, map_data, ent_data_root, grupos=None):
+    """IA Central: Decide meta baseada em Casa, Tempo e Recursos.
+
+    grupos: posições dos grupos perto (ver _grupos_perto); None = consulta o índice espacial.
+    """
     
     # 1. Lógica de Casa (Home Binding)
     if ent.get("home_location") and ent.get("return_freq_days"):
@@ -228,81 +706,548 @@ def decide_ia_goal(ent, map_data, ent_data_root):
             if hq is not None:
                 if ent["q"] == hq and ent["r"] == hr:
                     ent["days_since_home"] = 0 # Já está em casa, reseta
-                else:
-                    return hq, hr # Vai pra casa
+                elif not _home_unreachable(map_data, ent, ent_data_root, hq, hr):
+                    return hq, hr # Vai pra casa (sem rota daqui, segue vagando em vez de travar)
 
     # 2. Se não tem meta, ou chegou na meta
-    if ent.get("meta_q") is None or (ent["q"] == ent["meta_q"] and ent["r"] == ent["meta_r"]):
-        return generate_random_goal(ent, map_data, ent_data_root)
+    if needs_new_goal(ent):
+        return choose_goal(ent, map_data, ent_data_root, grupos)
     
     return ent["meta_q"], ent["meta_r"]
 
-def generate_random_goal(ent, map_data, ent_data_root):
-    """Gera uma meta aleatória que seja possível alcançar (tentativa)."""
-    for _ in range(10): 
-        rq, rr = random.randint(0, WIDTH-1), random.randint(0, HEIGHT-1)
-        t, _, _ = get_terrain_info(map_data, rq, rr)
-        if calculate_movement(ent, t, ent_data_root) > 0: return rq, rr
-    return ent["q"], ent["r"]
+def needs_new_goal(ent):
+    return ent["tipo"] != "player" and (ent.get("meta_q") is None or (ent["q"] == ent["meta_q"] and ent["r"] == ent["meta_r"]))
+
+# --- Escolha de meta ---
+# Em vez de sortear células do mapa inteiro (que davam metas do outro lado do mundo ou inalcançáveis,
+# e um A* que falhava), a IA dá nota de uma vez a todas as células a até RAIO_META da entidade, com
+# matrizes numpy: distância andando (busca em largura só por onde o transporte passa, então toda
+# candidata é alcançável), ambiente preferido, distância da casa (pesa mais perto do prazo de voltar)
+# e distância de outros grupos. Fica a de maior nota; um pouco de ruído do sorteio do mundo desempata.
+RAIO_META = 12
+DISTANCIA_META = 6 # células: nem ali do lado, nem longe demais
+PREFERENCIA_AMBIENTE = {"floresta": 0.6, "campo": 0.5, "rio": 0.3, "montanha": -0.3, "geleira": -0.6}
+PESO_CASA = 1.5
+RAIO_EVITAR, PESO_EVITAR = 3, 1.0 # grupos a até 3 células tiram nota (tudo dentro de RAIO_META + RAIO_EVITAR)
+RUIDO_META = 0.3
+META_STATS = {"escolhas": 0, "candidatas": 0}
+
+def _map_arrays(dec):
+    """Terreno e ambiente do mapa decodificado como matrizes de códigos (guardadas no cache)."""
+    if "matrizes" not in dec:
+        matrizes = {}
+        for camada in ["terreno", "ambiente"]:
+            nomes = sorted({v for linha in dec[camada] for v in linha})
+            indice = {v: i for i, v in enumerate(nomes)}
+            matrizes[camada] = (np.array([[indice[v] for v in linha] for linha in dec[camada]], dtype=np.int16), nomes)
+        dec["matrizes"] = matrizes
+    return dec["matrizes"]
+
+def map_values(map_data, camada):
+    """Camada numérica do mapa (valor_movimentacao, valor_estabilidade) como matriz float (no cache)."""
+    dec = decode_map(map_data)
+    valores = dec.setdefault("valores", {})
+    if camada not in valores: valores[camada] = np.array(dec[camada], dtype=float).reshape(dec["h"], dec["w"])
+    return valores[camada]
+
+def _grupos_perto(ent_data, ent):
+    """Posições dos grupos que podem tirar nota das candidatas de `ent` (ordenadas: a soma sai sempre igual)."""
+    perto = indice_espacial.no_raio(ent_data, ent["q"], ent["r"], RAIO_META + RAIO_EVITAR)
+    return sorted((e["q"], e["r"]) for _, e in perto if e is not ent and e["tipo"] == "grupo")
 
-def process_tick(map_data, ent_data, days=1):
+def _distancia_andando(livre, q, r):
+    """Passos (4 direções, só por células livres) de (q, r) até cada célula da janela; -1 = não chega."""
+    dist = np.full(livre.shape, -1, dtype=np.int32)
+    dist[r, q] = 0
+    alcance = np.zeros_like(livre); alcance[r, q] = True
+    borda, passo = alcance.copy(), 0
+    while borda.any():
+        passo += 1
+        viz = np.zeros_like(livre)
+        viz[1:] |= borda[:-1]; viz[:-1] |= borda[1:]; viz[:, 1:] |= borda[:, :-1]; viz[:, :-1] |= borda[:, 1:]
+        borda = viz & livre & ~alcance
+        dist[borda] = passo
+        alcance |= borda
+    return dist
+
+def goal_scores(ent, map_data, ent_data_root, grupos=None):
+    """(nota de cada célula da janela em volta da entidade, q0, r0). -inf = não serve de meta."""
+    dec = decode_map(map_data)
+    matrizes = _map_arrays(dec)
+    q, r = ent["q"], ent["r"]
+    q0, r0 = max(0, q - RAIO_META), max(0, r - RAIO_META)
+    q1, r1 = min(dec["w"], q + RAIO_META + 1), min(dec["h"], r + RAIO_META + 1)
+    ambiente, nomes_a = matrizes["ambiente"]
+    livre = movement_raster(map_data, ent_data_root, current_mode(ent))[r0:r1, q0:q1] > 0.01 # mesmo corte do A*
+
+    dist = _distancia_andando(livre, q - q0, r - r0)
+    nota = -np.abs(dist - DISTANCIA_META) / DISTANCIA_META
+    preferencia = ent.get("preferencia_ambiente") or PREFERENCIA_AMBIENTE
+    nota += np.array([preferencia.get(a, 0.0) for a in nomes_a])[ambiente[r0:r1, q0:q1]]
+
+    qs, rs = np.arange(q0, q1)[None, :], np.arange(r0, r1)[:, None]
+    freq = ent.get("return_freq_days")
+    if ent.get("home_location") and freq:
+        hq, hr = get_location_coords(map_data, ent["home_location"])
+        if hq is not None:
+            pressao = min(1.0, ent.get("days_since_home", 0) / freq)
+            nota -= PESO_CASA * pressao * (np.abs(qs - hq) + np.abs(rs - hr)) / RAIO_META
+
+    for gq, gr in (_grupos_perto(ent_data_root, ent) if grupos is None else grupos):
+        perto = RAIO_EVITAR + 1 - (np.abs(qs - gq) + np.abs(rs - gr))
+        nota -= PESO_EVITAR * np.clip(perto, 0, None) / (RAIO_EVITAR + 1)
+
+    # Ruído do sorteio (semente do mundo, dia, entidade): reproduzível e independente da ordem
+    rng = rng_mundo(ent_data_root, ent_data_root["config"].get("dia_mundo", 0), ent["nome"])
+    nota += np.random.default_rng(rng.getrandbits(64)).random(nota.shape) * RUIDO_META
+    nota[dist <= 0] = -np.inf # inalcançável ou a própria célula
+    return nota, q0, r0
+
+def choose_goal(ent, map_data, ent_data_root, grupos=None):
+    """Melhor célula em volta da entidade para ir; fica onde está se não há nenhuma."""
+    nota, q0, r0 = goal_scores(ent, map_data, ent_data_root, grupos)
+    candidatas = int(np.isfinite(nota).sum())
+    META_STATS["escolhas"] += 1
+    META_STATS["candidatas"] += candidatas
+    if not candidatas: return ent["q"], ent["r"]
+    r, q = np.unravel_index(int(np.argmax(nota)), nota.shape)
+    return q0 + int(q), r0 + int(r)
+
+# --- Perfil do tick ---
+# Tempo por fase + contadores de cada chamada do process_tick. Custa alguns perf_counter por
+# entidade/dia, então fica sempre ligado. "meta_ia" inclui as consultas de local feitas pela IA.
+FASES_TICK = ["meta_ia", "astar", "locais", "salvar", "imagem"]
+
+def _contadores():
+    return {**{f"astar_{k}": v for k, v in ASTAR_STATS.items()},
+            **{f"mapa_cache_{k}": v for k, v in MAP_CACHE_STATS.items()},
+            **{f"locais_{k}": v for k, v in LOCAL_STATS.items()},
+            **{f"tabela_{k}": v for k, v in TABELA_STATS.items()},
+            **{f"metas_{k}": v for k, v in META_STATS.items()}}
+
+def _fechar_perfil(perfil, antes, total_s):
+    depois = _contadores()
+    delta = {k: depois[k] - antes[k] for k in depois}
+    perfil["fases"]["locais"] = delta.pop("locais_tempo_s")
+    perfil["total_s"] = total_s
+    perfil["fases"]["outros"] = max(0.0, total_s - sum(perfil["fases"].values()))
+    perfil["contadores"].update(delta)
+    c = perfil["contadores"]
+    hits, misses = c["mapa_cache_hits"], c["mapa_cache_misses"]
+    c["mapa_cache_taxa"] = hits / (hits + misses) if hits + misses else None
+    c["locais_taxa"] = c["locais_achados"] / c["locais_buscas"] if c["locais_buscas"] else None
+    return perfil
+
+def imprimir_perfil(perfil):
+    total = perfil["total_s"] or 1e-9
+    c = perfil["contadores"]
+    print(f"{C['C']}📊 Perfil do tick: {perfil['dias']} dia(s) em {perfil['total_s']*1000:.1f} ms{C['R']}")
+    for fase, seg in perfil["fases"].items():
+        print(f"   {fase:<8} {seg*1000:>10.1f} ms  {100*seg/total:5.1f}%")
+    taxa = lambda v: "-" if v is None else f"{100*v:.0f}%"
+    print(f"   A*: {c['astar_buscas']} buscas, {c['astar_nos_expandidos']} nós, {c['astar_falhas']} falhas | "
+          f"movidas: {c['entidades_movidas']} entidades, {c['movimentos']} células, {c['encontros']} encontros | "
+          f"cache mapa: {taxa(c['mapa_cache_taxa'])} | locais achados: {taxa(c['locais_taxa'])}")
+    print(f"   Agendador: {c['acordadas']} de {c['entidades_dia']} entidade-dias processados | "
+          f"tabela de locais: {c['tabela_achadas']} de {c['tabela_consultas']} rotas, {c['tabela_pares']} pares calculados | "
+          f"metas: {c['metas_escolhas']} escolhidas entre {c['metas_candidatas']} células")
+
+def gravar_trace(perfil, path):
+    """Acrescenta o perfil como uma linha JSON no arquivo de trace."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(perfil, ensure_ascii=False) + "\n")
+
+def step_entity(ent, map_data, ent_data, dia, fases, eventos, grupos=None):
+    """Um dia de uma entidade: meta da IA, A* e avanço. Retorna True se mudou de célula.
+
+    Só lê o mapa (e, na escolha de meta, onde os grupos estavam no começo do dia, pelo índice espacial
+    ou por `grupos`) e mexe na própria entidade, então a ordem entre entidades não altera o resultado.
+    """
+    perf = time.perf_counter
+    nome = ent["nome"]
+    ent["days_since_home"] = ent.get("days_since_home", 0) + 1
+
+    # IA decide meta (apenas NPCs/Grupos)
+    if ent["tipo"] != "player":
+        t0 = perf()
+        nq, nr = decide_ia_goal(ent, map_data, ent_data, grupos)
+        fases["meta_ia"] += perf() - t0
+        if ent["days_since_home"] == 0: eventos.append({"dia": dia, "tipo": "casa", "nome": nome, "q": ent["q"], "r": ent["r"]})
+        if (nq, nr) != (ent.get("meta_q"), ent.get("meta_r")):
+            eventos.append({"dia": dia, "tipo": "meta", "nome": nome, "q": nq, "r": nr})
+        ent["meta_q"], ent["meta_r"] = nq, nr
+    
+    if not ent.get("meta_q"): return False
+
+    # Pathfinding
+    t0 = perf()
+    path = plan_route(map_data, ent, ent_data)
+    fases["astar"] += perf() - t0
+    
+    if not path:
+        # Bloqueado! Se tiver casa, tenta voltar pra lá pra "pegar barco"
+        if ent.get("home_location"):
+            hq, hr = get_location_coords(map_data, ent["home_location"])
+            if hq and (hq != ent["q"] or hr != ent["r"]) and not _home_unreachable(map_data, ent, ent_data, hq, hr):
+                 if (hq, hr) != (ent["meta_q"], ent["meta_r"]):
+                     eventos.append({"dia": dia, "tipo": "meta", "nome": nome, "q": hq, "r": hr})
+                 ent["meta_q"], ent["meta_r"] = hq, hr
+                 return False
+        ent["meta_q"] = None # Desiste e fica parado
+        eventos.append({"dia": dia, "tipo": "meta", "nome": nome, "q": None, "r": None})
+        return False
+
+    # Movimento
+    next_q, next_r = path[0][0], path[0][1]
+    points = cell_movement(map_data, ent, ent_data, ent["q"], ent["r"])
+    ent["progresso_diario"] = ent.get("progresso_diario", 0) + points
+    
+    if ent["progresso_diario"] >= PONTOS_DIARIOS_MAX:
+        ent["q"], ent["r"] = next_q, next_r
+        ent["progresso_diario"] -= PONTOS_DIARIOS_MAX
+        eventos.append({"dia": dia, "tipo": "movimento", "nome": nome, "q": next_q, "r": next_r})
+        if len(path[0]) == 3 and path[0][2] != current_mode(ent): # rota multimodal: troca ao entrar na célula
+            novo = path[0][2]
+            ent["modo_temporario"] = None if novo == ent.get("modo_transporte", "a_pe") else novo
+            eventos.append({"dia": dia, "tipo": "transporte", "nome": nome, "modo": novo, "q": next_q, "r": next_r})
+        return True
+    return False
+
+# --- Tick paralelo ---
+# Dentro de um dia cada entidade só depende do mapa e do próprio estado (e o sorteio é por
+# entidade/dia), então os dias podem ser divididos em lotes por processo. As camadas do mapa
+# decodificado vão para os processos uma vez só, como códigos numa memória compartilhada; a cada dia
+# só as entidades ativas vão e voltam. Os lotes são contíguos e juntados na ordem original, então
+# eventos e estado final saem iguais aos do tick serial.
+CAMADAS_COMPARTILHADAS = ["terreno", "ambiente", "local"] + CAMADAS_VALOR
+_WORKER_MAPA = None # map_data "vazio" do processo filho, cujo decode_map vem da memória compartilhada
+_WORKER_SHM = None # mantém o buffer aberto enquanto o processo vive (as camadas são vistas sobre ele)
+
+def _codificar_mapa(dec):
+    """Camadas decodificadas -> (array [camadas, h, w], lista de valores de cada camada).
+
+    O tipo inteiro é o menor que cabe a camada com mais valores distintos (uma camada de valores
+    com ruído pode passar de 65535).
+    """
+    nomes = [sorted({v for linha in dec[camada] for v in linha}, key=str) for camada in CAMADAS_COMPARTILHADAS]
+    dtype = np.min_scalar_type(max(len(valores) for valores in nomes) - 1)
+    codigos = np.zeros((len(CAMADAS_COMPARTILHADAS), dec["h"], dec["w"]), dtype=dtype)
+    for i, camada in enumerate(CAMADAS_COMPARTILHADAS):
+        indice = {v: j for j, v in enumerate(nomes[i])}
+        codigos[i] = [[indice[v] for v in linha] for linha in dec[camada]]
+    return codigos, nomes
+
+class _CamadaCodificada:
+    """Camada do mapa lida direto dos códigos na memória compartilhada: camada[r][q] -> valor."""
+    def __init__(self, codigos, nomes):
+        self.codigos, self.nomes = codigos, nomes
+
+    def __getitem__(self, r):
+        return _LinhaCodificada(self.codigos[r], self.nomes)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.nomes, dtype=dtype)[self.codigos]
+
+class _LinhaCodificada:
+    __slots__ = ("codigos", "nomes")
+    def __init__(self, codigos, nomes):
+        self.codigos, self.nomes = codigos, nomes
+
+    def __getitem__(self, q):
+        return self.nomes[self.codigos[q]]
+
+def _iniciar_worker(shm_nome, forma, dtype, nomes, locations):
+    global _WORKER_MAPA, _WORKER_SHM
+    _WORKER_SHM = shared_memory.SharedMemory(name=shm_nome)
+    codigos = np.ndarray(forma, dtype=dtype, buffer=_WORKER_SHM.buf)
+    camadas = {c: _CamadaCodificada(codigos[i], nomes[i]) for i, c in enumerate(CAMADAS_COMPARTILHADAS)}
+    _WORKER_MAPA = {"metadata": {}}
+    # terreno/ambiente já são matrizes de códigos (nomes em ordem, como no _map_arrays): nada a reconstruir
+    matrizes = {c: (codigos[CAMADAS_COMPARTILHADAS.index(c)], nomes[CAMADAS_COMPARTILHADAS.index(c)]) for c in ["terreno", "ambiente"]}
+    _MAP_CACHE[id(_WORKER_MAPA)] = {"src": _WORKER_MAPA, "w": forma[2], "h": forma[1], "locations": locations,
+                                   "rotas": {}, "tabela_locais": {}, "has_local": True, "matrizes": matrizes, **camadas}
+
+def _stats_worker():
+    return (ASTAR_STATS, LOCAL_STATS, MAP_CACHE_STATS, TABELA_STATS, META_STATS)
+
+def _worker_lote(entidades, config, dia, grupos):
+    """Roda um dia para um lote de entidades no processo filho (grupos: ver _dia_paralelo)."""
+    for stats in _stats_worker():
+        for k in stats: stats[k] = 0
+    ent_data = {"config": config}
+    fases = dict.fromkeys(FASES_TICK, 0.0)
+    eventos = []
+    movidas = [step_entity(ent, _WORKER_MAPA, ent_data, dia, fases, eventos, g) for ent, g in zip(entidades, grupos)]
+    return {"entidades": entidades, "movidas": movidas, "eventos": eventos, "fases": fases,
+            "stats": [dict(stats) for stats in _stats_worker()]}
+
+def _abrir_pool(map_data, processos):
+    """Sobe os processos com o mapa na memória compartilhada. Retorna (pool, shm)."""
+    dec = decode_map(map_data)
+    if "codigos" not in dec: dec["codigos"] = _codificar_mapa(dec)
+    codigos, nomes = dec["codigos"]
+    shm = shared_memory.SharedMemory(create=True, size=codigos.nbytes)
+    np.ndarray(codigos.shape, dtype=codigos.dtype, buffer=shm.buf)[:] = codigos
+    pool = ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_worker,
+                               initargs=(shm.name, codigos.shape, codigos.dtype.str, nomes, dec["locations"]))
+    return pool, shm
+
+def _dia_paralelo(pool, processos, entidades, ent_data, dia, fases, eventos):
+    """Um dia das `entidades` dividido em lotes. Retorna a lista de flags 'mudou de célula'."""
+    tamanho = max(1, -(-len(entidades) // (processos * 4))) # ~4 lotes por processo equilibram a carga
+    lotes = [entidades[i:i + tamanho] for i in range(0, len(entidades), tamanho)]
+    # O filho não tem as outras entidades: quem vai escolher meta hoje já leva os grupos em volta
+    grupos = [[_grupos_perto(ent_data, e) if needs_new_goal(e) else None for e in lote] for lote in lotes]
+    futuros = [pool.submit(_worker_lote, lote, ent_data["config"], dia, g) for lote, g in zip(lotes, grupos)]
+    movidas = []
+    for lote, futuro in zip(lotes, futuros):
+        res = futuro.result()
+        for ent, novo in zip(lote, res["entidades"]): ent.update(novo) # mantém o mesmo dict (outros guardam referência)
+        movidas += res["movidas"]
+        eventos += res["eventos"]
+        for fase, seg in res["fases"].items(): fases[fase] += seg
+        for stats, delta in zip(_stats_worker(), res["stats"]):
+            for k, v in delta.items(): stats[k] += v
+    return movidas
+
+# --- Agendador ---
+# Enquanto uma entidade não muda de célula, de meta nem bate o prazo de voltar pra casa, cada dia
+# repete exatamente o anterior (mesma meta, mesma rota, mesmos pontos somados). Então ela só é
+# processada no dia em que algo acontece; os dias no meio são "adiantados" de uma vez, com as mesmas
+# somas do tick dia a dia (o resultado sai idêntico, bit a bit).
+NUNCA = float("inf")
+
+def _foto(ent):
+    return (ent.get("meta_q"), ent.get("meta_r"), ent.get("progresso_diario", 0), ent.get("days_since_home", 0))
+
+def _proximo_dia(ent, map_data, ent_data, dia, foto, moveu):
+    """(próximo dia em que a entidade precisa rodar, pontos que ela soma por dia até lá)."""
+    meta_q, meta_r, prog, dias_casa = foto
+    if moveu or (meta_q, meta_r) != (ent.get("meta_q"), ent.get("meta_r")) or ent["days_since_home"] <= dias_casa:
+        return dia + 1, 0.0
+    ia = ent["tipo"] != "player"
+    if ia and (ent.get("meta_q") is None or (ent["q"], ent["r"]) == (ent["meta_q"], ent["meta_r"])):
+        return dia + 1, 0.0 # amanhã a IA sorteia outra meta
+
+    proximo, pts = NUNCA, 0.0
+    if ent.get("progresso_diario", 0) != prog: # andando: acorda no dia em que os pontos fecham uma célula
+        pts = cell_movement(map_data, ent, ent_data, ent["q"], ent["r"])
+        p, k = ent["progresso_diario"], 0
+        while p < PONTOS_DIARIOS_MAX: p += pts; k += 1
+        proximo = dia + k
+    freq = ent.get("return_freq_days")
+    if ia and ent.get("home_location") and freq and ent["days_since_home"] < freq:
+        if get_location_coords(map_data, ent["home_location"])[0] is not None:
+            proximo = min(proximo, dia + freq - ent["days_since_home"])
+    return proximo, pts
+
+def _adiantar(ent, dias, pts):
+    """Aplica `dias` dias sem novidade: contador de casa e pontos de movimento.
+
+    Parada (pts = 0) é O(1), por mais longo que seja o sono. Andando, os pontos são somados dia a dia
+    (pts * dias arredonda diferente do tick diário), mas aí o sono nunca passa dos dias que faltam para
+    fechar a célula, que o _proximo_dia já contou.
+    """
+    if dias <= 0: return
+    ent["days_since_home"] = ent.get("days_since_home", 0) + dias
+    if pts:
+        prog = ent.get("progresso_diario", 0)
+        for _ in range(dias): prog += pts
+        ent["progresso_diario"] = prog
+
+# --- Trajetória ---
+# Buffer compacto das posições por dia: int16 (dias + 1, entidades, 2), -1 = sem posição. Só quem andou
+# no dia é escrito; o resto da linha é cópia da anterior.
+def _iniciar_trajetoria(trajetoria, ent_data, days):
+    ents = all_entities(ent_data)
+    pos = np.full((days + 1, len(ents), 2), -1, dtype=np.int16)
+    for i, e in enumerate(ents):
+        if e.get("q") is not None: pos[0, i] = e["q"], e["r"]
+    trajetoria.update({"nomes": [e["nome"] for e in ents], "cores": [e.get("cor_hex", "#FFFFFF") for e in ents],
+                       "tipos": [e["tipo"] for e in ents], "dias": [ent_data["config"].get("dia_mundo", 0)], "pos": pos})
+    return {id(e): i for i, e in enumerate(ents)}
+
+def _registrar_dia(trajetoria, colunas, linha, dia, andaram):
+    pos = trajetoria["pos"]
+    pos[linha] = pos[linha - 1]
+    for ent in andaram: pos[linha, colunas[id(ent)]] = ent["q"], ent["r"]
+    trajetoria["dias"].append(dia)
+
+def _fechar_trajetoria(trajetoria, dias_feitos):
+    trajetoria["pos"] = trajetoria["pos"][:dias_feitos + 1] # simulação interrompida: corta as linhas vazias
+
+def process_tick(map_data, ent_data, days=1, progresso=None, gerar_imagem=True, salvar=True, trace_path=None,
+                 eventos=None, log_path=CAMINHO_LOG_EVENTOS, processos=1, agendador=True, trajetoria=None,
+                 calor=None):
+    """Avança a simulação `days` dias.
+
+    progresso(dia, total) é chamado ao fim de cada dia; se devolver False a simulação para ali.
+    salvar: True grava o banco inteiro; "log" só acrescenta os eventos e o estado final no log
+    (o banco é reconstruído no carregar_banco); False não grava nada (simulações descartáveis, benchmarks).
+    Nos dois modos que gravam, os eventos (meta, movimento, transporte, casa, encontro) vão para log_path.
+    eventos: lista onde os eventos do tick também são acrescentados.
+    trace_path: arquivo JSONL onde o perfil do tick é acrescentado.
+    processos > 1 divide as entidades de cada dia entre processos (mesmo resultado do serial; no
+    perfil, meta_ia/astar/locais viram a soma do tempo de todos os processos).
+    agendador=False processa toda entidade ativa todo dia (o resultado é o mesmo, só mais lento).
+    trajetoria: dict que recebe a posição de cada entidade no começo e no fim de cada dia (ver
+    export_timeline).
+    calor: rasters de mapa_calor (passagens, permanência, visitas) onde os dias simulados são somados.
+    Retorna {"dias": dias simulados, "movimentos": células andadas no total, "perfil": tempos e contadores}.
+    """
     print(f"\n{C['Y']}⏳ Processando {days} dias...{C['R']}")
     
-    for _ in range(days):
-        for k in ["npcs", "grupos", "players"]:
-            for ent in ent_data.get(k, []):
-                if ent.get("status") == "parado": continue
-                
-                ent["days_since_home"] = ent.get("days_since_home", 0) + 1
-
-                # IA decide meta (apenas NPCs/Grupos)
-                if ent["tipo"] != "player":
-                    nq, nr = decide_ia_goal(ent, map_data, ent_data)
-                    ent["meta_q"], ent["meta_r"] = nq, nr
-                
-                if not ent.get("meta_q"): continue
-
-                # Pathfinding
-                path = find_path_astar((ent["q"], ent["r"]), (ent["meta_q"], ent["meta_r"]), map_data, ent, ent_data)
-                
-                if not path:
-                    # Bloqueado! Se tiver casa, tenta voltar pra lá pra "pegar barco"
-                    if ent.get("home_location"):
-                        hq, hr = get_location_coords(map_data, ent["home_location"])
-                        if hq and (hq != ent["q"] or hr != ent["r"]):
-                             ent["meta_q"], ent["meta_r"] = hq, hr
-                             continue
-                    ent["meta_q"] = None # Desiste e fica parado
-                    continue
-
-                # Movimento
-                next_q, next_r = path[0]
-                t_here, _, _ = get_terrain_info(map_data, ent["q"], ent["r"])
-                
-                points = calculate_movement(ent, t_here, ent_data)
-                ent["progresso_diario"] = ent.get("progresso_diario", 0) + points
-                
-                if ent["progresso_diario"] >= PONTOS_DIARIOS_MAX:
-                    ent["q"], ent["r"] = next_q, next_r
-                    ent["progresso_diario"] -= PONTOS_DIARIOS_MAX
-
-    save_json(ent_data, DADOS_ENTIDADES_PATH)
+    perf = time.perf_counter
+    inicio, antes = perf(), _contadores()
+    fases = dict.fromkeys(FASES_TICK, 0.0)
+    config = ent_data.setdefault("config", {})
+    semente_nova = "semente" not in config
+    semente_mundo(ent_data) # garante a semente antes do primeiro sorteio
+    eventos = [] if eventos is None else eventos
+    movidas, ativas = set(), set()
+    dias_feitos, movimentos, acordadas, encontros_tick = 0, 0, 0, []
+
+    # Fila (dia, ordem): no mesmo dia as entidades rodam na ordem das coleções, como no tick dia a dia
+    ents = [ent for k in ["npcs", "grupos", "players"] for ent in ent_data.get(k, [])
+            if ent.get("status") != "parado" and ent.get("q") is not None]
+    ativas.update(ent["nome"] for ent in ents)
+    config["dia_mundo"] = config.get("dia_mundo", 0)
+    fila = [(config["dia_mundo"] + 1, i) for i in range(len(ents))]
+    dormindo = {} # ordem -> (último dia processado, pontos por dia)
+    indice_espacial.obter(ent_data) # montado antes do 1º passo: durante o dia ele guarda as posições do começo do dia
+    if trajetoria is not None: colunas = _iniciar_trajetoria(trajetoria, ent_data, days)
+
+    pool, shm = _abrir_pool(map_data, processos) if processos > 1 else (None, None)
+    try:
+        for dia in range(days):
+            config["dia_mundo"] += 1
+            hoje = config["dia_mundo"]
+            ordens = []
+            while fila and fila[0][0] == hoje: ordens.append(heapq.heappop(fila)[1])
+            dia_ents = [ents[i] for i in ordens]
+            for i, ent in zip(ordens, dia_ents):
+                ultimo, pts = dormindo.pop(i, (hoje - 1, 0.0))
+                _adiantar(ent, hoje - 1 - ultimo, pts)
+                if calor is not None: mapa_calor.ficar(calor, ent, hoje - 1 - ultimo)
+            fotos = [_foto(ent) for ent in dia_ents]
+            origens = {id(ent): (ent["q"], ent["r"]) for ent in dia_ents}
+            if pool:
+                flags = _dia_paralelo(pool, processos, dia_ents, ent_data, hoje, fases, eventos)
+            else:
+                flags = [step_entity(ent, map_data, ent_data, hoje, fases, eventos) for ent in dia_ents]
+            acordadas += len(dia_ents)
+            for i, ent, foto, moveu in zip(ordens, dia_ents, fotos, flags):
+                proximo, pts = _proximo_dia(ent, map_data, ent_data, hoje, foto, moveu) if agendador else (hoje + 1, 0.0)
+                dormindo[i] = (hoje, pts)
+                if proximo != NUNCA: heapq.heappush(fila, (proximo, i))
+            andaram = [ent for ent, moveu in zip(dia_ents, flags) if moveu]
+            for ent in andaram:
+                movimentos += 1
+                movidas.add(id(ent))
+                indice_espacial.mover(ent_data, ent)
+            if calor is not None:
+                for ent in dia_ents: mapa_calor.ficar(calor, ent)
+                for ent in andaram: mapa_calor.passar(calor, ent)
+            if trajetoria is not None: _registrar_dia(trajetoria, colunas, dia + 1, hoje, andaram)
+            achados = encontros.detectar(ent_data, config["dia_mundo"], andaram, origens)
+            eventos += achados
+            encontros_tick += achados
+
+            dias_feitos += 1
+            if progresso and progresso(dia + 1, days) is False:
+                print(f"\n{C['Y']}Simulação interrompida no dia {dia + 1}.{C['R']}")
+                break
+    finally:
+        if pool:
+            pool.shutdown()
+            shm.close(); shm.unlink()
+    if trajetoria is not None: _fechar_trajetoria(trajetoria, dias_feitos)
+    # Quem estava dormindo chega até o último dia simulado
+    for i, (ultimo, pts) in dormindo.items():
+        _adiantar(ents[i], config["dia_mundo"] - ultimo, pts)
+        if calor is not None: mapa_calor.ficar(calor, ents[i], config["dia_mundo"] - ultimo)
+    if calor is not None: calor["dias"] += dias_feitos
+
+    if salvar:
+        t0 = perf()
+        if salvar == "log" and not semente_nova:
+            registrar_eventos(eventos + [registro_estado(ent_data, config["dia_mundo"], ativas)], log_path)
+        else:
+            salvar_banco(ent_data)
+            registrar_eventos(eventos, log_path)
+        fases["salvar"] += perf() - t0
     print(f"{C['G']}✅ Simulação concluída.{C['R']}")
-    generate_world_image(map_data, ent_data)
+    for evento in encontros_tick[:5]: print(f"   🤝 Dia {evento['dia']}: {encontros.descrever(evento)}")
+    if len(encontros_tick) > 5: print(f"   ... e mais {len(encontros_tick) - 5} encontros.")
+    if gerar_imagem:
+        t0 = perf(); generate_world_image(map_data, ent_data); fases["imagem"] += perf() - t0
+
+    perfil = {"quando": round(time.time(), 3), "dias": dias_feitos, "fases": fases,
+              "contadores": {"movimentos": movimentos, "entidades_movidas": len(movidas), "eventos": len(eventos),
+                             "encontros": len(encontros_tick), "acordadas": acordadas,
+                             "entidades_dia": len(ents) * dias_feitos}}
+    _fechar_perfil(perfil, antes, perf() - inicio)
+    imprimir_perfil(perfil)
+    if trace_path: gravar_trace(perfil, trace_path)
+    return {"dias": dias_feitos, "movimentos": movimentos, "perfil": perfil}
+
+def verify_event_log(map_data, snapshot, log_path=CAMINHO_LOG_EVENTOS):
+    """Refaz a simulação a partir de um banco salvo (snapshot) e compara com o log de eventos.
+
+    Os eventos são comparados um a um; nos dias com registro "estado" (salvamentos só no log) a
+    simulação para ali e os campos de CAMPOS_ESTADO_LOG de cada entidade também são conferidos.
+    Retorna {"dias", "eventos", "divergencia"}; divergencia é None quando tudo bate, senão
+    {"indice", "esperado", "obtido"} do primeiro evento diferente ou {"dia", "nome", "campo",
+    "esperado", "obtido"} do primeiro estado diferente.
+    """
+    ent_data = copy.deepcopy(snapshot)
+    if "semente" not in ent_data.get("config", {}): raise ValueError("Banco salvo sem semente: não dá para refazer os sorteios.")
+    inicio = ent_data["config"].get("dia_mundo", 0)
+    registros = [e for e in ler_eventos(log_path) if e["dia"] > inicio]
+    esperados = [e for e in registros if e["tipo"] != "estado"]
+    estados = {e["dia"]: e for e in registros if e["tipo"] == "estado"} # o último do dia vale
+    if not registros: return {"dias": 0, "eventos": 0, "divergencia": None}
+
+    obtidos, feito = [], inicio
+    paradas = sorted(set(estados) | {registros[-1]["dia"]})
+    for parada in paradas:
+        process_tick(map_data, ent_data, parada - feito, gerar_imagem=False, salvar=False, eventos=obtidos)
+        feito = parada
+        if parada not in estados: continue
+        por_nome = {e["nome"]: e for e in all_entities(ent_data)}
+        for nome, valores in estados[parada]["entidades"].items():
+            for campo, esperado in zip(CAMPOS_ESTADO_LOG, valores):
+                obtido = por_nome.get(nome, {}).get(campo)
+                if esperado != obtido:
+                    return {"dias": feito - inicio, "eventos": len(esperados),
+                            "divergencia": {"dia": parada, "nome": nome, "campo": campo, "esperado": esperado, "obtido": obtido}}
+    for i in range(max(len(esperados), len(obtidos))):
+        esperado = esperados[i] if i < len(esperados) else None
+        obtido = obtidos[i] if i < len(obtidos) else None
+        if esperado != obtido:
+            return {"dias": feito - inicio, "eventos": len(esperados), "divergencia": {"indice": i, "esperado": esperado, "obtido": obtido}}
+    return {"dias": feito - inicio, "eventos": len(esperados), "divergencia": None}
 
 # ==============================================================================
 # 5. VISUALIZAÇÃO GRÁFICA (MATPLOTLIB AVANÇADO)
 # ==============================================================================
 
-def generate_world_image(map_data, ent_data):
+def base_raster(map_data):
+    """Matriz de índices de cor do mapa (a mesma de get_visual_idx), montada uma vez e guardada no cache."""
+    dec = decode_map(map_data)
+    if "raster" not in dec:
+        codigos, nomes = _map_arrays(dec)["terreno"]
+        cores = np.array([STR_TO_IDX.get(t, 5) for t in nomes], dtype=np.int8)
+        e_local = np.array([[get_visual_idx("vazio", l) == 6 for l in linha] for linha in dec["local"]], dtype=bool)
+        dec["raster"] = np.where(e_local, 6, cores[codigos])
+    return dec["raster"]
+
+def generate_world_image(map_data, ent_data, output_path=OUTPUT_IMAGE_MUNDO):
     print("🎨 Gerando imagem do mundo...")
     
     # 1. Matriz de Cores
-    mat = np.zeros((HEIGHT, WIDTH), dtype=int)
-    for y in range(HEIGHT):
-        for x in range(WIDTH):
-            t, _, l = get_terrain_info(map_data, x, y)
-            mat[y, x] = get_visual_idx(t, l)
+    w, h = map_size(map_data)
+    mat = base_raster(map_data)
 
     # 2. Configuração do Grid (Mapa + Legendas)
     fig = plt.figure(figsize=(14, 12))
@@ -316,19 +1261,20 @@ def generate_world_image(map_data, ent_data):
     
     # Indicador de Escala (Texto no canto)
     scale_text = f"ESCALA: 1px = {AREA_CELULA_KM2:,.0f} km²".replace(",", ".")
-    ax_map.text(3, HEIGHT-3, scale_text, color='white', fontsize=9, fontweight='bold', 
+    ax_map.text(3, h-3, scale_text, color='white', fontsize=9, fontweight='bold', 
                 bbox=dict(facecolor='black', alpha=0.7, edgecolor='none'))
 
     # Plota Entidades
     legend_elements = {}
     for k in ["players", "grupos", "npcs"]:
         for e in ent_data.get(k, []):
+            if e.get("q") is None: continue
             cor = e.get("cor_hex", "#FFFFFF")
             mk = 'o' if k=="grupos" else '*' if k=="npcs" else 'D'
             sz = 100 if k=="npcs" else 60
             ax_map.scatter(e['q'], e['r'], c=cor, marker=mk, s=sz, edgecolors='black', linewidth=0.5, zorder=10)
             
-            lbl = f"{e['nome']} ({e.get('modo_transporte','?')})"
+            lbl = f"{e['nome']} ({current_mode(e)})"
             if lbl not in legend_elements:
                 legend_elements[lbl] = (cor, mk)
 
@@ -351,12 +1297,221 @@ def generate_world_image(map_data, ent_data):
         ax_ent.text(0.5, 0.5, "Sem entidades visíveis.", ha='center')
 
     plt.tight_layout()
-    plt.savefig(OUTPUT_IMAGE_MUNDO, dpi=150)
+    plt.savefig(output_path, dpi=150)
+    plt.close(fig)
+    print(f"🖼️  Imagem salva: {os.path.basename(output_path)}")
+    return output_path
+
+# --- Exportação de rotas em lote ---
+# Todas as rotas saem do cache de rotas (nada de A* repetido) e são desenhadas sobre o mesmo
+# base_raster: numa imagem só, ou uma imagem por entidade (rota_<nome>.png), feitas em paralelo.
+_RASTER_RENDER = None # base_raster no processo filho
+
+def _dados_rota(ent, path):
+    return {"nome": ent["nome"], "cor": ent.get("cor_hex", "#FF0000"), "inicio": (ent["q"], ent["r"]),
+            "meta": (ent["meta_q"], ent["meta_r"]), "xs": [p[0] for p in path], "ys": [p[1] for p in path]}
+
+def _salvar_rota_png(raster, rota, caminho):
+    plt.figure(figsize=(12, 6))
+    plt.imshow(raster, cmap=CMAP, interpolation='nearest', vmin=0, vmax=len(COLORS_LIST)-1)
+    plt.plot(rota["xs"], rota["ys"], 'r-', linewidth=2, label='Rota A*')
+    plt.scatter(*rota["inicio"], c='lime', s=100, label='Inicio', zorder=10)
+    plt.scatter(*rota["meta"], c='magenta', marker='X', s=100, label='Fim', zorder=10)
+    plt.title(rota["nome"])
+    plt.legend()
+    plt.savefig(caminho, dpi=100)
+    plt.close()
+    return caminho
+
+def _iniciar_render(raster):
+    global _RASTER_RENDER
+    _RASTER_RENDER = raster
+
+def _salvar_rota_worker(rota, caminho):
+    return _salvar_rota_png(_RASTER_RENDER, rota, caminho)
+
+def _nome_arquivo(nome):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in nome)
+
+def export_routes(map_data, ent_data, pasta=CAMINHO_SCRIPT, por_entidade=False, processos=1):
+    """Desenha a rota atual de todas as entidades com meta. Retorna os arquivos gerados.
+
+    por_entidade=False: uma imagem só (rotas_entidades.png), cada rota na cor da entidade.
+    por_entidade=True: rota_<nome>.png para cada uma, em `processos` processos.
+    """
+    rotas = []
+    for ent in all_entities(ent_data):
+        if ent.get("q") is None or ent.get("meta_q") is None or ent.get("status") == "parado": continue
+        path = cached_route(map_data, ent, ent_data)
+        if path: rotas.append(_dados_rota(ent, path))
+    raster = base_raster(map_data)
+    os.makedirs(pasta, exist_ok=True)
+
+    if por_entidade:
+        caminhos = [os.path.join(pasta, f"rota_{_nome_arquivo(r['nome'])}.png") for r in rotas]
+        if processos <= 1 or len(rotas) <= 1:
+            return [_salvar_rota_png(raster, r, c) for r, c in zip(rotas, caminhos)]
+        with ProcessPoolExecutor(max_workers=min(processos, len(rotas)), initializer=_iniciar_render, initargs=(raster,)) as pool:
+            return list(pool.map(_salvar_rota_worker, rotas, caminhos))
+
+    caminho = os.path.join(pasta, "rotas_entidades.png")
+    fig, ax = plt.subplots(figsize=(14, 7))
+    ax.imshow(raster, cmap=CMAP, interpolation='nearest', vmin=0, vmax=len(COLORS_LIST)-1)
+    for r in rotas:
+        ax.plot(r["xs"], r["ys"], '-', color=r["cor"], linewidth=1.5, label=r["nome"])
+        ax.scatter(*r["inicio"], c=r["cor"], s=40, edgecolors='black', linewidth=0.5, zorder=10)
+        ax.scatter(*r["meta"], c=r["cor"], marker='X', s=60, edgecolors='black', linewidth=0.5, zorder=10)
+    dia = ent_data.get("config", {}).get("dia_mundo", 0)
+    ax.set_title(f"Rotas das entidades - dia {dia}", fontsize=14, fontweight='bold', color='#333333')
+    ax.axis('off')
+    if 0 < len(rotas) <= 40: ax.legend(loc='center left', bbox_to_anchor=(1.0, 0.5), fontsize='small', frameon=False)
+    fig.tight_layout()
+    fig.savefig(caminho, dpi=150)
     plt.close(fig)
-    print(f"🖼️  Imagem salva: {os.path.basename(OUTPUT_IMAGE_MUNDO)}")
+    return [caminho]
+
+# --- Linha do tempo animada ---
+# Os quadros saem direto em pixels: o base_raster vira RGB ampliado uma vez, e cada dia só copia essa
+# base e pinta o rastro e as entidades por cima. Nada de figura do matplotlib por dia.
+def _rgb(cores):
+    """Cores do matplotlib (tuplas 0..1 ou '#rrggbb') como matriz RGB uint8."""
+    return np.round(np.array([to_rgb(c) for c in cores]) * 255).astype(np.uint8)
+
+def timeline_frames(map_data, trajetoria, escala=4, rastro=8):
+    """Gera os quadros (arrays RGB uint8) da trajetória, um por linha do buffer."""
+    paleta = _rgb(COLORS_LIST)
+    base = paleta[base_raster(map_data)]
+    cores = _rgb(trajetoria["cores"])
+    apagadas = (cores // 2 + 64).astype(np.uint8) # rastro: cor da entidade mais escura
+    pos = trajetoria["pos"]
+    for f in range(len(pos)):
+        celulas = base.copy()
+        for k in range(max(0, f - rastro), f): # rastro dos últimos dias, do mais antigo ao mais novo
+            vis = pos[k, :, 0] >= 0
+            celulas[pos[k, vis, 1], pos[k, vis, 0]] = apagadas[vis]
+        quadro = np.repeat(np.repeat(celulas, escala, axis=0), escala, axis=1)
+        vis = pos[f, :, 0] >= 0
+        q, r = pos[f, vis, 0].astype(int) * escala, pos[f, vis, 1].astype(int) * escala
+        for dy in range(escala): # entidade = quadrado da cor dela com borda preta
+            for dx in range(escala):
+                borda = dx in (0, escala - 1) or dy in (0, escala - 1)
+                quadro[r + dy, q + dx] = 0 if borda and escala > 2 else cores[vis]
+        yield quadro
+
+def export_timeline(map_data, trajetoria, caminho=OUTPUT_ANIMACAO, escala=4, rastro=8, fps=8):
+    """Salva a trajetória como .gif, .png (APNG) ou, sem extensão, numa pasta de quadros PNG."""
+    ext = os.path.splitext(caminho)[1].lower()
+    imagens = []
+    for f, quadro in enumerate(timeline_frames(map_data, trajetoria, escala, rastro)):
+        img = Image.fromarray(quadro)
+        ImageDraw.Draw(img).text((4, 4), f"Dia {trajetoria['dias'][f]}", fill=(255, 255, 255), stroke_width=2, stroke_fill=(0, 0, 0))
+        imagens.append(img)
+    if not imagens: raise ValueError("Trajetória vazia.")
+
+    if ext == "":
+        os.makedirs(caminho, exist_ok=True)
+        for f, img in enumerate(imagens): img.save(os.path.join(caminho, f"dia_{trajetoria['dias'][f]:05d}.png"))
+        return caminho
+    duracao = int(1000 / fps)
+    if ext == ".gif": # paleta única (a do 1º quadro) para as cores não piscarem entre quadros
+        paleta = imagens[0].quantize(colors=256, dither=Image.Dither.NONE)
+        imagens = [img.quantize(palette=paleta, dither=Image.Dither.NONE) for img in imagens]
+    elif ext != ".png": raise ValueError(f"Formato não suportado: {ext} (use .gif, .png ou uma pasta)")
+    imagens[0].save(caminho, save_all=True, append_images=imagens[1:], duration=duracao, loop=0)
+    return caminho
+
+# --- Mapas de calor ---
+# Contagens da simulação (mapa_calor) sobre o mapa escurecido, e as camadas numéricas do próprio mapa.
+CAMADAS_MAPA = {"valor_movimentacao": "RdYlGn_r", "valor_estabilidade": "viridis"}
+
+def heatmap_layers():
+    return list(mapa_calor.CAMADAS) + list(CAMADAS_MAPA)
+
+def export_heatmap(map_data, camada, calor=None, caminho=None, escala=4):
+    """Salva a camada como PNG (padrão: mapa_calor_<camada>.png). calor: rasters já carregados."""
+    caminho = caminho or os.path.join(CAMINHO_SCRIPT, f"mapa_calor_{camada}.png")
+    if camada in CAMADAS_MAPA:
+        valores = map_values(map_data, camada)
+        rgb, titulo = mapa_calor.colorir(valores, cmap=CAMADAS_MAPA[camada], log=False), camada
+        legenda = f"{valores.min():g} .. {valores.max():g}"
+    elif camada in mapa_calor.CAMADAS:
+        w, h = map_size(map_data)
+        calor = calor if calor is not None else mapa_calor.carregar(CAMINHO_CALOR, w, h)
+        valores = calor[camada]
+        rgb = mapa_calor.colorir(valores, base=_rgb(COLORS_LIST)[base_raster(map_data)])
+        titulo, legenda = f"{camada} ({calor['dias']} dias)", f"máx {valores.max()} (escala log)"
+    else: raise ValueError(f"Camada desconhecida: {camada} (use {', '.join(heatmap_layers())})")
+    img = Image.fromarray(np.repeat(np.repeat(rgb, escala, axis=0), escala, axis=1))
+    desenho = ImageDraw.Draw(img)
+    desenho.text((4, 4), titulo, fill=(255, 255, 255), stroke_width=2, stroke_fill=(0, 0, 0))
+    desenho.text((4, 18), legenda, fill=(255, 255, 255), stroke_width=2, stroke_fill=(0, 0, 0))
+    img.save(caminho)
+    return caminho
+
+def hot_spots(calor, camada, n=10):
+    """As n células com mais calor na camada: [(q, r, valor)]."""
+    valores = calor[camada]
+    topo = np.argsort(valores, axis=None, kind="stable")[::-1][:n]
+    return [(int(i % valores.shape[1]), int(i // valores.shape[1]), int(valores.flat[i])) for i in topo if valores.flat[i] > 0]
 
 # ==============================================================================
-# 6. MENUS E INTERAÇÃO
+# 6. OPERAÇÕES (usadas pelos menus e pela API/CLI em simulador.py)
+# ==============================================================================
+
+def all_entities(ent_data):
+    return [e for k in ["npcs", "grupos", "players"] for e in ent_data.get(k, [])]
+
+def find_entity(ent_data, nome):
+    """Acha entidade pelo nome (sem diferenciar maiúsculas)."""
+    nome = nome.lower()
+    return next((e for e in all_entities(ent_data) if e["nome"].lower() == nome), None)
+
+def create_entity(map_data, ent_data, tipo, nome, q=None, r=None, **campos):
+    """Cria e salva uma entidade. tipo = 'npcs' | 'grupos' | 'players'. Sem q/r, sorteia uma célula do mapa."""
+    if tipo not in ["npcs", "grupos", "players"]: raise ValueError(f"Tipo inválido: {tipo}")
+    w, h = map_size(map_data)
+    if (q is not None and not 0 <= q < w) or (r is not None and not 0 <= r < h):
+        raise ValueError(f"Posição ({q}, {r}) fora do mapa {w}x{h}")
+    rng = rng_mundo(ent_data, "criar", nome)
+    ent = nova_entidade(
+        tipo, nome=nome,
+        q=rng.randint(0, w-1) if q is None else q,
+        r=rng.randint(0, h-1) if r is None else r,
+        cor_hex=generate_unique_color(len(ent_data[tipo]), rng),
+        **campos
+    )
+    ent_data[tipo].append(ent)
+    indice_espacial.adicionar(ent_data, ent)
+    salvar_banco(ent_data)
+    return ent
+
+def create_location(map_data, nome, q, r, path=MAPA_CODIFICADO_PATH):
+    """Marca o local `nome` na célula (q, r) e salva o mapa codificado."""
+    w, h = map_size(map_data)
+    if not (0 <= q < w and 0 <= r < h): raise ValueError(f"Coordenada fora do mapa: ({q}, {r})")
+    code = str(random.randint(10000, 99999))
+    map_data["metadata"]["local_atual_map"][code] = nome
+    if "local_atual" not in map_data: map_data["local_atual"] = [[0]*w for _ in range(h)]
+    map_data["local_atual"][r][q] = int(code)
+    update_cells(map_data, [(q, r)])
+    
+    # Salvar mapa codificado (compacto)
+    with open(path, 'w') as f: json.dump(map_data, f, separators=(',',':'))
+    import ladrilhos_mapa # aqui e não no topo: ladrilhos_mapa importa este módulo
+    ladrilhos_mapa.invalidar_celulas(map_data, [(q, r)])
+    return code
+
+def list_locations(map_data):
+    return [v for k, v in map_data["metadata"].get("local_atual_map", {}).items() if v not in [None, "None", "null"]]
+
+def bind_home(ent_data, ent, local, freq):
+    ent["home_location"] = local
+    ent["return_freq_days"] = freq
+    ent["days_since_home"] = 0
+    salvar_banco(ent_data)
+
+# ==============================================================================
+# 7. MENUS E INTERAÇÃO
 # ==============================================================================
 
 def create_transport_menu(ent_data):
@@ -372,47 +1527,37 @@ def create_transport_menu(ent_data):
         if "custom_transports" not in ent_data["config"]: ent_data["config"]["custom_transports"] = {}
         
         ent_data["config"]["custom_transports"][nome] = {"speed": spd, "restrict": restr, "cost_mod": 1.0}
-        save_json(ent_data, DADOS_ENTIDADES_PATH)
+        salvar_banco(ent_data)
         print(f"{C['G']}Transporte '{nome}' criado!{C['R']}")
     except: print("Dados inválidos.")
 
 def bind_home_menu(ent_data, map_data):
     print_box("VINCULAR CASA/BASE", ["Selecione entidade e local"])
     # Entidade
-    all_ents = [e for k in ["npcs", "grupos", "players"] for e in ent_data.get(k, [])]
+    all_ents = all_entities(ent_data)
     for i, e in enumerate(all_ents): print(f"{i+1}. {e['nome']}")
     try:
         e_idx = int(input("ID Entidade: ")) - 1
         ent = all_ents[e_idx]
         
         # Local
-        locs = [v for k, v in map_data["metadata"].get("local_atual_map", {}).items() if v not in ["None", "null"]]
+        locs = list_locations(map_data)
         for i, l in enumerate(locs): print(f"{i+1}. {l}")
         l_idx = int(input("ID Local: ")) - 1
         
         freq = int(input("Voltar a cada quantos dias? (ex: 7): "))
         
-        ent["home_location"] = locs[l_idx]
-        ent["return_freq_days"] = freq
-        ent["days_since_home"] = 0
-        save_json(ent_data, DADOS_ENTIDADES_PATH)
+        bind_home(ent_data, ent, locs[l_idx], freq)
         print("Vínculo criado.")
     except: print("Erro.")
 
-def create_entity_menu(ent_data):
+def create_entity_menu(map_data, ent_data):
     print_box("CRIAR ENTIDADE", ["NPC, Grupo ou Player"])
     tipo = input("Tipo (npc/grupo/player): ").lower() + "s"
-    if tipo not in ent_data: ent_data[tipo] = []
+    if tipo not in ["npcs", "grupos", "players"]: return print("Tipo inválido.")
     
     nome = input("Nome: ")
-    ent = {
-        "nome": nome, "tipo": tipo[:-1], 
-        "q": random.randint(0, WIDTH-1), "r": random.randint(0, HEIGHT-1),
-        "status": "ativo", "cor_hex": generate_unique_color(len(ent_data[tipo])),
-        "modo_transporte": "a_pe", "progresso_diario": 0, "meta_q": None
-    }
-    ent_data[tipo].append(ent)
-    save_json(ent_data, DADOS_ENTIDADES_PATH)
+    create_entity(map_data, ent_data, tipo, nome)
     print("Criado.")
 
 def create_location_menu(map_data):
@@ -420,114 +1565,163 @@ def create_location_menu(map_data):
     nome = input("Nome do Local: ")
     try:
         q = int(input("Q (X): ")); r = int(input("R (Y): "))
-        code = str(random.randint(10000, 99999))
-        map_data["metadata"]["local_atual_map"][code] = nome
-        if "local_atual" not in map_data: map_data["local_atual"] = [[0]*WIDTH for _ in range(HEIGHT)]
-        map_data["local_atual"][r][q] = int(code)
-        
-        # Salvar mapa codificado (compacto)
-        with open(MAPA_CODIFICADO_PATH, 'w') as f: json.dump(map_data, f, separators=(',',':'))
+        create_location(map_data, nome, q, r)
         print("Local criado.")
     except: print("Erro.")
 
 def stop_entity_menu(ent_data):
     print_box("PARAR / ATIVAR", ["Imede ou permite movimento"])
-    all_ents = [e for k in ["npcs", "grupos", "players"] for e in ent_data.get(k, [])]
+    all_ents = all_entities(ent_data)
     for i, e in enumerate(all_ents): print(f"{i+1}. {e['nome']} [{e.get('status','ativo')}]")
     try:
         idx = int(input("ID: ")) - 1
         ent = all_ents[idx]
         ent["status"] = "parado" if ent.get("status") == "ativo" else "ativo"
         ent["meta_q"] = None
-        save_json(ent_data, DADOS_ENTIDADES_PATH)
+        salvar_banco(ent_data)
         print(f"Status: {ent['status']}")
     except: pass
 
 def display_route_menu(map_data, ent_data):
     print_box("VISUALIZAR ROTA", ["Mostra o caminho A* calculado"])
-    all_ents = [e for k in ["npcs", "grupos", "players"] for e in ent_data.get(k, [])]
+    all_ents = all_entities(ent_data)
     for i, e in enumerate(all_ents): print(f"{i+1}. {e['nome']}")
     try:
         idx = int(input("ID: ")) - 1
         ent = all_ents[idx]
+        if ent.get("q") is None: return print("Entidade sem posição no mapa.")
         if not ent.get("meta_q"): return print("Sem meta.")
         
-        path = find_path_astar((ent['q'], ent['r']), (ent['meta_q'], ent['meta_r']), map_data, ent, ent_data)
+        path = cached_route(map_data, ent, ent_data)
         if not path: return print("Rota impossível.")
+        eta = estimate_eta(map_data, ent, ent_data)
+        if eta["dias"] is not None:
+            aviso = " (antes disso vence o prazo de voltar pra casa)" if eta["casa_antes"] else ""
+            print(f"⏱️  Chegada estimada em {eta['dias']} dias, no dia {eta['chegada_dia']} do mundo{aviso}.")
+        else: print(f"⏱️  Sem previsão de chegada: {eta['motivo']}.")
         
         # Gera imagem temp
-        mat = np.zeros((HEIGHT, WIDTH), dtype=int)
-        for y in range(HEIGHT):
-            for x in range(WIDTH):
-                t, _, l = get_terrain_info(map_data, x, y)
-                mat[y, x] = get_visual_idx(t, l)
-        
-        plt.figure(figsize=(12, 6))
-        plt.imshow(mat, cmap=CMAP, interpolation='nearest', vmin=0, vmax=len(COLORS_LIST)-1)
-        xs, ys = zip(*path)
-        plt.plot(xs, ys, 'r-', linewidth=2, label='Rota A*')
-        plt.scatter(ent['q'], ent['r'], c='lime', s=100, label='Inicio', zorder=10)
-        plt.scatter(ent['meta_q'], ent['meta_r'], c='magenta', marker='X', s=100, label='Fim', zorder=10)
-        plt.legend()
-        plt.savefig(os.path.join(CAMINHO_SCRIPT, "rota_temp.png"), dpi=100)
-        plt.close()
+        _salvar_rota_png(base_raster(map_data), _dados_rota(ent, path), os.path.join(CAMINHO_SCRIPT, "rota_temp.png"))
         print("Rota salva em rota_temp.png")
     except Exception as e: print(f"Erro: {e}")
 
+def export_routes_menu(map_data, ent_data):
+    print_box("EXPORTAR ROTAS", ["Rotas de todas as entidades", "1. Uma imagem com todas", "2. Um arquivo por entidade"])
+    op = read_option()
+    if op not in ('1', '2'): return
+    arquivos = export_routes(map_data, ent_data, por_entidade=op == '2', processos=os.cpu_count() or 1)
+    print(f"{len(arquivos)} imagem(ns) salva(s): {', '.join(os.path.basename(a) for a in arquivos[:5])}"
+          f"{' ...' if len(arquivos) > 5 else ''}")
+
+def display_distances_menu(map_data, ent_data):
+    print_box("DISTÂNCIAS ENTRE LOCAIS", ["Dias de viagem com um transporte"])
+    modos = list(DEFAULT_TRANSPORTS) + [m for m in ent_data.get("config", {}).get("custom_transports", {}) if m not in DEFAULT_TRANSPORTS]
+    for i, m in enumerate(modos): print(f"{i+1}. {m}")
+    try:
+        modo = modos[int(input("Transporte: ")) - 1]
+        tabela = location_table(map_data, {"nome": modo, "modo_transporte": modo}, ent_data)
+        for origem, linha in tabela["dias"].items():
+            print(f"{C['C']}{origem}{C['R']}")
+            for destino, dias in linha.items(): print(f"   -> {destino}: {'sem rota' if dias is None else f'{dias} dias'}")
+    except Exception as e: print(f"Erro: {e}")
+
+def read_option():
+    """Lê a opção do menu com uma tecla só (sem Enter)."""
+    print(">> ", end="")
+    op = ler_tecla()
+    print(op)
+    return op
+
+def status_line(map_data, ent_data):
+    ativos = sum(1 for k in ["npcs", "grupos", "players"] for e in ent_data.get(k, []) if e.get("status") != "parado")
+    total = sum(len(ent_data.get(k, [])) for k in ["npcs", "grupos", "players"])
+    return f"Entidades: {total} ({ativos} ativas) | Mapa {'x'.join(map(str, map_size(map_data)))} | 0 sai/volta"
+
+def heatmap_menu(map_data):
+    camadas = heatmap_layers()
+    print_box("MAPAS DE CALOR", [f"{i}. {c}" for i, c in enumerate(camadas, 1)] + ["0. Voltar"])
+    op = read_option()
+    if not op.isdigit() or not 1 <= int(op) <= len(camadas): return
+    camada = camadas[int(op) - 1]
+    w, h = map_size(map_data)
+    calor = mapa_calor.carregar(CAMINHO_CALOR, w, h)
+    print(f"🔥 Mapa de calor salvo: {os.path.basename(export_heatmap(map_data, camada, calor))}")
+    if camada in mapa_calor.CAMADAS:
+        for q, r, v in hot_spots(calor, camada, 5):
+            _, _, l = get_terrain_info(map_data, q, r)
+            print(f"   ({q}, {r}) {v}" + (f" - {l}" if is_location(l) else ""))
+    pausar()
+
 def menu_main(map_data, ent_data):
     while True:
-        print_box(f"MUNDO VIVO 2.0 ({WIDTH}x{HEIGHT})", [
+        if banco_mudou(): # outro processo (CLI, servidor, CRUD) gravou: relê no mesmo dicionário
+            carregar_banco()
+            indice_espacial.invalidar(ent_data)
+        w, h = map_size(map_data)
+        print_box(f"MUNDO VIVO 2.0 ({w}x{h})", [
             "1. Criação (Entidades, Locais, Transportes)",
             "2. Gestão (Vincular Casa, Parar, Mover)",
             "3. Simulação (Passar Tempo)",
             "4. Visualização (Mapa, Rotas)",
             "0. Sair"
         ])
-        op = input(">> ")
+        print(barra_status(status_line(map_data, ent_data)))
+        op = read_option()
         if op == '1': menu_creation(map_data, ent_data)
         elif op == '2': menu_manage(map_data, ent_data)
         elif op == '3':
             try:
                 d = int(input("Dias: "))
-                process_tick(map_data, ent_data, d)
-            except: pass
+            except ValueError: continue
+            animar = input("Gravar animação dos dias? (s/N): ").strip().lower() == "s"
+            trajetoria = {} if animar else None
+            calor = mapa_calor.carregar(CAMINHO_CALOR, *map_size(map_data))
+            # Dias rodam em segundo plano com barra de progresso; a imagem é feita aqui na thread principal
+            executar_com_progresso(process_tick, map_data, ent_data, d, gerar_imagem=False, trajetoria=trajetoria,
+                                   calor=calor, rotulo="Simulando")
+            mapa_calor.salvar(calor, CAMINHO_CALOR)
+            generate_world_image(map_data, ent_data)
+            if trajetoria: print(f"🎞️  Animação salva: {os.path.basename(export_timeline(map_data, trajetoria))}")
         elif op == '4': menu_vis(map_data, ent_data)
         elif op == '0': break
 
 def menu_creation(map_data, ent_data):
     print_box("MENU CRIAÇÃO", ["1. Entidade", "2. Local", "3. Transporte", "0. Voltar"])
-    op = input(">> ")
-    if op == '1': create_entity_menu(ent_data)
+    op = read_option()
+    if op == '1': create_entity_menu(map_data, ent_data)
     elif op == '2': create_location_menu(map_data)
     elif op == '3': create_transport_menu(ent_data)
 
 def menu_manage(map_data, ent_data):
     print_box("MENU GESTÃO", ["1. Vincular Casa", "2. Parar/Ativar", "0. Voltar"])
-    op = input(">> ")
+    op = read_option()
     if op == '1': bind_home_menu(ent_data, map_data)
     elif op == '2': stop_entity_menu(ent_data)
 
 def menu_vis(map_data, ent_data):
-    print_box("VISUALIZAÇÃO", ["1. Mapa Completo", "2. Rota de Entidade", "0. Voltar"])
-    op = input(">> ")
+    print_box("VISUALIZAÇÃO", ["1. Mapa Completo", "2. Rota de Entidade", "3. Distâncias entre Locais",
+                               "4. Exportar Rotas de Todos", "5. Mapas de Calor", "0. Voltar"])
+    op = read_option()
     if op == '1': generate_world_image(map_data, ent_data)
     elif op == '2': display_route_menu(map_data, ent_data)
+    elif op == '3': display_distances_menu(map_data, ent_data)
+    elif op == '4': export_routes_menu(map_data, ent_data)
+    elif op == '5': heatmap_menu(map_data)
 
 def main():
-    os.system("color")
     map_data = load_json(MAPA_CODIFICADO_PATH)
-    ent_data = load_json(DADOS_ENTIDADES_PATH)
+    ent_data = carregar_banco()
     
-    if not map_data or not ent_data: return print("Arquivos faltando.")
+    if not map_data: return print("Arquivos faltando.")
     
-    # Init
-    if "config" not in ent_data: ent_data["config"] = {}
-    # Garante cor para novos
+    # Init: garante cor e posição para entidades criadas pelo CRUD
+    w, h = map_size(map_data)
     idx = 0
     for k in ["npcs", "grupos", "players"]:
-        if k not in ent_data: ent_data[k] = []
         for e in ent_data[k]:
-            if "cor_hex" not in e: e["cor_hex"] = generate_unique_color(idx); idx+=1
+            rng = rng_mundo(ent_data, "posicionar", e["nome"])
+            if "cor_hex" not in e: e["cor_hex"] = generate_unique_color(idx, rng); idx+=1
+            if e.get("q") is None: e["q"], e["r"] = rng.randint(0, w-1), rng.randint(0, h-1)
 
     generate_world_image(map_data, ent_data)
     menu_main(map_data, ent_data)
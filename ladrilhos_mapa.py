@@ -0,0 +1,166 @@
+"""
+Pirâmide de ladrilhos do mapa: vários níveis de zoom em ladrilhos fixos de LADO x LADO pixels,
+guardados em disco (pasta/<nível>/<x>_<y>.png).
+
+Nível 0 tem PX_CELULA pixels por célula; cada nível acima tem metade da resolução, até o mapa
+inteiro caber num ladrilho só. A visão do mapa inteiro e a de foco saem dos mesmos ladrilhos:
+só os que cobrem a área pedida são lidos (ou desenhados, se ainda não existem).
+
+Quem edita células (create_location, editor_map_codificado.py) chama invalidar_celulas, que apaga na
+hora os ladrilhos que cobrem as células editadas, em todos os níveis. Por garantia cada ladrilho também
+guarda no índice um hash das células que cobre: uma edição feita por fora (outra ferramenta, o JSON
+editado à mão) muda o hash e o ladrilho é refeito na próxima leitura.
+
+    python simulador.py ladrilhos                 # gera/atualiza a pirâmide inteira
+    python simulador.py vista --foco 40 30 --raio 8
+"""
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import inteface as sim
+
+PASTA_LADRILHOS = os.path.join(sim.CAMINHO_SCRIPT, 'ladrilhos')
+LADO = 256
+PX_CELULA = 16
+
+
+# ==============================================================================
+# PIRÂMIDE
+# ==============================================================================
+
+def nivel_max(map_data):
+    """Primeiro nível em que o mapa inteiro cabe num ladrilho."""
+    w, h = sim.map_size(map_data)
+    return max(0, math.ceil(math.log2(max(w, h) * PX_CELULA / LADO)))
+
+def px_por_celula(nivel):
+    return PX_CELULA / 2 ** nivel
+
+def grade(map_data, nivel):
+    """(colunas, linhas) de ladrilhos no nível."""
+    w, h = sim.map_size(map_data)
+    s = px_por_celula(nivel)
+    return math.ceil(w * s / LADO), math.ceil(h * s / LADO)
+
+def _celulas_do_ladrilho(map_data, nivel, x, y):
+    """Índices de coluna/linha do mapa de cada pixel do ladrilho (célula no centro do pixel)."""
+    w, h = sim.map_size(map_data)
+    s = px_por_celula(nivel)
+    qs = ((np.arange(x * LADO, (x + 1) * LADO) + 0.5) / s).astype(int)
+    rs = ((np.arange(y * LADO, (y + 1) * LADO) + 0.5) / s).astype(int)
+    return qs[qs < w], rs[rs < h]
+
+def desenhar_ladrilho(map_data, nivel, x, y):
+    """Ladrilho como array RGB uint8 (menor que LADO na borda direita/de baixo do mapa)."""
+    qs, rs = _celulas_do_ladrilho(map_data, nivel, x, y)
+    paleta = sim._rgb(sim.COLORS_LIST)
+    return paleta[sim.base_raster(map_data)[np.ix_(rs, qs)]]
+
+def _hash(map_data, nivel, x, y):
+    qs, rs = _celulas_do_ladrilho(map_data, nivel, x, y)
+    if not len(qs) or not len(rs): return None
+    bloco = sim.base_raster(map_data)[rs[0]:rs[-1] + 1, qs[0]:qs[-1] + 1]
+    h = hashlib.blake2b(digest_size=12)
+    h.update(np.ascontiguousarray(bloco, dtype=np.int8).tobytes())
+    h.update(f"{bloco.shape}{sim.map_size(map_data)}{PX_CELULA}{LADO}".encode())
+    return h.hexdigest()
+
+def _carregar_indice(pasta):
+    caminho = os.path.join(pasta, "indice.json")
+    if not os.path.exists(caminho): return {}
+    with open(caminho, encoding="utf-8") as f: return json.load(f)
+
+def _salvar_indice(pasta, indice):
+    os.makedirs(pasta, exist_ok=True)
+    with open(os.path.join(pasta, "indice.json"), "w", encoding="utf-8") as f: json.dump(indice, f)
+
+def obter_ladrilho(map_data, nivel, x, y, pasta=PASTA_LADRILHOS, indice=None, stats=None):
+    """Caminho do PNG do ladrilho, desenhado só se não existe ou se as células dele mudaram.
+
+    indice/stats: para chamadas em lote (o índice é salvo por quem chamou); sozinho, salva na hora.
+    """
+    sozinho = indice is None
+    if sozinho: indice = _carregar_indice(pasta)
+    chave, hash_atual = f"{nivel}/{x}_{y}", _hash(map_data, nivel, x, y)
+    if hash_atual is None: raise ValueError(f"Ladrilho fora do mapa: {chave}")
+    caminho = os.path.join(pasta, str(nivel), f"{x}_{y}.png")
+    if indice.get(chave) == hash_atual and os.path.exists(caminho):
+        if stats is not None: stats["reusados"] += 1
+        return caminho
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    Image.fromarray(desenhar_ladrilho(map_data, nivel, x, y)).save(caminho)
+    indice[chave] = hash_atual
+    if stats is not None: stats["desenhados"] += 1
+    if sozinho: _salvar_indice(pasta, indice)
+    return caminho
+
+def gerar_piramide(map_data, pasta=PASTA_LADRILHOS):
+    """Garante todos os ladrilhos de todos os níveis. Retorna quantos foram desenhados e reusados."""
+    indice, stats = _carregar_indice(pasta), {"desenhados": 0, "reusados": 0}
+    for nivel in range(nivel_max(map_data) + 1):
+        cols, lins = grade(map_data, nivel)
+        for y in range(lins):
+            for x in range(cols):
+                obter_ladrilho(map_data, nivel, x, y, pasta, indice, stats)
+    _salvar_indice(pasta, indice)
+    return {"niveis": nivel_max(map_data) + 1, **stats}
+
+def invalidar_celulas(map_data, celulas, pasta=PASTA_LADRILHOS):
+    """Apaga já os ladrilhos (de todos os níveis) que cobrem as células editadas."""
+    indice, apagados = _carregar_indice(pasta), 0
+    for nivel in range(nivel_max(map_data) + 1):
+        s = px_por_celula(nivel)
+        for chave in {(int(q * s) // LADO, int(r * s) // LADO) for q, r in celulas}:
+            caminho = os.path.join(pasta, str(nivel), f"{chave[0]}_{chave[1]}.png")
+            indice.pop(f"{nivel}/{chave[0]}_{chave[1]}", None)
+            if os.path.exists(caminho): os.remove(caminho); apagados += 1
+    _salvar_indice(pasta, indice)
+    return apagados
+
+
+# ==============================================================================
+# VISÕES
+# ==============================================================================
+
+def vista(map_data, q0, r0, q1, r1, largura_px=1200, pasta=PASTA_LADRILHOS):
+    """Imagem das células [q0, q1) x [r0, r1) com ~largura_px de largura, montada dos ladrilhos.
+
+    Usa o nível mais grosso que ainda tem pelo menos um pixel de ladrilho por pixel pedido.
+    """
+    w, h = sim.map_size(map_data)
+    q0, r0, q1, r1 = max(0, q0), max(0, r0), min(w, q1), min(h, r1)
+    if q1 <= q0 or r1 <= r0: raise ValueError("Área vazia.")
+    nivel = 0
+    while nivel < nivel_max(map_data) and (q1 - q0) * px_por_celula(nivel + 1) >= largura_px: nivel += 1
+    s = px_por_celula(nivel)
+    px0, py0, px1, py1 = int(q0 * s), int(r0 * s), math.ceil(q1 * s), math.ceil(r1 * s)
+
+    indice, stats = _carregar_indice(pasta), {"desenhados": 0, "reusados": 0}
+    tela = Image.new("RGB", (px1 - px0, py1 - py0))
+    for ty in range(py0 // LADO, (py1 - 1) // LADO + 1):
+        for tx in range(px0 // LADO, (px1 - 1) // LADO + 1):
+            ladrilho = Image.open(obter_ladrilho(map_data, nivel, tx, ty, pasta, indice, stats))
+            tela.paste(ladrilho, (tx * LADO - px0, ty * LADO - py0))
+    if stats["desenhados"]: _salvar_indice(pasta, indice)
+    altura_px = max(1, round(tela.height * largura_px / tela.width))
+    return tela.resize((largura_px, altura_px), Image.NEAREST), {"nivel": nivel, **stats}
+
+def vista_mapa(map_data, largura_px=1200, pasta=PASTA_LADRILHOS):
+    w, h = sim.map_size(map_data)
+    return vista(map_data, 0, 0, w, h, largura_px, pasta)
+
+def vista_foco(map_data, q, r, raio=5, largura_px=600, pasta=PASTA_LADRILHOS):
+    """Janela de (2*raio+1) células em volta de (q, r), com a célula do foco marcada."""
+    img, info = vista(map_data, q - raio, r - raio, q + raio + 1, r + raio + 1, largura_px, pasta)
+    w, h = sim.map_size(map_data)
+    q0, r0 = max(0, q - raio), max(0, r - raio)
+    cel = img.width / (min(w, q + raio + 1) - q0)
+    x, y = (q - q0) * cel, (r - r0) * cel
+    ImageDraw.Draw(img).rectangle([x, y, x + cel - 1, y + cel - 1], outline=(255, 0, 255), width=max(2, int(cel // 8)))
+    return img, info
+
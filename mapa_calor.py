@@ -0,0 +1,60 @@
+"""
+Mapas de calor acumulados pela simulação, um raster (altura x largura) por camada:
+
+    passagens    quantas vezes uma entidade entrou na célula (rotas de comércio, caminhos batidos)
+    permanencia  entidade-dias passados na célula (ocupação)
+    visitas      chegadas a uma meta na célula (pontos de interesse)
+
+O process_tick soma só o que aconteceu com as entidades processadas no dia (O(1) por entidade): quem
+dormiu pelo agendador recebe os dias parados de uma vez quando acorda. Os rasters ficam num .npz ao
+lado do mapa e vão somando de uma simulação para a outra.
+"""
+import os
+
+import numpy as np
+from matplotlib import colormaps
+
+CAMADAS = ("passagens", "permanencia", "visitas")
+
+
+def novo(w, h):
+    return {**{c: np.zeros((h, w), dtype=np.int32) for c in CAMADAS}, "dias": 0}
+
+def carregar(caminho, w, h):
+    """Rasters salvos em `caminho`, ou zerados se não existem ou são de um mapa de outro tamanho."""
+    if not os.path.exists(caminho): return novo(w, h)
+    with np.load(caminho) as dados:
+        if any(c not in dados or dados[c].shape != (h, w) for c in CAMADAS):
+            print(f"Mapa de calor em {os.path.basename(caminho)} é de outro mapa; começando do zero.")
+            return novo(w, h)
+        return {**{c: dados[c].astype(np.int32) for c in CAMADAS}, "dias": int(dados["dias"])}
+
+def salvar(calor, caminho):
+    np.savez_compressed(caminho, dias=calor["dias"], **{c: calor[c] for c in CAMADAS})
+
+
+# --- Acumulação (chamada pelo process_tick) ---
+
+def ficar(calor, ent, dias=1):
+    if dias > 0: calor["permanencia"][ent["r"], ent["q"]] += dias
+
+def passar(calor, ent):
+    calor["passagens"][ent["r"], ent["q"]] += 1
+    if (ent["q"], ent["r"]) == (ent.get("meta_q"), ent.get("meta_r")): calor["visitas"][ent["r"], ent["q"]] += 1
+
+
+# --- Cores ---
+
+def colorir(valores, base=None, cmap="inferno", log=True):
+    """Raster de valores -> RGB uint8.
+
+    log: escala log(1 + v), para contagens (poucas células concentram quase todo o tráfego).
+    base: RGB do mapa; células com valor 0 mostram a base escurecida em vez da cor do zero.
+    """
+    v = np.asarray(valores, dtype=float)
+    v = np.log1p(np.maximum(v, 0)) if log else v
+    lo, hi = (0.0, v.max()) if log else (v.min(), v.max())
+    norm = (v - lo) / (hi - lo) if hi > lo else np.zeros_like(v)
+    rgb = np.round(colormaps[cmap](norm)[..., :3] * 255).astype(np.uint8)
+    if base is not None: rgb[np.asarray(valores) <= 0] = (base[np.asarray(valores) <= 0] * 0.35).astype(np.uint8)
+    return rgb
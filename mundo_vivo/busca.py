@@ -0,0 +1,118 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import gerenciar_banco
+from gerenciar_banco import carregar_banco, limpar_tela, COLECOES_ENTIDADES
+from tela import pausar
+
+# Campos indexados e o peso de cada um no ranking
+CAMPOS_INDEXADOS = {"descricao": 1.0, "anotacoes": 1.0, "classe": 2.0, "raca": 2.0}
+
+PALAVRAS_VAZIAS = {
+    "a", "o", "as", "os", "e", "de", "da", "do", "das", "dos", "em", "no", "na", "nos", "nas",
+    "um", "uma", "uns", "umas", "que", "com", "por", "para", "pra", "se", "ao", "aos", "ou",
+}
+
+# Índice invertido: termo -> {(colecao, nome): peso}
+_indice = defaultdict(dict)
+# Termos de cada entidade, para remover/atualizar sem varrer o índice inteiro
+_termos_da_entidade = {}
+# gerenciar_banco.versao_dados que o índice reflete (-1 = ainda não montado)
+_versao_indice = -1
+
+
+def normalizar_texto(texto):
+    """Quebra o texto em termos minúsculos e sem acento ("Dragão" -> "dragao")."""
+    sem_acento = unicodedata.normalize("NFKD", str(texto or ""))
+    sem_acento = "".join(c for c in sem_acento if not unicodedata.combining(c)).lower()
+    return [t for t in re.findall(r"[a-z0-9]+", sem_acento) if t not in PALAVRAS_VAZIAS]
+
+def _pesos(ent):
+    pesos = Counter()
+    for campo, peso in CAMPOS_INDEXADOS.items():
+        for termo in normalizar_texto(ent.get(campo)):
+            pesos[termo] += peso
+    return pesos
+
+def _indexar(colecao, ent):
+    chave = (colecao, ent["nome"])
+    _remover(chave)
+    pesos = _pesos(ent)
+    for termo, peso in pesos.items():
+        _indice[termo][chave] = peso
+    _termos_da_entidade[chave] = set(pesos)
+
+def _remover(chave):
+    for termo in _termos_da_entidade.pop(chave, ()):
+        postagens = _indice[termo]
+        postagens.pop(chave, None)
+        if not postagens:
+            del _indice[termo]
+
+def construir_indice():
+    """Monta o índice do zero a partir do banco."""
+    global _versao_indice
+    _indice.clear()
+    _termos_da_entidade.clear()
+    dados = carregar_banco()
+    for colecao in COLECOES_ENTIDADES:
+        for ent in dados[colecao]:
+            _indexar(colecao, ent)
+    _versao_indice = gerenciar_banco.versao_dados
+
+
+# --- Atualização incremental (chamada pelo CRUD logo depois de salvar) ---
+# Se o único salvamento desde o índice é o desta alteração, basta atualizá-la. Qualquer outra mudança
+# de versão (outro processo gravou e o banco foi relido) deixa o índice velho: a próxima busca remonta.
+
+def _em_dia():
+    global _versao_indice
+    if _versao_indice < 0 or gerenciar_banco.versao_dados - _versao_indice > 1:
+        return False
+    _versao_indice = gerenciar_banco.versao_dados
+    return True
+
+def indexar(colecao, ent):
+    if _em_dia():
+        _indexar(colecao, ent)
+
+def remover(colecao, nome):
+    if _em_dia():
+        _remover((colecao, nome))
+
+
+# --- Consulta ---
+
+def buscar(consulta, limite=20):
+    """Retorna [(pontuação, colecao, nome)] ordenado por relevância (TF-IDF)."""
+    carregar_banco()  # relê se outro processo gravou (e aí a versão muda)
+    if _versao_indice != gerenciar_banco.versao_dados:
+        construir_indice()
+    total = max(len(_termos_da_entidade), 1)
+    pontuacao = Counter()
+    for termo in set(normalizar_texto(consulta)):
+        postagens = _indice.get(termo)
+        if not postagens:
+            continue
+        idf = math.log(1 + total / len(postagens))
+        for chave, peso in postagens.items():
+            pontuacao[chave] += peso * idf
+    return [(pontos, colecao, nome) for (colecao, nome), pontos in pontuacao.most_common(limite)]
+
+def buscar_entidades():
+    consulta = input("Buscar (descrição, anotações, classe, raça): ").strip()
+    if consulta == "":
+        print("Busca não pode ser vazia.")
+        pausar()
+        return
+    resultados = buscar(consulta)
+    limpar_tela()
+    if not resultados:
+        print(f"Nada encontrado para '{consulta}'.")
+    else:
+        print(f"\n Resultados para '{consulta}':\n")
+        for pontos, colecao, nome in resultados:
+            print(f" [{COLECOES_ENTIDADES[colecao]:>6}] {nome}  ({pontos:.2f})")
+    pausar("\n Pressione qualquer tecla para continuar...")
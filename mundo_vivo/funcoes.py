@@ -1,6 +1,68 @@
-from gerenciar_banco import *
-
+from itertools import islice
+import sys
 
+from gerenciar_banco import *
+from tela import pausar, ler_tecla
+import busca
+
+
+
+
+#funcoes de validacao (mesmas regras para os prompts e para a importação em lote)
+#cada uma devolve a mensagem de erro, ou None se o registro é válido
+#exigir_descricao=False: a importação aceita descrição vazia, como o banco guarda (entidades criadas pelo simulador)
+
+def _erro_nome_descricao(ent, exigir_descricao):
+    if ent.get("nome", "") == "":
+        return "Nome não pode ser vazio."
+    if exigir_descricao and ent.get("descricao", "") == "":
+        return "Nome e descrição não podem ser vazios."
+    return None
+
+def validar_npc(npc, nomes_existentes, exigir_descricao=True):
+    erro = _erro_nome_descricao(npc, exigir_descricao)
+    if erro:
+        return erro
+    if npc["nome"] in nomes_existentes:
+        return "Já existe um NPC com este nome cadastrado."
+    return None
+
+def validar_grupo(grupo, nomes_existentes, exigir_descricao=True):
+    erro = _erro_nome_descricao(grupo, exigir_descricao)
+    if erro:
+        return erro
+    if grupo.get("quantidade_membros", 0) < 0:
+        return "Quantidade de membros não pode ser negativa."
+    if grupo["nome"] in nomes_existentes:
+        return "Já existe um grupo com este nome cadastrado."
+    return None
+
+def validar_player(player, nomes_existentes, exigir_descricao=True):
+    erro = _erro_nome_descricao(player, exigir_descricao)
+    if erro:
+        return erro
+    for campo, rotulo in [("nivel", "Nível"), ("vida", "Vida"), ("ca", "Classe de Armadura (CA)")]:
+        if player.get(campo, 0) < 0:
+            return f"{rotulo} não pode ser negativo(a)."
+    atributos = player.get("atributos", [VALOR_ATRIBUTO_PADRAO] * len(ATRIBUTOS))
+    if len(atributos) != len(ATRIBUTOS) or any(valor < 0 for valor in atributos):
+        return f"Atributos devem ser {len(ATRIBUTOS)} números não negativos."
+    if player["nome"] in nomes_existentes:
+        return "Já existe um Player com este nome cadastrado."
+    return None
+
+
+def pedir_atributos(atuais=None):
+    """Pergunta os 6 atributos. Com `atuais`, Enter mantém o valor atual."""
+    atributos = []
+    for nome, sigla, atual in zip(ATRIBUTOS, SIGLAS_ATRIBUTOS, atuais or [None] * len(ATRIBUTOS)):
+        dica = f" [{atual}]" if atual is not None else ""
+        valor = input(f"{nome.capitalize()} ({sigla}){dica}: ").strip()
+        atributos.append(atual if valor == "" and atual is not None else int(valor))
+    return atributos
+
+def formatar_atributos(atributos):
+    return " ".join(f"{sigla} {valor} ({modificador(valor):+d})" for sigla, valor in zip(SIGLAS_ATRIBUTOS, atributos))
 
 
 #Funcoes de adicionar
@@ -9,41 +71,33 @@ def adicionar_npc():
     grupos,npcs,players,locais = importar_dados()
     nome = input("Nome: ").lower()
     descricao = input("Descrição: ")
-    if nome == "" or descricao == "":
-        print("Nome e descrição não podem ser vazios.")
+    erro = validar_npc({"nome": nome, "descricao": descricao}, {p['nome'] for p in npcs})
+    if erro:
+        print(erro)
         return
-    elif nome in [p['nome'] for p in npcs]:
-                print("Já existe um NPC com este nome cadastrado.")
-                return
     print(f"NPC '{nome}' adicionado com a descrição: {descricao}")
     
-    novo_npc = {
-        "nome": nome,
-        "descricao": descricao
-    }
+    novo_npc = nova_entidade("npcs", nome=nome, descricao=descricao)
     npcs.append(novo_npc)
     salvar_dados(grupos,npcs,players,locais)
+    busca.indexar("npcs", novo_npc)
 
 def adicionar_grupo():
     grupos,npcs,players,locais = importar_dados()
     nome = input("Nome: ").lower()
     descricao = input("Descrição: ")
     quantidade_membros = int(input("Quantidade de membros: "))
-    if nome == "" or descricao == "" or quantidade_membros < 0:
-        print("Nome e descrição não podem ser vazios.")
+    erro = validar_grupo({"nome": nome, "descricao": descricao, "quantidade_membros": quantidade_membros},
+                         {p['nome'] for p in grupos})
+    if erro:
+        print(erro)
         return
-    elif nome in [p['nome'] for p in npcs]:
-                print("Já existe um NPC com este nome cadastrado.")
-                return
-    print(f"NPC '{nome}' adicionado com a descrição: {descricao}")
+    print(f"Grupo '{nome}' adicionado com a descrição: {descricao}")
     
-    novo_grupo = {
-        "nome": nome,
-        "descricao": descricao,
-        "quantidade_membros": quantidade_membros
-    }
+    novo_grupo = nova_entidade("grupos", nome=nome, descricao=descricao, quantidade_membros=quantidade_membros)
     grupos.append(novo_grupo)
     salvar_dados(grupos,npcs,players,locais)
+    busca.indexar("grupos", novo_grupo)
 
 
 def adicionar_player():
@@ -54,31 +108,33 @@ def adicionar_player():
     nivel = int(input("Nível: "))
     raca = input("Raça: ")
     jogador = input("Jogador: ")
-    atributos = input("Atributos (força, destreza, constituição, inteligência, sabedoria, carisma): ")
+    print("Atributos:")
+    atributos = pedir_atributos()
     vida = int(input("Vida: "))
     ca = int(input("Classe de Armadura (CA): "))
     anotacoes = input("Anotações: ")
-    if nome == "" or descricao == "":
-        print("Nome e descrição não podem ser vazios.")
+    erro = validar_player({"nome": nome, "descricao": descricao, "nivel": nivel, "vida": vida, "ca": ca, "atributos": atributos},
+                          {p['nome'] for p in players})
+    if erro:
+        print(erro)
         return
-    elif nome in [p['nome'] for p in players]:
-                print("Já existe um Player com este nome cadastrado.")
-                return
-    novo_player = {
-        "nome": nome,
-        "descricao": descricao,
-        "classe": classe,
-        "nivel": nivel,
-        "raca": raca,
-        "jogador": jogador,
-        "atributos": atributos,
-        "vida": vida,
-        "ca": ca,
-        "anotacoes": anotacoes
-    }
+    novo_player = nova_entidade(
+        "players",
+        nome=nome,
+        descricao=descricao,
+        classe=classe,
+        nivel=nivel,
+        raca=raca,
+        jogador=jogador,
+        atributos=atributos,
+        vida=vida,
+        ca=ca,
+        anotacoes=anotacoes
+    )
 
     players.append(novo_player)
     salvar_dados(grupos,npcs,players,locais)
+    busca.indexar("players", novo_player)
 
 
 
@@ -90,11 +146,11 @@ def editar_player():
     nome = input("Nome do player a ser editado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     if nome not in [p['nome'] for p in players]:
         print(f"Player '{nome}' não encontrado.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for player in players:
         if player['nome'] == nome:
@@ -103,54 +159,60 @@ def editar_player():
             print(f"Nível atual: {player['nivel']}")
             print(f"Raça atual: {player['raca']}")
             print(f"Jogador atual: {player['jogador']}")
-            print(f"Atributos atuais: {player['atributos']}")
+            print(f"Atributos atuais: {formatar_atributos(player['atributos'])}")
             print(f"Vida atual: {player['vida']}")
             print(f"Classe de Armadura (CA) atual: {player['ca']}")
             print(f"Anotações atuais: {player['anotacoes']}")
             print("\nDigite os novos valores:")
-            player['descricao'] = input("Nova descrição: ")
+            # Os valores novos só vão para o registro depois de todos validados: o banco fica em
+            # cache no processo, e um campo inválido já atribuído iria para o disco no próximo salvamento
+            novo = {}
+            novo['descricao'] = input("Nova descrição: ")
 
-            player['classe'] = input("Nova classe: ")
-            if player['classe'] == "":
+            novo['classe'] = input("Nova classe: ")
+            if novo['classe'] == "":
                 print("Classe não pode ser vazia.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
-            player['nivel'] = int(input("Novo nível: "))
-            if player['nivel'] < 0:
+            novo['nivel'] = int(input("Novo nível: "))
+            if novo['nivel'] < 0:
                 print("Nível não pode ser negativo.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
-            player['raca'] = input("Nova raça: ")
-            if player['raca'] == "":
+            novo['raca'] = input("Nova raça: ")
+            if novo['raca'] == "":
                 print("Raça não pode ser vazia.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
-            player['jogador'] = input("Novo jogador: ")
-            if player['jogador'] == "":
+            novo['jogador'] = input("Novo jogador: ")
+            if novo['jogador'] == "":
                 print("Jogador não pode ser vazio.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
-            player['atributos'] = input("Novos atributos (força, destreza, constituição, inteligência, sabedoria, carisma): ")
-            if player['atributos'] == "":
-                print("Atributos não podem ser vazios.")
-                input("Pressione Enter para continuar...")
+            print("Novos atributos (Enter mantém o atual):")
+            novo['atributos'] = pedir_atributos(player['atributos'])
+            if any(valor < 0 for valor in novo['atributos']):
+                print("Atributos não podem ser negativos.")
+                pausar()
                 return
-            player['vida'] = int(input("Nova vida: "))
-            if player['vida'] < 0:
+            novo['vida'] = int(input("Nova vida: "))
+            if novo['vida'] < 0:
                 print("Vida não pode ser negativa.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
-            player['ca'] = int(input("Nova Classe de Armadura (CA): "))
-            if player['ca'] < 0:
+            novo['ca'] = int(input("Nova Classe de Armadura (CA): "))
+            if novo['ca'] < 0:
                 print("Classe de Armadura (CA) não pode ser negativa.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
-            player['anotacoes'] = input("Novas anotações: ")
+            novo['anotacoes'] = input("Novas anotações: ")
+            player.update(novo)
 
             salvar_dados(grupos,npcs,players,locais)
+            busca.indexar("players", player)
             limpar_tela()
             print(f"Player '{nome}' editado com sucesso.")
-            input("Pressione Enter para continuar...")
+            pausar()
             return
     print(f"Player '{nome}' não encontrado.")
 
@@ -159,24 +221,26 @@ def editar_npc():
     nome = input("Nome do NPC a ser editado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     elif nome not in [p['nome'] for p in npcs]:
         print(f"NPC '{nome}' não encontrado.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for npc in npcs:
         if npc['nome'] == nome:
             print(f"Descrição atual: {npc['descricao']}")
-            npc['descricao'] = input("Nova descrição: ")
-            if npc['descricao'] == "":
+            descricao = input("Nova descrição: ")
+            if descricao == "":
                 print("Descrição não pode ser vazia.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
+            npc['descricao'] = descricao
             salvar_dados(grupos,npcs,players,locais)
+            busca.indexar("npcs", npc)
             limpar_tela()
             print(f"NPC '{nome}' editado com sucesso.")
-            input("Pressione Enter para continuar...")
+            pausar()
             return
     print(f"NPC '{nome}' não encontrado.")
 
@@ -185,47 +249,128 @@ def editar_grupo():
     nome = input("Nome do grupo a ser editado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     elif nome not in [p['nome'] for p in grupos]:
         print(f"Grupo '{nome}' não encontrado.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for grupo in grupos:
         if grupo['nome'] == nome:
             print(f"Descrição atual: {grupo['descricao']}")
             print(f"Quantidade de membros atual: {grupo['quantidade_membros']}")
-            grupo['descricao'] = input("Nova descrição: ")
-            if grupo['descricao'] == "":
+            descricao = input("Nova descrição: ")
+            if descricao == "":
                 print("Descrição não pode ser vazia.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
-            grupo['quantidade_membros'] = int(input("Nova quantidade de membros: "))
-            if grupo['quantidade_membros'] < 0:
+            quantidade = int(input("Nova quantidade de membros: "))
+            if quantidade < 0:
                 print("Quantidade de membros não pode ser negativa.")
-                input("Pressione Enter para continuar...")
+                pausar()
                 return
+            grupo['descricao'], grupo['quantidade_membros'] = descricao, quantidade
             salvar_dados(grupos,npcs,players,locais)
+            busca.indexar("grupos", grupo)
             limpar_tela()
             print(f"Grupo '{nome}' editado com sucesso.")
-            input("Pressione Enter para continuar...")
+            pausar()
             return
     print(f"Grupo '{nome}' não encontrado.")
 
 
+#funcoes de listagem (paginada e filtrada)
+
+TAMANHO_PAGINA = 10
+
+def formatar_player(player):
+    return f"\n Nome: {player['nome']} \n Descrição: {player['descricao']} \n Classe: {player['classe']} \n Nível: {player['nivel']} \n Raça: {player['raca']} \n Jogador: {player['jogador']} \n Atributos: {formatar_atributos(player['atributos'])} \n Vida: {player['vida']} \n CA: {player['ca']} \n Anotações: {player['anotacoes']}"
+
+def formatar_grupo(grupo):
+    return f"\n Nome: {grupo['nome']} \n Descrição: {grupo['descricao']} \n Quantidade de membros: {grupo['quantidade_membros']}"
+
+def formatar_npc(npc):
+    return f"\n Nome: {npc['nome']} \n Descrição: {npc['descricao']}"
+
+def iterar_entidades(colecao, campo=None, trecho="", nivel_min=None, nivel_max=None):
+    """Gera, um a um, os registros da coleção que passam no filtro (sem montar lista)."""
+    trecho = trecho.lower()
+    for ent in carregar_banco()[colecao]:
+        if trecho:
+            campos = [campo] if campo else ["nome", "descricao"]
+            if not any(trecho in str(ent.get(c) or "").lower() for c in campos):
+                continue
+        if nivel_min is not None and ent.get("nivel", 0) < nivel_min:
+            continue
+        if nivel_max is not None and ent.get("nivel", 0) > nivel_max:
+            continue
+        yield ent
+
+def pedir_filtro(campos, com_nivel=False):
+    """Pergunta o filtro da listagem. Enter em branco = sem filtro."""
+    filtro = {}
+    print(f"Campos para filtrar: {', '.join(campos)}")
+    campo = input("Filtrar por campo (Enter para nome/descrição): ").strip().lower()
+    if campo in campos:
+        filtro["campo"] = campo
+    filtro["trecho"] = input("Texto contido (Enter para todos): ").strip()
+    if com_nivel:
+        try:
+            minimo = input("Nível mínimo (Enter para ignorar): ").strip()
+            maximo = input("Nível máximo (Enter para ignorar): ").strip()
+            if minimo: filtro["nivel_min"] = int(minimo)
+            if maximo: filtro["nivel_max"] = int(maximo)
+        except ValueError:
+            print("Nível inválido, ignorando faixa de nível.")
+    return filtro
+
+def listar_paginado(colecao, formatar, mensagem_vazio, tamanho=TAMANHO_PAGINA, **filtro):
+    """Mostra a coleção página por página, lendo só os registros da página atual.
+
+    Cada página é montada em um buffer e escrita no console de uma vez.
+    """
+    pagina = 0
+    while True:
+        registros = islice(iterar_entidades(colecao, **filtro), pagina * tamanho, (pagina + 1) * tamanho + 1)
+        buffer = []
+        tem_proxima = False
+        for i, ent in enumerate(registros):
+            if i == tamanho:
+                tem_proxima = True
+                break
+            buffer.append("\n -------------------------\n")
+            buffer.append(formatar(ent))
+            buffer.append("\n")
+
+        if not buffer and pagina == 0:
+            print(mensagem_vazio)
+            pausar("\n Pressione qualquer tecla para continuar...")
+            return
+
+        limpar_tela()
+        buffer.append(f"\n --- Página {pagina + 1} ---\n")
+        sys.stdout.write("".join(buffer))
+        sys.stdout.flush()
+
+        opcoes = ["[outra tecla] sair"]
+        if pagina > 0: opcoes.insert(0, "[a] anterior")
+        if tem_proxima: opcoes.insert(0, "[p] próxima")
+        sys.stdout.write(" " + "  ".join(opcoes) + ": ")
+        escolha = ler_tecla().lower()
+        if escolha == "p" and tem_proxima:
+            pagina += 1
+        elif escolha == "a" and pagina > 0:
+            pagina -= 1
+        else:
+            return
+
+
 #funcoes de visualizar
 
 
 def visualizar_todos_players():
-    grupos,npcs,players,locais = importar_dados()
-    if not players:
-        print("Nenhum player cadastrado.")
-    else:
-        limpar_tela()
-        for player in players:
-            print("\n -------------------------")
-            print(f"\n Nome: {player['nome']} \n Descrição: {player['descricao']} \n Classe: {player['classe']} \n Nível: {player['nivel']} \n Raça: {player['raca']} \n Jogador: {player['jogador']} \n Atributos: {player['atributos']} \n Vida: {player['vida']} \n CA: {player['ca']} \n Anotações: {player['anotacoes']}")
-    input("\n Pressione Enter para continuar...")
+    filtro = pedir_filtro(["nome", "classe", "raca", "jogador", "descricao", "anotacoes"], com_nivel=True)
+    listar_paginado("players", formatar_player, "Nenhum player encontrado.", **filtro)
 
 
 def visualizar_player():
@@ -234,27 +379,20 @@ def visualizar_player():
     nome = input("Nome do player a ser visualizado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for player in players:
         if player['nome'] == nome:
             limpar_tela()
-            print(f"\n Nome: {player['nome']} \n Descrição: {player['descricao']} \n Classe: {player['classe']} \n Nível: {player['nivel']} \n Raça: {player['raca']} \n Jogador: {player['jogador']} \n Atributos: {player['atributos']} \n Vida: {player['vida']} \n CA: {player['ca']} \n Anotações: {player['anotacoes']}")
-            input("\n Pressione Enter para continuar...")
+            print(formatar_player(player))
+            pausar("\n Pressione qualquer tecla para continuar...")
             return
     print(f"Player '{nome}' não encontrado.")
-    input("Pressione Enter para continuar...")
+    pausar()
 
 def visualizar_todos_grupos():
-    grupos,npcs,players,locais = importar_dados()
-    if not grupos:
-        print("Nenhum grupo cadastrado.")
-    else:
-        limpar_tela()
-        for grupo in grupos:
-            print("\n -------------------------")
-            print(f"\n Nome: {grupo['nome']} \n Descrição: {grupo['descricao']} \n Quantidade de membros: {grupo['quantidade_membros']}")
-    input("\n Pressione Enter para continuar...")
+    filtro = pedir_filtro(["nome", "descricao"])
+    listar_paginado("grupos", formatar_grupo, "Nenhum grupo encontrado.", **filtro)
 
 
 def visualizar_grupo():
@@ -263,28 +401,21 @@ def visualizar_grupo():
     nome = input("Nome do grupo a ser visualizado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for grupo in grupos:
         if grupo['nome'] == nome:
             limpar_tela()
-            print(f"\n Nome: {grupo['nome']} \n Descrição: {grupo['descricao']} \n Quantidade de membros: {grupo['quantidade_membros']}")
-            input("\n Pressione Enter para continuar...")
+            print(formatar_grupo(grupo))
+            pausar("\n Pressione qualquer tecla para continuar...")
             return
     print(f"Grupo '{nome}' não encontrado.")
-    input("Pressione Enter para continuar...")
+    pausar()
 
 
-def  visualizar_todos_npcs():
-    grupos,npcs,players,locais = importar_dados()
-    if not npcs:
-        print("Nenhum NPC cadastrado.")
-    else:
-        limpar_tela()
-        for npc in npcs:
-            print("\n -------------------------")
-            print(f"\n Nome: {npc['nome']} \n Descrição: {npc['descricao']}")
-    input("\n Pressione Enter para continuar...")
+def visualizar_todos_npcs():
+    filtro = pedir_filtro(["nome", "descricao"])
+    listar_paginado("npcs", formatar_npc, "Nenhum NPC encontrado.", **filtro)
 
 
 def visualizar_npc():
@@ -293,16 +424,16 @@ def visualizar_npc():
     nome = input("Nome do NPC a ser visualizado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for npc in npcs:
         if npc['nome'] == nome:
             limpar_tela()
-            print(f"\n Nome: {npc['nome']} \n Descrição: {npc['descricao']}")
-            input("\n Pressione Enter para continuar...")
+            print(formatar_npc(npc))
+            pausar("\n Pressione qualquer tecla para continuar...")
             return
     print(f"NPC '{nome}' não encontrado.")
-    input("Pressione Enter para continuar...")
+    pausar()
 
 
 #funcoes de deletar
@@ -312,18 +443,19 @@ def deletar_player():
     nome = input("Nome do player a ser deletado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for i, player in enumerate(players):
         if player['nome'] == nome:
             del players[i]
             salvar_dados(grupos,npcs,players,locais)
+            busca.remover("players", nome)
             limpar_tela()
             print(f"Player '{nome}' deletado com sucesso.")
-            input("Pressione Enter para continuar...")
+            pausar()
             return
     print(f"Player '{nome}' não encontrado.")
-    input("Pressione Enter para continuar...")
+    pausar()
 
 
 def deletar_npc():
@@ -331,36 +463,38 @@ def deletar_npc():
     nome = input("Nome do NPC a ser deletado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for i, npc in enumerate(npcs):
         if npc['nome'] == nome:
             del npcs[i]
             salvar_dados(grupos,npcs,players,locais)
+            busca.remover("npcs", nome)
             limpar_tela()
             print(f"NPC '{nome}' deletado com sucesso.")
-            input("Pressione Enter para continuar...")
+            pausar()
             return
     print(f"NPC '{nome}' não encontrado.")
-    input("Pressione Enter para continuar...")
+    pausar()
 
 def deletar_grupo():
     grupos,npcs,players,locais = importar_dados()
     nome = input("Nome do grupo a ser deletado: ").lower()
     if nome == "":
         print("Nome não pode ser vazio.")
-        input("Pressione Enter para continuar...")
+        pausar()
         return
     for i, grupo in enumerate(grupos):
         if grupo['nome'] == nome:
             del grupos[i]
             salvar_dados(grupos,npcs,players,locais)
+            busca.remover("grupos", nome)
             limpar_tela()
             print(f"Grupo '{nome}' deletado com sucesso.")
-            input("Pressione Enter para continuar...")
+            pausar()
             return
     print(f"Grupo '{nome}' não encontrado.")
-    input("Pressione Enter para continuar...")
+    pausar()
 
 
 #--- funções de funcionamento do mapa ---
@@ -376,38 +510,49 @@ cada local deve ser representado por um retângulo no mapa
 
 '''
 
-#  gerar o mapa é uma função de uso unico para criar a estrutura inicial do mapa e os arquivos necessários para o funcionamento do mapa o mapa sera guardado em um arquivo json chamado mapa.json
+#  gerar o mapa é uma função de uso unico para criar a estrutura inicial do mapa (mapa_bd.json)
 #o mapa consiste em uma grade de 200x86 quadrados onde cada quadrado representa um terreno específico
-#ele será uma matriz 2D onde cada elemento é um dicionário com informações sobre o terreno e o ambiente daquele quadrado
-#que tera todos os quadrados armazenados mesmo que vazios para facilitar a manipulação do mapa futuramente e gerar os outros arquivos necessários para trabalhar com as layers do mapa
-# gere o mapa para ter visualmente a aparencia do mapa e facilitar a manipulação futura
-#cada quadrado deve armazenar as informações de terreno e ambiente, local  atual, npcs presentes, grupos presentes, players presentes, valor de movimentação (custo para se mover para aquele quadrado),  valor de estabilidade (quanto mais alto mais dificil de se manter ali)
-#coloque tambem um campo de cordenadas x e y para facilitar a localização dos quadrados no mapa
-#e um campo de descrição para descrever o quadrado
-
-def gerar_mapa():
-    mapa = []
-    for y in range(86):
-        linha = []
-        for x in range(200):
-            quadrado = {
-                "x": x,
-                "y": y,
-                "terreno": "vazio",
-                "ambiente": "desconhecido",
-                "local_atual": None,
-                "npcs_presentes": [],
-                "grupos_presentes": [],
-                "players_presentes": [],
-                "valor_movimentacao": 1,
-                "valor_estabilidade": 1,
-                "descricao": ""
-            }
-            linha.append(quadrado)
-        mapa.append(linha)
-    
-    with open("mapa.json", "w") as f:
-        json.dump(mapa, f, indent=4)
+#o arquivo já sai no formato codificado em camadas (o mesmo do codificador.py): cada camada é uma matriz 2D
+#de códigos inteiros e o metadata traduz código -> texto. npcs/grupos/players presentes e descrição não são
+#guardados por quadrado, eles são derivados das entidades e do terreno (ver decodificador.py)
+#valor de movimentação: custo para se mover para aquele quadrado (1 = normal, mais alto = mais caro)
+#valor de estabilidade: quanto mais alto mais dificil de se manter ali
+#não roda ao importar o módulo: chame gerar_mapa() ou rode `python funcoes.py [--forcar]`
+
+LARGURA_MAPA = 200
+ALTURA_MAPA = 86
+CAMINHO_MAPA_JSON = os.path.join(CAMINHO_SCRIPT, 'mapa_bd.json')
+
+def gerar_mapa(caminho=CAMINHO_MAPA_JSON, largura=LARGURA_MAPA, altura=ALTURA_MAPA, forcar=False):
+    """Cria o mapa vazio codificado. Não sobrescreve um mapa existente sem forcar=True."""
+    if os.path.exists(caminho) and not forcar:
+        print(f"Mapa já existe em '{caminho}', nada a fazer.")
+        return False
+
+    def camada(valor):
+        return [[valor] * largura for _ in range(altura)]
+
+    mapa = {
+        "metadata": {
+            "num_rows": altura,
+            "num_cols": largura,
+            "terrenos_map": {"0": "vazio"},
+            "ambientes_map": {"0": "desconhecido"},
+            "local_atual_map": {"0": None}
+        },
+        "terreno": camada(0),
+        "ambiente": camada(0),
+        "valor_movimentacao": camada(1),
+        "valor_estabilidade": camada(1),
+        "local_atual": camada(0)
+    }
+
+    with open(caminho, "w") as f:
+        json.dump(mapa, f, separators=(',', ':'))
     
-    print("Mapa gerado com sucesso e salvo em 'mapa.json'.")
-gerar_mapa()
+    print(f"Mapa gerado com sucesso e salvo em '{caminho}'.")
+    return True
+
+
+if __name__ == "__main__":
+    gerar_mapa(forcar="--forcar" in sys.argv[1:])
@@ -1,33 +1,284 @@
 import json
 import os
+import random
+import re
+
+from tela import limpar
 
 CAMINHO_SCRIPT = os.path.dirname(os.path.abspath(__file__))
-CAMINHO_BANCO_JSON = os.path.join(CAMINHO_SCRIPT, 'banco.json')
+CAMINHO_RAIZ = os.path.dirname(CAMINHO_SCRIPT)
 
-def importar_dados():
-    with open(CAMINHO_BANCO_JSON,'r', encoding='utf-8') as banco: # estou abrindo o arquivo json em modo de leitura(r)
-        dados  = json.load(banco) # estou carregando o conteudo do arquivo json para um dicionario dados
-    grupos = dados["grupos"] # estou pegando o conteudo do dicionario dados e atribuindo a variavel evento
-    npcs = dados["npcs"] 
-    players = dados["players"]
-    locais = dados["locais"]
-    return grupos,npcs,players,locais
+# Banco único de entidades, compartilhado pelo CRUD (funcoes.py) e pelo simulador (inteface.py)
+CAMINHO_BANCO_JSON = os.path.join(CAMINHO_RAIZ, 'dados_entidades.json')
+
+# Arquivos antigos: só são lidos se o banco único ainda não existir
+CAMINHOS_LEGADOS = [
+    os.path.join(CAMINHO_SCRIPT, 'banco.json'),
+    os.path.join(CAMINHO_SCRIPT, 'banco_entidades.json'),
+]
+
+# Log de eventos da simulação (append-only, um JSON por linha)
+CAMINHO_LOG_EVENTOS = os.path.join(CAMINHO_RAIZ, 'eventos_mundo.jsonl')
+
+COLECOES = ["grupos", "npcs", "players", "locais"]
+COLECOES_ENTIDADES = {"npcs": "npc", "grupos": "grupo", "players": "player"}
+
+# Campos que toda entidade tem no esquema atual (q/r = None -> ainda não posicionada no mapa)
+ENTIDADE_PADRAO = {
+    "descricao": "",
+    "q": None, "r": None,
+    "meta_q": None, "meta_r": None,
+    "status": "ativo",
+    "modo_transporte": "a_pe",
+    "modo_temporario": None,
+    "progresso_diario": 0,
+    "tem_cavalo": False, "tem_barco": False, "tem_navio": False, "tem_barco_rio": False,
+    "base_local_nome": None,
+    "days_since_home": 0,
+}
+
+# Atributos de player, guardados como lista de 6 inteiros nesta ordem
+ATRIBUTOS = ["forca", "destreza", "constituicao", "inteligencia", "sabedoria", "carisma"]
+SIGLAS_ATRIBUTOS = ["FOR", "DES", "CON", "INT", "SAB", "CAR"]
+VALOR_ATRIBUTO_PADRAO = 10
+
+# Campos de ficha que o CRUD mostra, por coleção: entidade criada pelo simulador também nasce com eles
+PADRAO_POR_COLECAO = {
+    "npcs": {},
+    "grupos": {"quantidade_membros": 0},
+    "players": {
+        "classe": "", "nivel": 1, "raca": "", "jogador": "",
+        "atributos": [VALOR_ATRIBUTO_PADRAO] * len(ATRIBUTOS),
+        "vida": 0, "ca": 0, "anotacoes": "",
+    },
+}
+
+def _preencher_padrao(ent, colecao):
+    for campo, valor in {**ENTIDADE_PADRAO, **PADRAO_POR_COLECAO[colecao]}.items():
+        ent.setdefault(campo, list(valor) if isinstance(valor, list) else valor)
+
+# Estado de simulação gravado nos registros "estado" do log, nesta ordem: todo campo que o process_tick
+# muda. Campos novos vão no fim (registros antigos, mais curtos, continuam valendo para os primeiros)
+CAMPOS_ESTADO_LOG = ["q", "r", "meta_q", "meta_r", "progresso_diario", "days_since_home", "modo_temporario"]
+
+_banco = None  # cache do processo: o arquivo é lido uma vez só (e de novo se outro processo gravar)
+_assinatura_lida = None  # (mtime, tamanho) do banco e do log quando este processo leu/gravou por último
+versao_dados = 0  # incrementa a cada leitura do disco e a cada salvamento; caches derivados comparam com ela
+
+
+def modificador(valor):
+    """Modificador de atributo (10-11 -> +0, 12-13 -> +1, 8-9 -> -1 ...)."""
+    return (valor - VALOR_ATRIBUTO_PADRAO) // 2
+
+
+# --- Migrações ---
+# Cada migração recebe o banco na versão N e devolve na versão N+1.
+
+def _migrar_v0_para_v1(dados):
+    """Formato antigo (CRUD ou simulador, sem versão) -> esquema unificado."""
+    for colecao in COLECOES:
+        dados.setdefault(colecao, [])
+    dados.setdefault("config", {})
+
+    for colecao, tipo in COLECOES_ENTIDADES.items():
+        for ent in dados[colecao]:
+            ent.setdefault("tipo", tipo)
+            _preencher_padrao(ent, colecao)
+            # Alguns registros antigos salvaram booleanos como texto ("True")
+            for campo in ["tem_cavalo", "tem_barco", "tem_navio", "tem_barco_rio"]:
+                if isinstance(ent[campo], str):
+                    ent[campo] = ent[campo].strip().lower() == "true"
+    return dados
+
+def _migrar_v1_para_v2(dados):
+    """Atributos de player: texto livre -> lista de 6 inteiros.
+
+    Texto que não tem exatamente 6 números vira atributos padrão e é guardado em "atributos_legado".
+    """
+    for player in dados["players"]:
+        atributos = player.get("atributos")
+        if isinstance(atributos, list):
+            continue
+        numeros = [int(n) for n in re.findall(r"-?\d+", str(atributos or ""))]
+        if len(numeros) == len(ATRIBUTOS):
+            player["atributos"] = numeros
+        else:
+            player["atributos"] = [VALOR_ATRIBUTO_PADRAO] * len(ATRIBUTOS)
+            if atributos:
+                player["atributos_legado"] = atributos
+    return dados
+
+MIGRACOES = [_migrar_v0_para_v1, _migrar_v1_para_v2]
+VERSAO_ESQUEMA = len(MIGRACOES)
+
+def migrar_banco(dados):
+    """Aplica as migrações pendentes até a versão atual do esquema."""
+    versao = dados.get("versao_esquema", 0)
+    if versao > VERSAO_ESQUEMA:
+        raise ValueError(f"Banco na versão {versao}, mais nova que a suportada ({VERSAO_ESQUEMA}).")
+    for migracao in MIGRACOES[versao:]:
+        dados = migracao(dados)
+    dados["versao_esquema"] = VERSAO_ESQUEMA
+    return dados
+
+
+# --- Carregar / Salvar ---
+
+def _ler_json(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
+# --- Vários processos ---
+# O menu, o servidor e a linha de comando podem estar abertos ao mesmo tempo sobre o mesmo banco.
+# Cada processo guarda a assinatura (mtime + tamanho) do banco e do log de quando leu ou gravou por
+# último: carregar_banco relê se outro processo gravou depois disso, e salvar_banco se recusa a
+# sobrescrever o que o outro gravou (BancoDesatualizado) em vez de apagar a alteração dele em silêncio.
+
+class BancoDesatualizado(RuntimeError):
+    pass
+
+def _assinatura():
+    def arquivo(caminho):
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            return None
+        return info.st_mtime_ns, info.st_size
+    return arquivo(CAMINHO_BANCO_JSON), arquivo(CAMINHO_LOG_EVENTOS)
+
+def banco_mudou():
+    """True se outro processo gravou o banco ou o log depois da última leitura/gravação deste."""
+    return _banco is not None and _assinatura() != _assinatura_lida
+
+def carregar_banco(recarregar=False):
+    """Retorna o banco de entidades (migrado), lendo o disco só na primeira chamada.
+
+    Se outro processo gravou desde então, relê e atualiza o mesmo dicionário (quem guardou a referência
+    vê os dados novos; listas pegas antes com importar_dados ficam velhas).
+    """
+    global _banco, _assinatura_lida, versao_dados
+    if _banco is not None and not recarregar and not banco_mudou():
+        return _banco
+    _assinatura_lida = _assinatura()
+    versao_dados += 1  # dados novos do disco: caches derivados (relatórios, busca) refazem
+
+    if os.path.exists(CAMINHO_BANCO_JSON):
+        dados = _ler_json(CAMINHO_BANCO_JSON)
+    else:
+        legado = next((c for c in CAMINHOS_LEGADOS if os.path.exists(c)), None)
+        dados = _ler_json(legado) if legado else {}
+
+    versao_lida = dados.get("versao_esquema", 0)
+    dados = migrar_banco(dados)
+    aplicar_log(dados)
+    if _banco is None:
+        _banco = dados
+    else:
+        _banco.clear()
+        _banco.update(dados)
+    if versao_lida != VERSAO_ESQUEMA:
+        salvar_banco(_banco)
+    return _banco
+
+def salvar_banco(dados=None):
+    """Grava o banco inteiro no arquivo único.
+
+    Levanta BancoDesatualizado se outro processo gravou depois da nossa leitura (chame carregar_banco
+    e refaça a alteração).
+    """
+    global _banco, versao_dados, _assinatura_lida
+    if banco_mudou():
+        raise BancoDesatualizado("O banco foi alterado por outro processo; recarregue antes de salvar.")
+    if dados is not None:
+        _banco = dados
+    versao_dados += 1
+    with open(CAMINHO_BANCO_JSON, 'w', encoding='utf-8') as banco:
+        json.dump(_banco, banco, indent=4, ensure_ascii=False)
+    _assinatura_lida = _assinatura()
+
+# --- Semente e log de eventos ---
+# O mundo tem uma semente e um contador de dias em "config". Cada sorteio da simulação usa um
+# gerador derivado de (semente, dia, entidade): a mesma partida sempre gera os mesmos eventos,
+# não importa a ordem em que as entidades são processadas.
+
+def semente_mundo(dados):
+    """Semente do mundo; sorteada em config no primeiro uso (vai para o disco no próximo salvar_banco)."""
+    config = dados.setdefault("config", {})
+    if "semente" not in config:
+        config["semente"] = random.randrange(2**31)
+    return config["semente"]
+
+def rng_mundo(dados, *chave):
+    """Gerador determinístico para a chave (ex: dia + nome da entidade)."""
+    return random.Random(":".join(str(c) for c in (semente_mundo(dados),) + chave))
+
+def registrar_eventos(eventos, caminho=CAMINHO_LOG_EVENTOS):
+    """Acrescenta eventos ao log, sem reescrever nada."""
+    global _assinatura_lida
+    if not eventos:
+        return
+    proprio = caminho == CAMINHO_LOG_EVENTOS and _banco is not None
+    if proprio and banco_mudou():
+        raise BancoDesatualizado("O banco foi alterado por outro processo; recarregue antes de gravar o log.")
+    with open(caminho, 'a', encoding='utf-8') as log:
+        log.writelines(json.dumps(e, ensure_ascii=False, separators=(',', ':')) + "\n" for e in eventos)
+    if proprio:
+        _assinatura_lida = _assinatura()  # acréscimo nosso não conta como alteração de outro processo
+
+def ler_eventos(caminho=CAMINHO_LOG_EVENTOS):
+    if not os.path.exists(caminho):
+        return
+    with open(caminho, 'r', encoding='utf-8') as log:
+        for linha in log:
+            if linha.strip():
+                yield json.loads(linha)
+
+def registro_estado(dados, dia, nomes):
+    """Registro "estado" do log: posição/meta/progresso das entidades citadas, no fim do dia."""
+    nomes = set(nomes)
+    entidades = {e["nome"]: [e.get(c) for c in CAMPOS_ESTADO_LOG]
+                 for colecao in COLECOES_ENTIDADES for e in dados[colecao] if e["nome"] in nomes}
+    return {"dia": dia, "tipo": "estado", "entidades": entidades}
+
+def aplicar_log(dados, caminho=CAMINHO_LOG_EVENTOS):
+    """Persistência por log: aplica os registros "estado" mais novos que o último salvamento completo."""
+    config = dados.setdefault("config", {})
+    dia = config.get("dia_mundo", 0)
+    por_nome = None
+    for evento in ler_eventos(caminho):
+        if evento["tipo"] != "estado" or evento["dia"] <= dia:
+            continue
+        if por_nome is None:
+            por_nome = {e["nome"]: e for colecao in COLECOES_ENTIDADES for e in dados[colecao]}
+        for nome, valores in evento["entidades"].items():
+            if nome in por_nome:
+                por_nome[nome].update(zip(CAMPOS_ESTADO_LOG, valores))
+        dia = config["dia_mundo"] = evento["dia"]
+    return dados
+
+def nova_entidade(colecao, **campos):
+    """Cria um registro de entidade já no esquema atual."""
+    ent = {"nome": campos.pop("nome"), "tipo": COLECOES_ENTIDADES[colecao]}
+    _preencher_padrao(ent, colecao)
+    ent.update(campos)
+    return ent
+
+
+# --- Interface antiga do CRUD ---
+
+def importar_dados():
+    dados = carregar_banco()
+    return dados["grupos"], dados["npcs"], dados["players"], dados["locais"]
 
 
 def salvar_dados(grupos,npcs,players,locais):
-    with open(CAMINHO_BANCO_JSON,'w', encoding='utf-8') as banco: # estou abrindo o arquivo json em modo de escrita(w)
-        dados = {
-            "grupos": grupos,
-            "npcs": npcs,
-            "players": players,
-            "locais": locais
-        }
-        json.dump(dados, banco, indent=4, ensure_ascii=False) # estou salvando o conteudo do dicionario dados no arquivo json
+    dados = carregar_banco()
+    dados["grupos"] = grupos
+    dados["npcs"] = npcs
+    dados["players"] = players
+    dados["locais"] = locais
+    salvar_banco(dados)
 
 def limpar_tela():
-    """Limpa o console."""
-    if os.name == 'nt':
-        _ = os.system('cls')
-    else:
-        _ = os.system('clear')
+    """Limpa o console (ANSI, sem abrir shell)."""
+    limpar()
@@ -0,0 +1,166 @@
+import csv
+import json
+import os
+
+from gerenciar_banco import carregar_banco, salvar_banco, nova_entidade, limpar_tela, ATRIBUTOS, VALOR_ATRIBUTO_PADRAO
+from funcoes import validar_npc, validar_grupo, validar_player
+from tela import pausar
+import busca
+
+# Colunas de cada coleção na importação/exportação (a ordem vira o cabeçalho do CSV)
+CAMPOS_LOTE = {
+    "npcs": ["nome", "descricao"],
+    "grupos": ["nome", "descricao", "quantidade_membros"],
+    "players": ["nome", "descricao", "classe", "nivel", "raca", "jogador", *ATRIBUTOS, "vida", "ca", "anotacoes"],
+}
+CAMPOS_INTEIROS = {"quantidade_membros", "nivel", "vida", "ca", *ATRIBUTOS}
+VALIDADORES = {"npcs": validar_npc, "grupos": validar_grupo, "players": validar_player}
+
+
+# --- Leitura / escrita em streaming ---
+
+def _formato(caminho):
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in (".csv", ".jsonl"):
+        raise ValueError(f"Formato não suportado: '{extensao}' (use .csv ou .jsonl)")
+    return extensao
+
+def ler_registros(caminho):
+    """Gera (nº da linha, registro) de um arquivo CSV ou JSONL, um por vez."""
+    formato = _formato(caminho)
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        if formato == ".csv":
+            for linha, registro in enumerate(csv.DictReader(f), start=2):
+                yield linha, registro
+        else:
+            for linha, texto in enumerate(f, start=1):
+                if texto.strip():
+                    yield linha, json.loads(texto)
+
+def _normalizar(registro, colecao):
+    """Deixa o registro lido do arquivo no mesmo formato que os prompts produzem."""
+    limpo = {}
+    for campo in CAMPOS_LOTE[colecao]:
+        valor = registro.get(campo)
+        if campo in ATRIBUTOS:
+            valor = int(valor) if valor not in (None, "") else VALOR_ATRIBUTO_PADRAO
+        elif campo in CAMPOS_INTEIROS:
+            valor = int(valor) if valor not in (None, "") else 0
+        else:
+            valor = "" if valor is None else str(valor)
+        limpo[campo] = valor
+    limpo["nome"] = limpo["nome"].strip().lower()
+    # Arquivo tem uma coluna por atributo; o banco guarda a lista de 6
+    if colecao == "players":
+        limpo["atributos"] = [limpo.pop(atributo) for atributo in ATRIBUTOS]
+    return limpo
+
+
+# --- Importação / exportação ---
+
+def importar_arquivo(caminho, colecao):
+    """Importa um CSV/JSONL inteiro para a coleção numa única transação.
+
+    Registros com nome já cadastrado (ou repetido no próprio arquivo), sem diferenciar maiúsculas, são
+    ignorados. Descrição vazia é aceita, para que um arquivo exportado volte a ser importado.
+    Se algum registro for inválido nada é salvo e os erros são devolvidos.
+    """
+    dados = carregar_banco()
+    validar = VALIDADORES[colecao]
+    nomes = {ent["nome"].casefold() for ent in dados[colecao]}
+    novos, erros, duplicados = [], [], 0
+
+    for linha, registro in ler_registros(caminho):
+        try:
+            registro = _normalizar(registro, colecao)
+        except (ValueError, TypeError) as e:
+            erros.append((linha, f"Valor inválido: {e}"))
+            continue
+        if registro["nome"].casefold() in nomes:
+            duplicados += 1
+            continue
+        erro = validar(registro, nomes, exigir_descricao=False)
+        if erro:
+            erros.append((linha, erro))
+            continue
+        nomes.add(registro["nome"].casefold())
+        novos.append(nova_entidade(colecao, **registro))
+
+    resumo = {"importados": 0, "duplicados": duplicados, "erros": erros}
+    if erros or not novos:
+        return resumo
+
+    dados[colecao].extend(novos)
+    salvar_banco(dados)
+    for ent in novos:
+        busca.indexar(colecao, ent)
+    resumo["importados"] = len(novos)
+    return resumo
+
+def exportar_arquivo(caminho, colecao):
+    """Escreve a coleção em CSV/JSONL registro a registro. Retorna quantos foram escritos."""
+    formato = _formato(caminho)
+    campos = CAMPOS_LOTE[colecao]
+    total = 0
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        if formato == ".csv":
+            escritor = csv.DictWriter(f, fieldnames=campos, extrasaction="ignore")
+            escritor.writeheader()
+        for ent in carregar_banco()[colecao]:
+            registro = {campo: ent.get(campo, "") for campo in campos}
+            if colecao == "players":
+                registro.update(zip(ATRIBUTOS, ent.get("atributos", [VALOR_ATRIBUTO_PADRAO] * len(ATRIBUTOS))))
+            if formato == ".csv":
+                escritor.writerow(registro)
+            else:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            total += 1
+    return total
+
+
+# --- Prompts ---
+
+def _pedir_colecao():
+    colecao = input("Coleção (npcs/grupos/players): ").strip().lower()
+    if colecao not in CAMPOS_LOTE:
+        print("Coleção inválida.")
+        return None
+    return colecao
+
+def importar_em_lote():
+    colecao = _pedir_colecao()
+    if not colecao:
+        pausar()
+        return
+    print(f"Colunas esperadas: {', '.join(CAMPOS_LOTE[colecao])}")
+    caminho = input("Caminho do arquivo (.csv ou .jsonl): ").strip()
+    try:
+        resumo = importar_arquivo(caminho, colecao)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao ler '{caminho}': {e}")
+        pausar()
+        return
+
+    limpar_tela()
+    if resumo["erros"]:
+        print(f"Importação cancelada, {len(resumo['erros'])} registro(s) inválido(s):")
+        for linha, erro in resumo["erros"][:20]:
+            print(f"  linha {linha}: {erro}")
+    else:
+        print(f"{resumo['importados']} registro(s) importado(s) em '{colecao}'.")
+    if resumo["duplicados"]:
+        print(f"{resumo['duplicados']} registro(s) ignorado(s) por nome repetido.")
+    pausar()
+
+def exportar_em_lote():
+    colecao = _pedir_colecao()
+    if not colecao:
+        pausar()
+        return
+    caminho = input("Caminho de saída (.csv ou .jsonl): ").strip()
+    try:
+        total = exportar_arquivo(caminho, colecao)
+        print(f"{total} registro(s) exportado(s) para '{caminho}'.")
+    except (OSError, ValueError) as e:
+        print(f"Erro ao exportar: {e}")
+    pausar()
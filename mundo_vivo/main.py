@@ -1,9 +1,10 @@
 from menus import *
 from gerenciar_banco import limpar_tela
+from tela import pausar
 
 
 limpar_tela()
 print("\n--- Para melhor experiência, maximize a janela ---")
-input("        Pressione Enter para prosseguir") 
+pausar("        Pressione qualquer tecla para prosseguir")
 menu_principal()
 
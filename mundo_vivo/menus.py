@@ -1,206 +1,108 @@
-import os
 from funcoes import *
-from gerenciar_banco import limpar_tela
+from gerenciar_banco import limpar_tela, carregar_banco
+from lote import importar_em_lote, exportar_em_lote
+from busca import buscar_entidades
+from relatorios import relatorio_grupo, relatorio_npcs
+from tela import escolher
 
-# --- Funções de Sub-Menu ---
+# Cada menu é uma lista de (tecla, rótulo, função). Função None = opção ainda não implementada.
+# A tecla '0' sempre volta (ou sai, no menu principal).
 
-def menu_adicionar():
+
+def status_banco():
+    dados = carregar_banco()
+    return f"NPCs: {len(dados['npcs'])} | Grupos: {len(dados['grupos'])} | Players: {len(dados['players'])} | 0 volta"
+
+def executar_menu(titulo, itens, rotulo_sair="Voltar"):
+    """Laço de menu: desenha, lê uma tecla e executa a ação (sem precisar de Enter)."""
+    acoes = {tecla: acao for tecla, _, acao in itens}
+    opcoes = [(tecla, rotulo) for tecla, rotulo, _ in itens] + [("0", rotulo_sair)]
     while True:
-        limpar_tela()
-        print("\n--- MENU ADICIONAR ---")
-        print("1. Adicionar grupo")
-        print("2. Adicionar npc")
-        print("3. Adicionar player")
-        print("4. Adicionar local")
-        print("5. Voltar")
-        
-        opcao = input("Escolha uma opção: ").strip()
-        
-        if opcao == '1':
-            limpar_tela()
-            adicionar_grupo()
-        elif opcao == '2':
-            limpar_tela()
-            adicionar_npc()
-    
-        elif opcao == '3':
+        tecla = escolher(titulo, opcoes, status_banco())
+        if tecla == '0':
+            break
+        acao = acoes.get(tecla)
+        if acao:
             limpar_tela()
-            adicionar_player()
+            acao()
 
-        elif opcao == '4':
-            limpar_tela()
 
-        elif opcao == '5':
-            break  # Sai do loop do menu_adicionar e retorna para menu_principal
-        else:
-            print("Opção inválida.")
-            input("Pressione Enter para continuar...")
+# --- Funções de Sub-Menu ---
+
+def menu_adicionar():
+    executar_menu("MENU ADICIONAR", [
+        ('1', "Adicionar grupo", adicionar_grupo),
+        ('2', "Adicionar npc", adicionar_npc),
+        ('3', "Adicionar player", adicionar_player),
+        ('4', "Adicionar local", None),
+    ])
 
 
 def menu_editar():
-    while True:
-        limpar_tela()
-        print("\n--- MENU EDITAR ---")
-        print("1. Editar player")
-        print("2. Editar grupo")
-        print("3. Editar local")
-        print("4. Editar npc")
-        print("5. Voltar")
-        
-        opcao = input("Escolha uma opção: ").strip()
-        
-        if opcao == '1':
-            limpar_tela()
-            editar_player()
-        elif opcao == '2':
-            limpar_tela()
-            editar_grupo()
-        elif opcao == '3':
-            limpar_tela()
-            #editar_local()
-        elif opcao == '4':
-            limpar_tela()
-            editar_npc()
-        elif opcao == '5':
-            break  # Volta ao Menu Principal
-        else:
-            print("Opção inválida.")
-            input("Pressione Enter para continuar...")
+    executar_menu("MENU EDITAR", [
+        ('1', "Editar player", editar_player),
+        ('2', "Editar grupo", editar_grupo),
+        ('3', "Editar local", None),  # editar_local
+        ('4', "Editar npc", editar_npc),
+    ])
 
 
 def menu_tempo():
-    while True:
-        limpar_tela()
-        print("\n--- MENU TEMPO ---")
-
-        print("2. Voltar")
-        
-        opcao = input("Escolha uma opção: ").strip()
-        
-        if opcao == '1':
-            limpar_tela()
+    executar_menu("MENU TEMPO", [])
 
-            input("Pressione Enter para continuar...")
-        elif opcao == '2':
-            break  # Volta ao Menu Principal
-        else:
-            print("Opção inválida.")
-            input("Pressione Enter para continuar...")
 
+def menu_visualizar():
+    executar_menu("MENU VISUALIZAR", [
+        ('1', "Visualizar todos os players", visualizar_todos_players),
+        ('2', "visualizar player", visualizar_player),
+        ('3', "Visualizar todos os grupos", visualizar_todos_grupos),
+        ('4', "visualizar grupo", visualizar_grupo),
+        ('5', "Visualizar todos os locais", None),  # visualizar_todos_locais
+        ('6', "visualizar local", None),  # visualizar_local
+        ('7', "Visualizar todos os npcs", visualizar_todos_npcs),
+        ('8', "visualizar npc", visualizar_npc),
+        ('9', "Buscar por texto", buscar_entidades),
+    ])
 
 
-def menu_visualizar():    
-    while True:
-        limpar_tela()
-        print("\n--- MENU VISUALIZAR ---")
-        print("1. Visualizar todos os players")
-        print("2. visualizar player")
-        print("3. Visualizar todos os grupos")
-        print("4. visualizar grupo")
-        print("5. Visualizar todos os locais")
-        print("6. visualizar local")
-        print("7. Visualizar todos os npcs")
-        print("8. visualizar npc")
-        print("9. Voltar")
-        
-        opcao = input("Escolha uma opção: ").strip()
-        
-        if opcao == '1':
-            limpar_tela()
-            visualizar_todos_players()
-        elif opcao == '2':
-            limpar_tela()
-            visualizar_player()
-        elif opcao == '3':
-            limpar_tela()
-            visualizar_todos_grupos()
-        elif opcao == '4':
-            limpar_tela()
-            visualizar_grupo()
-        elif opcao == '5':
-            limpar_tela()
-            #visualizar_todos_locais()
-        elif opcao == '6':
-            limpar_tela()
-           #visualizar_local()
-        elif opcao == '7':
-            limpar_tela()
-            visualizar_todos_npcs()
-        elif opcao == '8':
-            limpar_tela()
-            visualizar_npc()
-        elif opcao == '9':
-            break  # Volta ao Menu Principal
+def menu_deletar():
+    executar_menu("MENU DELETAR", [
+        ('1', "Deletar player", deletar_player),
+        ('2', "Deletar grupo", deletar_grupo),
+        ('3', "Deletar local", None),  # deletar_local
+        ('4', "Deletar npc", deletar_npc),
+    ])
 
 
-# --- Função do menu deletar ---
+def menu_lote():
+    executar_menu("MENU LOTE", [
+        ('1', "Importar de CSV/JSONL", importar_em_lote),
+        ('2', "Exportar para CSV/JSONL", exportar_em_lote),
+    ])
 
-def menu_deletar():
-    while True:
-        limpar_tela()
-        print("\n--- MENU DELETAR ---")
-        print("1. Deletar player")
-        print("2. Deletar grupo")
-        print("3. Deletar local")
-        print("4. Deletar npc")
-        print("5. Voltar")
-        
-        opcao = input("Escolha uma opção: ").strip()
-        
-        if opcao == '1':
-            limpar_tela()
-            deletar_player()
-        elif opcao == '2':
-            limpar_tela()
-            deletar_grupo()
-        elif opcao == '3':
-            limpar_tela()
-            #deletar_local()
-        elif opcao == '4':
-            limpar_tela()
-            deletar_npc()
-        elif opcao == '5':
-            break  # Volta ao Menu Principal
-        else:
-            print("Opção inválida.")
-            input("Pressione Enter para continuar...")
+
+def menu_relatorios():
+    executar_menu("MENU RELATÓRIOS", [
+        ('1', "Relatório do grupo de players", relatorio_grupo),
+        ('2', "Relatório de NPCs e grupos", relatorio_npcs),
+    ])
 
 
 # --- Função do Menu Principal ---
 
 def menu_principal():
-    while True:
-        limpar_tela()
-        print("\n--- MENU PRINCIPAL ---")
-        print("1. Menu Adicionar")
-        print("2. Menu Editar")
-        print("3. Menu Tempo")
-        print("4. Menu visualizar")
-        print("5. Menu Deletar")
-        print("6. Sair")
-        
-        opcao = input("Escolha uma opção: ").strip()
-        
-        if opcao == '1':
-            # Chama o sub-menu. Quando ele retorna (por causa do 'break'), o loop continua
-            menu_adicionar()
-        elif opcao == '2':
-            menu_editar()
-        elif opcao == '3':
-            menu_tempo()
-        elif opcao == '4':
-            menu_visualizar()
-        elif opcao == '5':
-            limpar_tela()
-            menu_deletar()
-        elif opcao == '6':
-            limpar_tela()
-            print("Saindo...")
-            break
-        else:
-            print("Opção inválida.")
-            input("Pressione Enter para continuar...")
+    executar_menu("MENU PRINCIPAL", [
+        ('1', "Menu Adicionar", menu_adicionar),
+        ('2', "Menu Editar", menu_editar),
+        ('3', "Menu Tempo", menu_tempo),
+        ('4', "Menu visualizar", menu_visualizar),
+        ('5', "Menu Deletar", menu_deletar),
+        ('6', "Menu Lote (importar/exportar)", menu_lote),
+        ('7', "Menu Relatórios", menu_relatorios),
+    ], rotulo_sair="Sair")
+    limpar_tela()
+    print("Saindo...")
 
 # Inicia o programa
 if __name__ == "__main__":
-    menu_principal()
\ No newline at end of file
+    menu_principal()
@@ -0,0 +1,105 @@
+import numpy as np
+
+import gerenciar_banco
+from gerenciar_banco import carregar_banco, limpar_tela, ATRIBUTOS, SIGLAS_ATRIBUTOS, VALOR_ATRIBUTO_PADRAO
+from tela import pausar
+
+# Tabela colunar dos players: uma coluna numpy por campo numérico.
+# É refeita só quando o banco foi salvo desde a última montagem.
+_tabela = None
+_versao_tabela = -1
+
+
+def tabela_players():
+    """Retorna {"nome", "nivel", "vida", "ca": vetor, "atributos": matriz N x 6}."""
+    global _tabela, _versao_tabela
+    if _tabela is not None and _versao_tabela == gerenciar_banco.versao_dados:
+        return _tabela
+
+    players = carregar_banco()["players"]
+    _tabela = {
+        "nome": np.array([p["nome"] for p in players], dtype=object),
+        "nivel": np.fromiter((p.get("nivel", 0) for p in players), dtype=np.int32, count=len(players)),
+        "vida": np.fromiter((p.get("vida", 0) for p in players), dtype=np.int64, count=len(players)),
+        "ca": np.fromiter((p.get("ca", 0) for p in players), dtype=np.int64, count=len(players)),
+        "atributos": np.array([p.get("atributos", [VALOR_ATRIBUTO_PADRAO] * len(ATRIBUTOS)) for p in players], dtype=np.int16).reshape(len(players), len(ATRIBUTOS)),
+    }
+    _versao_tabela = gerenciar_banco.versao_dados
+    return _tabela
+
+def modificadores(atributos):
+    """Versão vetorizada de gerenciar_banco.modificador."""
+    return (atributos.astype(np.int32) - gerenciar_banco.VALOR_ATRIBUTO_PADRAO) // 2
+
+def agregados_grupo(nomes=None):
+    """Agregados do grupo de players (todos, ou só os `nomes` pedidos)."""
+    tabela = tabela_players()
+    filtro = np.ones(len(tabela["nome"]), dtype=bool) if nomes is None else np.isin(tabela["nome"], list(nomes))
+    if not filtro.any():
+        return None
+
+    atributos = tabela["atributos"][filtro]
+    mods = modificadores(atributos)
+    return {
+        "quantidade": int(filtro.sum()),
+        "nivel_medio": float(tabela["nivel"][filtro].mean()),
+        "nivel_total": int(tabela["nivel"][filtro].sum()),
+        "ca_minima": int(tabela["ca"][filtro].min()),
+        "ca_media": float(tabela["ca"][filtro].mean()),
+        "vida_total": int(tabela["vida"][filtro].sum()),
+        "atributos": {
+            sigla: {
+                "media": float(atributos[:, i].mean()),
+                "minimo": int(atributos[:, i].min()),
+                "maximo": int(atributos[:, i].max()),
+                "desvio": float(atributos[:, i].std()),
+                "mod_medio": float(mods[:, i].mean()),
+            }
+            for i, sigla in enumerate(SIGLAS_ATRIBUTOS)
+        },
+    }
+
+def agregados_npcs():
+    """Tamanho do conjunto de NPCs e grupos disponíveis para encontros."""
+    dados = carregar_banco()
+    membros = np.fromiter((g.get("quantidade_membros", 0) for g in dados["grupos"]), dtype=np.int64, count=len(dados["grupos"]))
+    return {
+        "npcs": len(dados["npcs"]),
+        "grupos": len(membros),
+        "membros_total": int(membros.sum()),
+        "maior_grupo": int(membros.max()) if len(membros) else 0,
+    }
+
+
+# --- Prompts ---
+
+def relatorio_grupo():
+    nomes = input("Players do grupo, separados por vírgula (Enter para todos): ").strip().lower()
+    nomes = [n.strip() for n in nomes.split(",") if n.strip()] or None
+    agg = agregados_grupo(nomes)
+    limpar_tela()
+    if agg is None:
+        print("Nenhum player encontrado.")
+        pausar()
+        return
+
+    linhas = [
+        "\n--- RELATÓRIO DO GRUPO ---",
+        f" Players: {agg['quantidade']}",
+        f" Nível médio: {agg['nivel_medio']:.1f} (soma {agg['nivel_total']})",
+        f" CA mínima: {agg['ca_minima']} | CA média: {agg['ca_media']:.1f}",
+        f" Vida total: {agg['vida_total']}",
+        "\n Atributo   média   mín   máx   desvio   mod. médio",
+    ]
+    for sigla, est in agg["atributos"].items():
+        linhas.append(f" {sigla:<8} {est['media']:>7.1f} {est['minimo']:>5} {est['maximo']:>5} {est['desvio']:>8.2f} {est['mod_medio']:>+11.1f}")
+    print("\n".join(linhas))
+    pausar("\n Pressione qualquer tecla para continuar...")
+
+def relatorio_npcs():
+    agg = agregados_npcs()
+    limpar_tela()
+    print("\n--- RELATÓRIO DE NPCs E GRUPOS ---")
+    print(f" NPCs: {agg['npcs']}")
+    print(f" Grupos: {agg['grupos']} | Membros no total: {agg['membros_total']} | Maior grupo: {agg['maior_grupo']}")
+    pausar("\n Pressione qualquer tecla para continuar...")
@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import msvcrt  # Windows
+except ImportError:
+    msvcrt = None
+    import select
+    import termios
+    import tty
+
+# --- Sequências ANSI ---
+ANSI_LIMPAR = "\033[2J\033[H"
+ANSI_APAGAR_LINHA = "\r\033[2K"
+ANSI_INVERTIDO = "\033[7m"
+ANSI_RESET = "\033[0m"
+
+LARGURA_STATUS = 60
+TECLAS_CANCELAR = ("c", "\x1b")
+
+if os.name == 'nt':
+    os.system("")  # uma vez só: liga o suporte a ANSI no console do Windows
+
+
+def _interativo():
+    return sys.stdin.isatty()
+
+def limpar():
+    """Limpa o console com ANSI, sem abrir um processo de shell."""
+    sys.stdout.write(ANSI_LIMPAR)
+    sys.stdout.flush()
+
+def barra_status(texto, largura=LARGURA_STATUS):
+    return f"{ANSI_INVERTIDO} {texto.ljust(largura - 1)[:largura - 1]}{ANSI_RESET}"
+
+
+# --- Teclado ---
+
+@contextmanager
+def _modo_tecla():
+    """Deixa o terminal entregar cada tecla sem esperar Enter (POSIX)."""
+    if msvcrt or not _interativo():
+        yield
+        return
+    fd = sys.stdin.fileno()
+    antigo = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, antigo)
+
+def tecla_disponivel(espera=0):
+    """True se há uma tecla para ler (sem bloquear mais que `espera` segundos)."""
+    if not _interativo():
+        return False
+    if msvcrt:
+        return msvcrt.kbhit()
+    return bool(select.select([sys.stdin], [], [], espera)[0])
+
+def ler_tecla():
+    """Lê uma tecla. Sem terminal (entrada redirecionada), lê uma linha e usa o 1º caractere."""
+    sys.stdout.flush()
+    if not _interativo():
+        linha = sys.stdin.readline()
+        if linha == "":
+            raise EOFError
+        return linha.strip()[:1] or "\n"
+    if msvcrt:
+        return msvcrt.getwch()
+    with _modo_tecla():
+        tecla = sys.stdin.read(1)
+        # Setas e afins chegam como ESC + sequência: descarta o resto
+        while tecla == "\x1b" and tecla_disponivel(0.01):
+            sys.stdin.read(1)
+    return tecla
+
+def pausar(mensagem="Pressione qualquer tecla para continuar..."):
+    sys.stdout.write(mensagem)
+    ler_tecla()
+    sys.stdout.write("\n")
+
+
+# --- Menus ---
+
+def escolher(titulo, itens, status=""):
+    """Desenha o menu de uma vez e espera uma das teclas de `itens` ([(tecla, rótulo)])."""
+    teclas = {tecla for tecla, _ in itens}
+    buffer = [ANSI_LIMPAR, f"\n--- {titulo} ---\n"]
+    buffer += [f"{tecla}. {rotulo}\n" for tecla, rotulo in itens]
+    if status:
+        buffer.append("\n" + barra_status(status) + "\n")
+    sys.stdout.write("".join(buffer))
+    while True:
+        tecla = ler_tecla().lower()
+        if tecla in teclas or not _interativo():
+            return tecla
+
+
+# --- Tarefas longas ---
+
+def _desenhar_progresso(rotulo, feito, total, giro, inicio):
+    if total:
+        cheio = int(20 * feito / total)
+        barra = f"[{'#' * cheio}{'.' * (20 - cheio)}] {100 * feito // total:3d}% ({feito}/{total})"
+    else:
+        barra = "..."
+    decorrido = time.perf_counter() - inicio
+    sys.stdout.write(f"{ANSI_APAGAR_LINHA} {giro} {rotulo} {barra} {decorrido:.1f}s  [c] cancelar")
+    sys.stdout.flush()
+
+def executar_com_progresso(funcao, *args, rotulo="Processando", **kwargs):
+    """Roda `funcao` numa thread e mostra o progresso ao vivo até ela terminar.
+
+    A função recebe `progresso=callback`; deve chamar callback(feito, total) e parar
+    quando ele devolver False (usuário apertou 'c' ou Esc).
+    """
+    estado = {"feito": 0, "total": 0}
+    cancelar = threading.Event()
+    resultado = {}
+
+    def progresso(feito, total):
+        estado["feito"], estado["total"] = feito, total
+        return not cancelar.is_set()
+
+    def alvo():
+        try:
+            resultado["valor"] = funcao(*args, progresso=progresso, **kwargs)
+        except BaseException as e:
+            resultado["erro"] = e
+
+    tarefa = threading.Thread(target=alvo, daemon=True)
+    inicio = time.perf_counter()
+    tarefa.start()
+    with _modo_tecla():
+        i = 0
+        while tarefa.is_alive():
+            _desenhar_progresso(rotulo, estado["feito"], estado["total"], "|/-\\"[i % 4], inicio)
+            i += 1
+            tarefa.join(0.1)
+            if tecla_disponivel():
+                tecla = msvcrt.getwch() if msvcrt else sys.stdin.read(1)
+                if tecla.lower() in TECLAS_CANCELAR:
+                    cancelar.set()
+    _desenhar_progresso(rotulo, estado["feito"], estado["total"], "✓", inicio)
+    sys.stdout.write("\n")
+
+    if "erro" in resultado:
+        raise resultado["erro"]
+    return resultado.get("valor")
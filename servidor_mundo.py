@@ -0,0 +1,200 @@
+"""
+Serviço HTTP/JSON local do Mundo Vivo (asyncio, sem dependências externas).
+
+O mapa decodificado e o banco de entidades ficam carregados em memória entre as
+requisições; vários visualizadores podem consultar o mesmo mundo ao mesmo tempo.
+
+    python servidor_mundo.py --porta 8765
+
+Endpoints:
+    GET  /mundo                 dimensões, locais e estado de todas as entidades
+    GET  /entidades/<nome>      registro completo de uma entidade
+    GET  /rota/<nome>           rota A* da entidade até a meta atual (com ETA)
+    GET  /eta[/<nome>]          dias até a chegada na meta, de uma ou de todas as entidades
+    GET  /distancias?modo=..    dias de viagem entre todos os locais (ou ?entidade=<nome>)
+    GET  /ladrilhos/<n>/<x>/<y> PNG do ladrilho (x, y) no nível de zoom n (cache em disco)
+    GET  /terreno?q=..&r=..     terreno, ambiente e local de uma célula
+    GET  /perto?q=..&r=..       entidades mais próximas (k=5) ou a até `raio` células
+    POST /tick?dias=N           avança a simulação N dias (render=1 gera a imagem)
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import indice_espacial
+import inteface as sim
+import ladrilhos_mapa
+import simulador
+
+STATUS_TEXTO = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class Binario:
+    """Resposta que não é JSON (ex.: o PNG de um ladrilho)."""
+    def __init__(self, tipo, dados):
+        self.tipo, self.dados = tipo, dados
+
+
+class ErroHttp(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+# ==============================================================================
+# ROTAS
+# ==============================================================================
+
+def _param_int(params, nome, padrao=None):
+    valor = params.get(nome, [padrao])[0]
+    if valor is None: raise ErroHttp(400, f"Parâmetro obrigatório: {nome}")
+    try: return int(valor)
+    except (TypeError, ValueError): raise ErroHttp(400, f"Parâmetro '{nome}' deve ser inteiro")
+
+def _entidade(mundo, nome):
+    ent = sim.find_entity(mundo["entidades"], nome)
+    if ent is None: raise ErroHttp(404, f"Entidade não encontrada: {nome}")
+    return ent
+
+async def tratar(servidor, metodo, caminho, params):
+    mundo = servidor["mundo"]
+    if sim.banco_mudou(): # a linha de comando ou o menu gravaram o banco: relê antes de responder
+        sim.carregar_banco()
+        indice_espacial.invalidar(mundo["entidades"])
+    partes = [unquote(p) for p in caminho.strip("/").split("/") if p]
+
+    if partes == ["mundo"] and metodo == "GET":
+        dec = sim.decode_map(mundo["mapa"])
+        return {"largura": dec["w"], "altura": dec["h"], "locais": sim.list_locations(mundo["mapa"]), **simulador.estado(mundo)}
+
+    if len(partes) == 2 and partes[0] == "entidades" and metodo == "GET":
+        return _entidade(mundo, partes[1])
+
+    if len(partes) == 2 and partes[0] == "rota" and metodo == "GET":
+        _entidade(mundo, partes[1])
+        return simulador.rota(mundo, partes[1])
+
+    if partes and partes[0] == "eta" and len(partes) <= 2 and metodo == "GET":
+        if len(partes) == 2: _entidade(mundo, partes[1])
+        return simulador.etas(mundo, partes[1] if len(partes) == 2 else None)
+
+    if partes == ["distancias"] and metodo == "GET":
+        nome = params.get("entidade", [None])[0]
+        if nome is not None: _entidade(mundo, nome)
+        return simulador.distancias(mundo, nome, params.get("modo", ["a_pe"])[0])
+
+    if len(partes) == 4 and partes[0] == "ladrilhos" and metodo == "GET":
+        try: nivel, x, y = (int(p.removesuffix(".png")) for p in partes[1:])
+        except ValueError: raise ErroHttp(400, "Use /ladrilhos/<nível>/<x>/<y>")
+        cols, lins = ladrilhos_mapa.grade(mundo["mapa"], nivel) if 0 <= nivel <= ladrilhos_mapa.nivel_max(mundo["mapa"]) else (0, 0)
+        if not (0 <= x < cols and 0 <= y < lins): raise ErroHttp(404, f"Ladrilho fora do mapa: {nivel}/{x}/{y}")
+        with open(ladrilhos_mapa.obter_ladrilho(mundo["mapa"], nivel, x, y), "rb") as f:
+            return Binario("image/png", f.read())
+
+    if partes == ["terreno"] and metodo == "GET":
+        q, r = _param_int(params, "q"), _param_int(params, "r")
+        t, a, l = sim.get_terrain_info(mundo["mapa"], q, r)
+        return {"q": q, "r": r, "terreno": t, "ambiente": a, "local": l}
+
+    if partes == ["perto"] and metodo == "GET":
+        raio = _param_int(params, "raio") if "raio" in params else None
+        return simulador.proximos(mundo, _param_int(params, "q"), _param_int(params, "r"), raio, _param_int(params, "k", 5))
+
+    if partes == ["tick"] and metodo == "POST":
+        dias = _param_int(params, "dias", 1)
+        render = params.get("render", ["0"])[0] in ("1", "true", "sim")
+        # A simulação roda fora do loop para não travar as outras conexões
+        return await asyncio.get_running_loop().run_in_executor(None, simulador.avancar, mundo, dias, render)
+
+    if partes and partes[0] in ("mundo", "entidades", "rota", "eta", "distancias", "ladrilhos", "terreno", "perto", "tick"):
+        raise ErroHttp(405, f"Método {metodo} não suportado em /{partes[0]}")
+    raise ErroHttp(404, f"Caminho desconhecido: {caminho}")
+
+
+# ==============================================================================
+# HTTP
+# ==============================================================================
+
+async def _ler_requisicao(reader):
+    linha = (await reader.readline()).decode("latin-1").strip()
+    if not linha: return None
+    metodo, alvo, _ = linha.split(" ", 2)
+    cabecalhos = {}
+    while True:
+        h = (await reader.readline()).decode("latin-1").strip()
+        if not h: break
+        chave, _, valor = h.partition(":")
+        cabecalhos[chave.strip().lower()] = valor.strip()
+    tamanho = int(cabecalhos.get("content-length", 0))
+    if tamanho: await reader.readexactly(tamanho) # corpo não é usado: parâmetros vão na query
+    return metodo.upper(), alvo, cabecalhos
+
+def _resposta(status, corpo, tempo_ms, manter):
+    if isinstance(corpo, Binario): tipo, dados = corpo.tipo, corpo.dados
+    else: tipo, dados = "application/json; charset=utf-8", json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+    cabecalho = (
+        f"HTTP/1.1 {status} {STATUS_TEXTO.get(status, '')}\r\n"
+        f"Content-Type: {tipo}\r\n"
+        f"Content-Length: {len(dados)}\r\n"
+        f"X-Tempo-Ms: {tempo_ms:.2f}\r\n"
+        f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+    )
+    return cabecalho.encode("latin-1") + dados
+
+async def atender(servidor, reader, writer):
+    try:
+        while True:
+            try:
+                req = await _ler_requisicao(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                break
+            if req is None: break
+            metodo, alvo, cabecalhos = req
+            url = urlsplit(alvo)
+            inicio = time.perf_counter()
+            try:
+                # Um pedido por vez mexe no mundo: o tick não pode intercalar com leituras
+                async with servidor["trava"]:
+                    corpo, status = await tratar(servidor, metodo, url.path, parse_qs(url.query)), 200
+            except ErroHttp as e:
+                corpo, status = {"erro": str(e)}, e.status
+            except Exception as e:
+                corpo, status = {"erro": f"{type(e).__name__}: {e}"}, 500
+            tempo_ms = (time.perf_counter() - inicio) * 1000
+
+            manter = cabecalhos.get("connection", "").lower() != "close"
+            writer.write(_resposta(status, corpo, tempo_ms, manter))
+            await writer.drain()
+            print(f"{metodo} {alvo} {status} {tempo_ms:.1f}ms", file=sys.stderr)
+            if not manter: break
+    finally:
+        writer.close()
+
+async def iniciar(host, porta, mapa_path=sim.MAPA_CODIFICADO_PATH):
+    servidor = {"mundo": simulador.carregar_mundo(mapa_path), "trava": asyncio.Lock()}
+    sim.decode_map(servidor["mundo"]["mapa"]) # decodifica já na subida, não na 1ª requisição
+    srv = await asyncio.start_server(lambda r, w: atender(servidor, r, w), host, porta)
+    print(f"🌍 Mundo Vivo servindo em http://{host}:{porta}", file=sys.stderr)
+    return srv
+
+async def _rodar(args):
+    srv = await iniciar(args.host, args.porta, args.mapa)
+    async with srv:
+        await srv.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON local do Mundo Vivo.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--mapa", default=sim.MAPA_CODIFICADO_PATH)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_rodar(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+API e linha de comando do simulador, sem menus.
+
+Uso como biblioteca:
+    import simulador
+    mundo = simulador.carregar_mundo()
+    simulador.avancar(mundo, 30)
+    simulador.rota(mundo, "guris")
+
+Uso no terminal (a saída é sempre JSON no stdout; as mensagens do simulador vão para o stderr):
+    python simulador.py tick --dias 30 --render
+    python simulador.py tick --dias 100 --animacao dias.gif
+    python simulador.py rota guris
+    python simulador.py exportar-rotas --por-entidade --processos 4
+    python simulador.py calor passagens          # mapa de calor das rotas mais usadas
+    python simulador.py vista --foco 40 30 --raio 8  # imagem montada dos ladrilhos em disco
+    python simulador.py eta                       # dias até a chegada de todas as entidades
+    python simulador.py distancias --modo cavalo  # dias entre todos os locais
+    python simulador.py verificar copia_do_banco.json   # refaz a simulação e compara com o log
+    python simulador.py criar-entidade npc "mercador" --q 50 --r 40
+"""
+import argparse
+import json
+import sys
+import time
+from contextlib import redirect_stdout
+
+import indice_espacial
+import inteface as sim
+import ladrilhos_mapa
+import mapa_calor
+
+CAMPOS_ESTADO = ["nome", "tipo", "q", "r", "meta_q", "meta_r", "status", "modo_transporte", "modo_temporario",
+                 "progresso_diario", "home_location", "days_since_home"]
+
+
+# ==============================================================================
+# API
+# ==============================================================================
+
+def carregar_mundo(mapa_path=sim.MAPA_CODIFICADO_PATH):
+    """Carrega mapa + entidades. Retorna o dicionário `mundo` usado pelas outras funções."""
+    map_data = sim.load_json(mapa_path)
+    if not map_data: raise FileNotFoundError(f"Mapa não encontrado: {mapa_path}")
+    return {"mapa": map_data, "entidades": sim.carregar_banco(), "mapa_path": mapa_path}
+
+def _entidade(mundo, nome):
+    ent = sim.find_entity(mundo["entidades"], nome)
+    if ent is None: raise KeyError(f"Entidade não encontrada: {nome}")
+    return ent
+
+def estado(mundo):
+    """Posição, meta e status de todas as entidades."""
+    return {"entidades": [{c: e.get(c) for c in CAMPOS_ESTADO} for e in sim.all_entities(mundo["entidades"])]}
+
+def avancar(mundo, dias, renderizar=False, imagem=sim.OUTPUT_IMAGE_MUNDO, trace_path=None, salvar=True, processos=1,
+            animacao=None):
+    """Roda `dias` dias de simulação e devolve o resumo (com o perfil do tick) + estado final.
+
+    salvar="log" grava só o log de eventos em vez de reescrever o banco (ver process_tick).
+    animacao: arquivo .gif/.png (ou pasta de quadros) com as posições de cada dia.
+    Quando salva, os dias também são somados nos mapas de calor (sim.CAMINHO_CALOR).
+    """
+    trajetoria = {} if animacao else None
+    calor = mapa_calor.carregar(sim.CAMINHO_CALOR, *sim.map_size(mundo["mapa"])) if salvar else None
+    resumo = sim.process_tick(mundo["mapa"], mundo["entidades"], dias, gerar_imagem=False, salvar=salvar,
+                              trace_path=trace_path, processos=processos, trajetoria=trajetoria, calor=calor)
+    if calor is not None: mapa_calor.salvar(calor, sim.CAMINHO_CALOR)
+    if animacao:
+        t0 = time.perf_counter()
+        resumo["animacao"] = sim.export_timeline(mundo["mapa"], trajetoria, animacao)
+        resumo["perfil"]["fases"]["animacao"] = time.perf_counter() - t0
+    if renderizar:
+        t0 = time.perf_counter()
+        resumo["imagem"] = sim.generate_world_image(mundo["mapa"], mundo["entidades"], imagem)
+        resumo["perfil"]["fases"]["imagem"] = time.perf_counter() - t0
+    resumo.update(estado(mundo))
+    return resumo
+
+def rota(mundo, nome):
+    """Rota A* da entidade até a meta atual."""
+    ent = _entidade(mundo, nome)
+    if ent.get("q") is None or ent.get("meta_q") is None:
+        return {"nome": ent["nome"], "caminho": None, "motivo": "sem posição ou sem meta"}
+    path = sim.cached_route(mundo["mapa"], ent, mundo["entidades"])
+    return {
+        "nome": ent["nome"],
+        "inicio": [ent["q"], ent["r"]],
+        "meta": [ent["meta_q"], ent["meta_r"]],
+        "caminho": [list(p) for p in path] if path else None,
+        "passos": len(path) if path else 0,
+        "trechos": sim.route_segments(ent, path),
+        "eta": sim.estimate_eta(mundo["mapa"], ent, mundo["entidades"]),
+    }
+
+def etas(mundo, nome=None):
+    """Dias até a chegada na meta: de uma entidade ou de todas (mais próximas primeiro)."""
+    if nome is not None: return sim.estimate_eta(mundo["mapa"], _entidade(mundo, nome), mundo["entidades"])
+    return {"etas": sim.estimate_all_etas(mundo["mapa"], mundo["entidades"])}
+
+def distancias(mundo, nome=None, modo="a_pe"):
+    """Dias de viagem entre todos os locais, com o transporte da entidade `nome` ou com `modo`."""
+    ent = _entidade(mundo, nome) if nome is not None else {"nome": modo, "modo_transporte": modo}
+    return sim.location_table(mundo["mapa"], ent, mundo["entidades"])
+
+def proximos(mundo, q, r, raio=None, k=5):
+    """Entidades perto de (q, r): todas a até `raio` células, ou as `k` mais próximas."""
+    if raio is not None: achadas = indice_espacial.no_raio(mundo["entidades"], q, r, raio)
+    else: achadas = indice_espacial.mais_proximas(mundo["entidades"], q, r, k)
+    return {"q": q, "r": r, "entidades": [{"distancia": d, **{c: e.get(c) for c in CAMPOS_ESTADO}} for d, e in achadas]}
+
+def renderizar(mundo, imagem=sim.OUTPUT_IMAGE_MUNDO):
+    return {"imagem": sim.generate_world_image(mundo["mapa"], mundo["entidades"], imagem)}
+
+def exportar_rotas(mundo, pasta=sim.CAMINHO_SCRIPT, por_entidade=False, processos=1):
+    return {"imagens": sim.export_routes(mundo["mapa"], mundo["entidades"], pasta, por_entidade, processos)}
+
+def calor(mundo, camada, imagem=None, n=10):
+    """Mapa de calor da camada (ver sim.heatmap_layers) + as n células mais quentes."""
+    if camada not in mapa_calor.CAMADAS: return {"imagem": sim.export_heatmap(mundo["mapa"], camada, caminho=imagem)}
+    rasters = mapa_calor.carregar(sim.CAMINHO_CALOR, *sim.map_size(mundo["mapa"]))
+    return {"imagem": sim.export_heatmap(mundo["mapa"], camada, rasters, imagem), "dias": rasters["dias"],
+            "celulas": [{"q": q, "r": r, "valor": v} for q, r, v in sim.hot_spots(rasters, camada, n)]}
+
+def ladrilhos(mundo, pasta=ladrilhos_mapa.PASTA_LADRILHOS):
+    """Gera/atualiza a pirâmide de ladrilhos (só refaz os que mudaram)."""
+    return ladrilhos_mapa.gerar_piramide(mundo["mapa"], pasta)
+
+def vista(mundo, imagem, foco=None, raio=5, largura=None, pasta=ladrilhos_mapa.PASTA_LADRILHOS):
+    """Mapa inteiro (ou a janela em volta de foco=(q, r)) montado dos ladrilhos."""
+    if foco: img, info = ladrilhos_mapa.vista_foco(mundo["mapa"], *foco, raio, largura or 600, pasta)
+    else: img, info = ladrilhos_mapa.vista_mapa(mundo["mapa"], largura or 1200, pasta)
+    img.save(imagem)
+    return {"imagem": imagem, **info}
+
+def criar_entidade(mundo, tipo, nome, q=None, r=None, transporte="a_pe"):
+    tipo = tipo.lower().rstrip("s") + "s"
+    ent = sim.create_entity(mundo["mapa"], mundo["entidades"], tipo, nome, q, r, modo_transporte=transporte)
+    return {c: ent.get(c) for c in CAMPOS_ESTADO}
+
+def criar_local(mundo, nome, q, r):
+    codigo = sim.create_location(mundo["mapa"], nome, q, r, mundo["mapa_path"])
+    return {"local": nome, "codigo": int(codigo), "q": q, "r": r}
+
+def verificar(mundo, snapshot_path, log_path=sim.CAMINHO_LOG_EVENTOS):
+    """Refaz a simulação a partir de um banco salvo e confere com o log de eventos."""
+    snapshot = sim.load_json(snapshot_path)
+    if snapshot is None: raise FileNotFoundError(f"Banco não encontrado: {snapshot_path}")
+    return sim.verify_event_log(mundo["mapa"], snapshot, log_path)
+
+def vincular_casa(mundo, nome, local, freq):
+    if local not in sim.list_locations(mundo["mapa"]): raise KeyError(f"Local não encontrado: {local}")
+    ent = _entidade(mundo, nome)
+    sim.bind_home(mundo["entidades"], ent, local, freq)
+    return {"nome": ent["nome"], "home_location": local, "return_freq_days": freq}
+
+
+# ==============================================================================
+# LINHA DE COMANDO
+# ==============================================================================
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Simulador do Mundo Vivo (modo sem menus, saída em JSON).")
+    parser.add_argument("--mapa", default=sim.MAPA_CODIFICADO_PATH, help="mapa codificado a usar")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("estado", help="lista posição e meta das entidades")
+
+    p = sub.add_parser("tick", help="avança a simulação")
+    p.add_argument("--dias", type=int, default=1)
+    p.add_argument("--render", action="store_true", help="gera a imagem do mundo no fim")
+    p.add_argument("--imagem", default=sim.OUTPUT_IMAGE_MUNDO)
+    p.add_argument("--trace", help="acrescenta o perfil do tick (JSON por linha) neste arquivo")
+    p.add_argument("--so-log", action="store_true", help="grava só o log de eventos, sem reescrever o banco")
+    p.add_argument("--processos", type=int, default=1, help="divide as entidades entre N processos")
+    p.add_argument("--multimodal", choices=["sim", "nao"], help="liga/desliga (e salva) rotas trocando de transporte")
+    p.add_argument("--animacao", help="grava os dias como .gif, .png animado ou pasta de quadros")
+
+    p = sub.add_parser("render", help="gera a imagem do mundo")
+    p.add_argument("--imagem", default=sim.OUTPUT_IMAGE_MUNDO)
+
+    p = sub.add_parser("exportar-rotas", help="desenha as rotas de todas as entidades")
+    p.add_argument("--pasta", default=sim.CAMINHO_SCRIPT)
+    p.add_argument("--por-entidade", action="store_true", help="um rota_<nome>.png por entidade (senão, uma imagem só)")
+    p.add_argument("--processos", type=int, default=1, help="processos para desenhar as imagens por entidade")
+
+    p = sub.add_parser("calor", help="mapa de calor (tráfego, ocupação, visitas ou camadas do mapa)")
+    p.add_argument("camada", choices=sim.heatmap_layers())
+    p.add_argument("--imagem", help="padrão: mapa_calor_<camada>.png")
+    p.add_argument("--n", type=int, default=10, help="quantas células mais quentes listar")
+
+    p = sub.add_parser("ladrilhos", help="gera/atualiza a pirâmide de ladrilhos do mapa")
+    p.add_argument("--pasta", default=ladrilhos_mapa.PASTA_LADRILHOS)
+
+    p = sub.add_parser("vista", help="mapa inteiro ou foco numa célula, montado dos ladrilhos")
+    p.add_argument("--foco", type=int, nargs=2, metavar=("Q", "R"))
+    p.add_argument("--raio", type=int, default=5)
+    p.add_argument("--largura", type=int, help="largura da imagem em pixels")
+    p.add_argument("--imagem", default=sim.OUTPUT_IMAGE_MUNDO.replace(".png", "_vista.png"))
+    p.add_argument("--pasta", default=ladrilhos_mapa.PASTA_LADRILHOS)
+
+    p = sub.add_parser("rota", help="rota A* de uma entidade até a meta")
+    p.add_argument("nome")
+
+    p = sub.add_parser("eta", help="dias até cada entidade chegar na meta (sem simular)")
+    p.add_argument("nome", nargs="?")
+
+    p = sub.add_parser("distancias", help="dias de viagem entre todos os locais")
+    p.add_argument("--entidade", help="usa os transportes desta entidade")
+    p.add_argument("--modo", default="a_pe", help="transporte, quando não há --entidade")
+
+    p = sub.add_parser("perto", help="entidades perto de uma célula")
+    p.add_argument("q", type=int)
+    p.add_argument("r", type=int)
+    p.add_argument("--raio", type=int, help="todas a até N células (senão, as --k mais próximas)")
+    p.add_argument("--k", type=int, default=5)
+
+    p = sub.add_parser("verificar", help="refaz a simulação a partir de um banco salvo e compara com o log")
+    p.add_argument("snapshot", help="cópia do banco de entidades (dados_entidades.json) de um dia anterior")
+    p.add_argument("--log", default=sim.CAMINHO_LOG_EVENTOS)
+
+    p = sub.add_parser("criar-entidade", help="cria NPC, grupo ou player")
+    p.add_argument("tipo", choices=["npc", "grupo", "player"])
+    p.add_argument("nome")
+    p.add_argument("--q", type=int)
+    p.add_argument("--r", type=int)
+    p.add_argument("--transporte", default="a_pe")
+
+    p = sub.add_parser("criar-local", help="marca um local fixo no mapa")
+    p.add_argument("nome")
+    p.add_argument("q", type=int)
+    p.add_argument("r", type=int)
+
+    p = sub.add_parser("vincular-casa", help="define a casa/base de uma entidade")
+    p.add_argument("nome")
+    p.add_argument("local")
+    p.add_argument("--dias", type=int, default=7, help="volta para casa a cada N dias")
+    return parser
+
+def executar(args):
+    mundo = carregar_mundo(args.mapa)
+    if getattr(args, "multimodal", None): mundo["entidades"]["config"]["rota_multimodal"] = args.multimodal == "sim"
+    if args.comando == "estado": return estado(mundo)
+    if args.comando == "tick": return avancar(mundo, args.dias, args.render, args.imagem, args.trace,
+                                                   "log" if args.so_log else True, args.processos, args.animacao)
+    if args.comando == "render": return renderizar(mundo, args.imagem)
+    if args.comando == "exportar-rotas": return exportar_rotas(mundo, args.pasta, args.por_entidade, args.processos)
+    if args.comando == "calor": return calor(mundo, args.camada, args.imagem, args.n)
+    if args.comando == "ladrilhos": return ladrilhos(mundo, args.pasta)
+    if args.comando == "vista": return vista(mundo, args.imagem, args.foco, args.raio, args.largura, args.pasta)
+    if args.comando == "rota": return rota(mundo, args.nome)
+    if args.comando == "eta": return etas(mundo, args.nome)
+    if args.comando == "distancias": return distancias(mundo, args.entidade, args.modo)
+    if args.comando == "perto": return proximos(mundo, args.q, args.r, args.raio, args.k)
+    if args.comando == "verificar": return verificar(mundo, args.snapshot, args.log)
+    if args.comando == "criar-entidade": return criar_entidade(mundo, args.tipo, args.nome, args.q, args.r, args.transporte)
+    if args.comando == "criar-local": return criar_local(mundo, args.nome, args.q, args.r)
+    if args.comando == "vincular-casa": return vincular_casa(mundo, args.nome, args.local, args.dias)
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    try:
+        with redirect_stdout(sys.stderr):
+            resultado = executar(args)
+        codigo = 0
+    except (KeyError, ValueError, FileNotFoundError) as e:
+        resultado, codigo = {"erro": str(e).strip("'\"")}, 1
+    json.dump(resultado, sys.stdout, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "mundo_vivo")]
+
+import gerenciar_banco
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Banco de entidades vazio numa pasta temporária (o dados_entidades.json do repositório não é tocado)."""
+    monkeypatch.setattr(gerenciar_banco, "CAMINHO_BANCO_JSON", str(tmp_path / "dados_entidades.json"))
+    monkeypatch.setattr(gerenciar_banco, "CAMINHO_LOG_EVENTOS", str(tmp_path / "eventos_mundo.jsonl"))
+    monkeypatch.setattr(gerenciar_banco, "CAMINHOS_LEGADOS", [])
+    monkeypatch.setattr(gerenciar_banco, "_banco", None)
+    monkeypatch.setattr(gerenciar_banco, "_assinatura_lida", None)
+    return gerenciar_banco.carregar_banco()
@@ -0,0 +1,50 @@
+import json
+import os
+
+import benchmark_simulacao
+import funcoes
+import gerenciar_banco
+import inteface as sim
+import relatorios
+
+
+def test_entidades_do_simulador_tem_campos_do_crud(banco):
+    mapa = benchmark_simulacao.gerar_mapa_sintetico(20, 15, seed=1)
+    player = sim.create_entity(mapa, banco, "players", "tester", 3, 4)
+    grupo = sim.create_entity(mapa, banco, "grupos", "bando", 5, 6)
+
+    assert player["atributos"] == [funcoes.VALOR_ATRIBUTO_PADRAO] * len(funcoes.ATRIBUTOS)
+    assert "Classe:" in funcoes.formatar_player(player)
+    assert "Quantidade de membros: 0" in funcoes.formatar_grupo(grupo)
+    # cada entidade tem a própria lista de atributos
+    outro = sim.create_entity(mapa, banco, "players", "outro", 1, 1)
+    outro["atributos"][0] = 18
+    assert player["atributos"][0] == funcoes.VALOR_ATRIBUTO_PADRAO
+
+
+def test_migracao_preenche_campos_do_crud():
+    dados = funcoes.migrar_banco({"players": [{"nome": "velho"}], "grupos": [{"nome": "bando"}]})
+    assert funcoes.formatar_player(dados["players"][0])
+    assert dados["grupos"][0]["quantidade_membros"] == 0
+
+
+def test_relatorio_com_player_sem_atributos(banco):
+    banco["players"].append({"nome": "avulso", "nivel": 2})  # gravado por fora do CRUD
+    funcoes.salvar_banco(banco)
+    agregados = relatorios.agregados_grupo()
+    assert agregados["quantidade"] == 1
+    assert agregados["atributos"]["FOR"]["media"] == funcoes.VALOR_ATRIBUTO_PADRAO
+
+
+def test_relatorio_ve_gravacao_de_outro_processo(banco):
+    banco["players"].append(funcoes.nova_entidade("players", nome="a", nivel=3))
+    funcoes.salvar_banco(banco)
+    assert relatorios.agregados_grupo()["nivel_total"] == 3
+
+    caminho = gerenciar_banco.CAMINHO_BANCO_JSON
+    with open(caminho, encoding="utf-8") as f: dados = json.load(f)
+    dados["players"][0]["nivel"] = 7
+    with open(caminho, "w", encoding="utf-8") as f: json.dump(dados, f)  # "outro processo"
+    os.utime(caminho, ns=(0, 0))  # mesmo tamanho: garante que a assinatura muda
+    funcoes.carregar_banco()
+    assert relatorios.agregados_grupo()["nivel_total"] == 7
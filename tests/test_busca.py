@@ -0,0 +1,27 @@
+import json
+import os
+
+import busca
+import funcoes
+import gerenciar_banco
+
+
+def test_busca_ve_gravacao_de_outro_processo(banco):
+    banco["npcs"].append(funcoes.nova_entidade("npcs", nome="ferreiro", descricao="forja espadas"))
+    funcoes.salvar_banco(banco)
+    assert [nome for _, _, nome in busca.buscar("espadas")] == ["ferreiro"]
+
+    # CRUD deste processo: atualização incremental, sem remontar
+    novo = funcoes.nova_entidade("npcs", nome="bardo", descricao="canta espadas antigas")
+    banco["npcs"].append(novo)
+    funcoes.salvar_banco(banco)
+    busca.indexar("npcs", novo)
+    assert {nome for _, _, nome in busca.buscar("espadas")} == {"ferreiro", "bardo"}
+
+    caminho = gerenciar_banco.CAMINHO_BANCO_JSON
+    with open(caminho, encoding="utf-8") as f: dados = json.load(f)
+    dados["npcs"][0]["descricao"] = "vende cavalos"
+    with open(caminho, "w", encoding="utf-8") as f: json.dump(dados, f)  # "outro processo"
+    os.utime(caminho, ns=(0, 0))
+    assert [nome for _, _, nome in busca.buscar("cavalos")] == ["ferreiro"]
+    assert [nome for _, _, nome in busca.buscar("espadas")] == ["bardo"]
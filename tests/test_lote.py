@@ -0,0 +1,38 @@
+import pytest
+
+import gerenciar_banco
+import lote
+
+
+def _recomecar(tmp_path, monkeypatch, nome):
+    monkeypatch.setattr(gerenciar_banco, "CAMINHO_BANCO_JSON", str(tmp_path / nome))
+    monkeypatch.setattr(gerenciar_banco, "_banco", None)
+    monkeypatch.setattr(gerenciar_banco, "_assinatura_lida", None)
+    return gerenciar_banco.carregar_banco()
+
+
+@pytest.mark.parametrize("extensao", [".csv", ".jsonl"])
+@pytest.mark.parametrize("colecao", ["npcs", "grupos", "players"])
+def test_exportar_e_reimportar(banco, tmp_path, monkeypatch, colecao, extensao):
+    banco[colecao] += [gerenciar_banco.nova_entidade(colecao, nome="kenzo"),  # descrição vazia, como o simulador cria
+                       gerenciar_banco.nova_entidade(colecao, nome="alice", descricao="Dragão")]
+    gerenciar_banco.salvar_banco(banco)
+    arquivo = str(tmp_path / f"{colecao}{extensao}")
+    assert lote.exportar_arquivo(arquivo, colecao) == 2
+
+    assert lote.importar_arquivo(arquivo, colecao) == {"importados": 0, "duplicados": 2, "erros": []}
+
+    novo = _recomecar(tmp_path, monkeypatch, "outro_banco.json")
+    assert lote.importar_arquivo(arquivo, colecao)["importados"] == 2
+    campos = lote.CAMPOS_LOTE[colecao][:2]
+    assert [[e[c] for c in campos] for e in novo[colecao]] == [[e[c] for c in campos] for e in banco[colecao]]
+    if colecao == "players":
+        assert [e["atributos"] for e in novo[colecao]] == [e["atributos"] for e in banco[colecao]]
+
+
+def test_duplicado_sem_diferenciar_maiusculas(banco, tmp_path):
+    banco["npcs"].append(gerenciar_banco.nova_entidade("npcs", nome="Kenzo", descricao="ferreiro"))
+    gerenciar_banco.salvar_banco(banco)
+    arquivo = tmp_path / "npcs.jsonl"
+    arquivo.write_text('{"nome": "kenzo", "descricao": "outro"}\n{"nome": "KENZO", "descricao": "mais um"}\n', encoding="utf-8")
+    assert lote.importar_arquivo(str(arquivo), "npcs") == {"importados": 0, "duplicados": 2, "erros": []}